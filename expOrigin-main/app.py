@@ -1,15 +1,39 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g, Response, has_request_context, send_file
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from werkzeug.utils import secure_filename
-from sqlalchemy import text
+from sqlalchemy import text, event, select, func, table, column, literal, literal_column, cast, tuple_, union_all
+from sqlalchemy import Integer, Text, DateTime, Date
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError, OperationalError
+from sqlalchemy.pool import Pool, QueuePool
 from dotenv import load_dotenv
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import click
+import atexit
+import csv
+import fcntl
+import io
+import json
 import os
 import re
-from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+import sys
+import tempfile
+import threading
+import time
+from itsdangerous import URLSafeTimedSerializer, Signer, BadSignature, SignatureExpired
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from werkzeug.datastructures import CallbackDict
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+import random
+import secrets
 from urllib.parse import urlparse, urlunparse
 
 
@@ -55,27 +79,7 @@ def get_db_url() -> str:
     env_url = (os.getenv("DATABASE_URL") or "").strip()
 
     if env_url:
-        # "psql '...'" veya "psql \"...\"" gelirse temizle
-        if env_url.startswith("psql "):
-            env_url = env_url.replace("psql ", "", 1).strip().strip(" '\"")
-
-        # postgres:// -> postgresql://
-        env_url = re.sub(r"^postgres://", "postgresql://", env_url)
-
-        # postgresql:// veya postgresql+driver:// formatını kabul et
-        if not re.match(r"^postgresql(\+\w+)?://", env_url):
-            raise RuntimeError("DATABASE_URL geçersiz formatta. postgresql://... olmalı.")
-
-        # Flask-SQLAlchemy (sync) için driver yoksa ekle
-        # (psycopg2 kullanıyorsan)
-        if env_url.startswith("postgresql://"):
-            env_url = env_url.replace("postgresql://", "postgresql+psycopg2://", 1)
-
-        # Neon genelde SSL ister
-        if "sslmode=" not in env_url:
-            env_url += ("&" if "?" in env_url else "?") + "sslmode=require"
-
-        return env_url
+        return _normalize_db_url(env_url)
 
     # Local fallback
     local_user = os.getenv("LOCAL_DB_USER", "postgres")
@@ -85,16 +89,1582 @@ def get_db_url() -> str:
     return f"postgresql+psycopg2://{local_user}:{local_pass}@{local_host}/{local_name}"
 
 
+def get_replica_db_url() -> str | None:
+    """
+    Opsiyonel okuma replikası (DATABASE_REPLICA_URL). Aynı normalizasyon uygulanır.
+    """
+    env_url = (os.getenv("DATABASE_REPLICA_URL") or "").strip()
+    return _normalize_db_url(env_url) if env_url else None
+
+
+def _normalize_db_url(env_url: str) -> str:
+    # "psql '...'" veya "psql \"...\"" gelirse temizle
+    if env_url.startswith("psql "):
+        env_url = env_url.replace("psql ", "", 1).strip().strip(" '\"")
+
+    # postgres:// -> postgresql://
+    env_url = re.sub(r"^postgres://", "postgresql://", env_url)
+
+    # postgresql:// veya postgresql+driver:// formatını kabul et
+    if not re.match(r"^postgresql(\+\w+)?://", env_url):
+        raise RuntimeError("DATABASE_URL geçersiz formatta. postgresql://... olmalı.")
+
+    # Flask-SQLAlchemy (sync) için driver yoksa ekle
+    # (psycopg2 kullanıyorsan)
+    if env_url.startswith("postgresql://"):
+        env_url = env_url.replace("postgresql://", "postgresql+psycopg2://", 1)
+
+    # Neon genelde SSL ister
+    if "sslmode=" not in env_url:
+        env_url += ("&" if "?" in env_url else "?") + "sslmode=require"
+
+    return env_url
+
+
+# -----------------------------------------------------
+# Bağlantı havuzu ve statement timeout ayarları
+# -----------------------------------------------------
+# Havuz worker (process) başınadır: her thread aynı anda en fazla bir bağlantı tutar.
+# GUNICORN_THREADS ve WEB_CONCURRENCY gunicorn.conf.py ile aynı env'den okunur
+# (gunicorn.conf.py seçtiği değerleri env'e yazar).
+# gunicorn'u -c gunicorn.conf.py olmadan başlatmak bu değerleri varsayılan (1)
+# bırakır ve havuz bütçesi worker sayısını bilmez; sessizce aşmak yerine dur.
+if "gunicorn" in sys.modules and os.getenv("GUNICORN_CONF_LOADED") != "1":
+    raise RuntimeError(
+        'gunicorn "-c gunicorn.conf.py" ile başlatılmalı '
+        '(ör. gunicorn -c gunicorn.conf.py "expOrigin-main.app:create_app()")'
+    )
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "1"))
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+# Tüm worker'ların bir DB sunucusuna (primary ve replika ayrı ayrı) açabileceği
+# toplam bağlantı bütçesi. Neon'un en küçük compute'u ~100 bağlantı kabul eder;
+# zamanlayıcı process'i ve CLI için pay bırakılır.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+DB_WORKER_CONNECTIONS = max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+_requested_pool_size = int(os.getenv("DB_POOL_SIZE", str(max(2, GUNICORN_THREADS))))
+_requested_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", str(max(2, GUNICORN_THREADS // 2))))
+# Açıkça verilen DB_POOL_SIZE/DB_MAX_OVERFLOW da bütçeyi aşamaz; fazlası kırpılır
+DB_POOL_SIZE = max(1, min(_requested_pool_size, DB_WORKER_CONNECTIONS))
+DB_MAX_OVERFLOW = max(0, min(_requested_max_overflow, DB_WORKER_CONNECTIONS - DB_POOL_SIZE))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+# Varsayılan: iyimser (optimistic) kopma yönetimi. Pre-ping her checkout'ta ek tur demek.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+# Erişilemeyen sunucuya TCP bağlantısı sonsuza dek beklemesin
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+# Engine başına derlenmiş SQL cache'i (LRU, adet). Rapor sorgularının her filtre
+# şekli ayrı bir giriştir; SQLAlchemy varsayılanı 500.
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+# Devre kesici: art arda bu kadar bağlantı/sorgu hatasında açılır, bu süre sonra tek deneme yapar
+DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+DB_BREAKER_RESET_SECONDS = float(os.getenv("DB_BREAKER_RESET_SECONDS", "15"))
+
+# Route sınıfı -> statement_timeout (ms). 0 = sınırsız / dokunma.
+STATEMENT_TIMEOUTS_MS = {
+    "interactive": int(os.getenv("STATEMENT_TIMEOUT_INTERACTIVE_MS", "5000")),
+    "export": int(os.getenv("STATEMENT_TIMEOUT_EXPORT_MS", "60000")),
+    "background": int(os.getenv("STATEMENT_TIMEOUT_BACKGROUND_MS", "300000")),
+}
+
+
+def statement_budget(route_class: str):
+    """
+    Route'un statement_timeout sınıfını belirler (varsayılan: interactive).
+    İstek dışı (CLI, arka plan) sorgular "background" bütçesini kullanır.
+    """
+    if route_class not in STATEMENT_TIMEOUTS_MS:
+        raise ValueError(f"Bilinmeyen route sınıfı: {route_class}")
+
+    def deco(f):
+        f._route_class = route_class
+        return f
+    return deco
+
+
+# Zamanlanmış işler, bir istek içinden tetiklense bile background bütçesiyle çalışır
+_forced_route_class = threading.local()
+
+
+def current_route_class() -> str:
+    forced = getattr(_forced_route_class, "value", None)
+    if forced:
+        return forced
+    if not has_request_context():
+        return "background"
+    view = app.view_functions.get(request.endpoint)
+    return getattr(view, "_route_class", "interactive")
+
+
+class DatabaseUnavailable(Exception):
+    """Devre kesici açıkken bağlantı istenirse hemen fırlatılır (beklemeden)."""
+
+
+class CircuitBreaker:
+    """
+    Veritabanı için devre kesici (worker başına).
+
+    closed    -> normal; art arda DB_BREAKER_FAILURES hata olursa open
+    open      -> bağlantı istekleri DatabaseUnavailable ile hemen reddedilir
+    half_open -> reset süresi dolunca tek bir deneme bağlantısına izin verilir;
+                 başarılıysa closed, hatalıysa tekrar open
+    """
+
+    STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+        self._on_close = []
+
+    def on_close(self, callback):
+        self._on_close.append(callback)
+        return callback
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != "closed"
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "open" and now - self._opened_at >= self.reset_seconds:
+                self._set_state("half_open")
+                self._probe_at = now
+                return True
+            # Deneme bağlantısı takıldıysa bir sonrakine izin ver
+            if self.state == "half_open" and now - self._probe_at >= self.reset_seconds:
+                self._probe_at = now
+                return True
+        metrics.inc("db_circuit_rejections_total", (("db", self.name),))
+        return False
+
+    def record_success(self):
+        if self.state == "closed" and self._failures == 0:
+            return
+        with self._lock:
+            previous = self.state
+            self._failures = 0
+            self._set_state("closed")
+        if previous != "closed":
+            app.logger.warning("DB devre kesici kapandı (%s)", self.name)
+            for callback in self._on_close:
+                try:
+                    callback()
+                except Exception:
+                    app.logger.exception("Devre kapanış callback hatası")
+
+    def record_failure(self, exc=None):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state("open")
+                app.logger.error("DB devre kesici açıldı (%s): %s", self.name, exc)
+
+    def _set_state(self, state: str):
+        self.state = state
+        metrics.set("db_circuit_state", self.STATE_VALUES[state], (("db", self.name),))
+
+
+class TimedQueuePool(QueuePool):
+    """
+    Checkout bekleme süresini ve havuz zaman aşımlarını metriklere yazan QueuePool.
+    breaker atanmışsa devre açıkken bağlantı beklemeden DatabaseUnavailable fırlatır.
+    """
+
+    breaker = None
+
+    def recreate(self):
+        # dispose() havuzu yeniden oluşturur; devre kesici durumu korunmalı
+        pool = super().recreate()
+        pool.breaker = self.breaker
+        return pool
+
+    def _do_get(self):
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            raise DatabaseUnavailable("Veritabanına şu an ulaşılamıyor")
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError as e:
+            metrics.inc("db_pool_timeouts_total")
+            if breaker is not None:
+                breaker.record_failure(e)
+            raise
+        except Exception as e:
+            # Yeni bağlantı açılamadı (DNS, TCP, auth, connect_timeout)
+            if breaker is not None:
+                breaker.record_failure(e)
+            raise
+        finally:
+            metrics.observe("db_pool_wait_seconds", time.perf_counter() - t0)
+
+
+def _apply_statement_timeout(dbapi_connection, connection_record, timeout_ms: int):
+    # connection_record.info bağlantıya özeldir (invalidate/yeniden bağlanmada silinir);
+    # değer zaten buysa sunucuya hiç gidilmez
+    if connection_record.info.get("statement_timeout") == timeout_ms:
+        return
+    # Checkout anında bağlantıda açık transaction yoktur. SET autocommit'te tek
+    # başına çalışır: BEGIN/COMMIT turu olmadan oturum düzeyinde kalıcıdır ve
+    # havuzun reset-on-return rollback'i onu geri almaz.
+    dbapi_connection.autocommit = True
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET SESSION statement_timeout = {int(timeout_ms)}")
+        finally:
+            cursor.close()
+    finally:
+        dbapi_connection.autocommit = False
+    connection_record.info["statement_timeout"] = timeout_ms
+
+
+@event.listens_for(Pool, "checkout")
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    # Yalnızca bu bağlantıda route sınıfı değiştiğinde tek bir SET turu yapılır
+    timeout_ms = STATEMENT_TIMEOUTS_MS[current_route_class()]
+    if timeout_ms:
+        _apply_statement_timeout(dbapi_connection, connection_record, timeout_ms)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_db_error(context):
+    # Iyimser kopma yönetimi: SQLAlchemy kopmada havuzu zaten geçersiz kılar;
+    # burada sadece sayıyoruz. Sonraki checkout taze bağlantı açar.
+    if context.is_disconnect:
+        metrics.inc("db_disconnects_total")
+        app.logger.warning("DB bağlantısı koptu, havuz yenilenecek: %s", context.original_exception)
+
+    # Bağlantı açma hataları havuzda sayılır (context.connection yok); burada
+    # kopmalar ve statement_timeout iptalleri (57014) devre kesiciye yazılır.
+    breaker = getattr(context.engine.pool, "breaker", None) if context.engine else None
+    if breaker is not None and context.connection is not None:
+        if context.is_disconnect or getattr(context.original_exception, "pgcode", None) == "57014":
+            breaker.record_failure(context.original_exception)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _breaker_success(conn, cursor, statement, parameters, context, executemany):
+    breaker = getattr(conn.engine.pool, "breaker", None)
+    if breaker is not None:
+        breaker.record_success()
+
+
 app.config["SQLALCHEMY_DATABASE_URI"] = get_db_url()
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_pre_ping": True,
-    "pool_recycle": 300,
+    "poolclass": TimedQueuePool,
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+    # LIFO: boşta kalan fazla bağlantılar sunucu tarafında zaman aşımına uğrayabilsin
+    "pool_use_lifo": True,
+    "connect_args": {"connect_timeout": DB_CONNECT_TIMEOUT},
+    "query_cache_size": DB_QUERY_CACHE_SIZE,
 }
+if DB_POOL_SIZE < _requested_pool_size or DB_MAX_OVERFLOW < _requested_max_overflow:
+    app.logger.warning(
+        "DB havuzu bütçeye kırpıldı: istenen pool=%s overflow=%s, uygulanan pool=%s overflow=%s "
+        "(DB_MAX_CONNECTIONS=%s / WEB_CONCURRENCY=%s)",
+        _requested_pool_size, _requested_max_overflow, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+        DB_MAX_CONNECTIONS, WEB_CONCURRENCY,
+    )
+if DB_POOL_SIZE + DB_MAX_OVERFLOW < GUNICORN_THREADS:
+    app.logger.warning(
+        "DB havuzu (%s) thread sayısından (%s) küçük; fazla thread'ler havuzda bekler (DB_POOL_TIMEOUT=%ss)",
+        DB_POOL_SIZE + DB_MAX_OVERFLOW, GUNICORN_THREADS, DB_POOL_TIMEOUT,
+    )
+
+REPLICA_DB_URL = get_replica_db_url()
+if REPLICA_DB_URL:
+    # Ana engine ile aynı havuz ayarları (SQLALCHEMY_ENGINE_OPTIONS) bind'lere de uygulanır
+    app.config["SQLALCHEMY_BINDS"] = {"replica": REPLICA_DB_URL}
 db = SQLAlchemy(app)
 
-def get_db_connection():
-    return db.engine.connect()
+# Devre kesici yalnızca primary'de; replika hatalarını ReplicaRouter zaten yönetir
+db_breaker = CircuitBreaker("primary", DB_BREAKER_FAILURES, DB_BREAKER_RESET_SECONDS)
+with app.app_context():
+    db.engine.pool.breaker = db_breaker
+
+# Bağlantı kurulamadığını gösteren hatalar (salt okunur moda düşme koşulu)
+DB_UNAVAILABLE_ERRORS = (DatabaseUnavailable, OperationalError, PoolTimeoutError)
+
+def get_db_connection():
+    return db.engine.connect()
+
+# -----------------------------------------------------
+# Okuma replikası yönlendirmesi
+# -----------------------------------------------------
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+# Kullanıcı bir şey yazdıktan sonra bu süre boyunca okumaları primary'den yap
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "15"))
+# Süre oturumda değil ayrı, kısa ömürlü bir çerezde tutulur: her yazma oturumu
+# (web_sessions satırı + oturum çerezi) yeniden yazmasın. Çerez yalnızca okuma
+# yönlendirme ipucudur; sahtesi en fazla okumaları primary'ye yönlendirir.
+READ_YOUR_WRITES_COOKIE = "rw_until"
+
+
+class ReplicaRouter:
+    """
+    Salt okunur sorguları replikaya yönlendirir; replika gecikmeliyse veya
+    hata veriyorsa primary'ye düşer. Durum worker başına tutulur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag_checked_at = 0.0
+        self._lag_ok = True
+        self._down_until = 0.0
+
+    def _check_lag(self, engine) -> bool:
+        now = time.monotonic()
+        if now - self._lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+            return self._lag_ok
+        with self._lock:
+            if now - self._lag_checked_at < REPLICA_LAG_CHECK_SECONDS:
+                return self._lag_ok
+            self._lag_checked_at = now
+            with engine.connect() as conn:
+                # Replay tamamsa gecikme 0 (boşta bekleyen primary'de timestamp eskir)
+                lag = conn.execute(text("""
+                    SELECT CASE
+                        WHEN NOT pg_is_in_recovery() THEN 0
+                        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                    END
+                """)).scalar() or 0
+            metrics.set("db_replica_lag_seconds", float(lag))
+            self._lag_ok = float(lag) <= REPLICA_MAX_LAG_SECONDS
+            return self._lag_ok
+
+    def _mark_down(self, exc):
+        self._down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        app.logger.warning("Replika kullanılamıyor, %ss primary'ye düşülüyor: %s", REPLICA_RETRY_SECONDS, exc)
+
+    def connect(self):
+        reason = self._primary_reason()
+        if reason is None:
+            engine = db.engines["replica"]
+            try:
+                if self._check_lag(engine):
+                    conn = engine.connect()
+                    metrics.inc("db_read_routing_total", (("target", "replica"), ("reason", "ok")))
+                    return conn
+                reason = "lag"
+            except Exception as e:
+                self._mark_down(e)
+                reason = "error"
+        metrics.inc("db_read_routing_total", (("target", "primary"), ("reason", reason)))
+        return get_db_connection()
+
+    def _primary_reason(self):
+        if not REPLICA_DB_URL:
+            return "no_replica"
+        if time.monotonic() < self._down_until:
+            return "replica_down"
+        if has_request_context():
+            if g.get("primary_reads") or _read_your_writes_deadline() > time.time():
+                return "read_your_writes"
+        return None
+
+
+replica_router = ReplicaRouter()
+
+
+def get_read_connection():
+    """
+    Salt okunur sorgular için bağlantı: replika varsa ve sağlıklıysa oradan,
+    yoksa primary'den. Yazma akışları get_db_connection()/db.engine.begin() kullanır.
+    """
+    return replica_router.connect()
+
+
+def mark_primary_reads():
+    """
+    Yazma sonrası çağrılır: bu istekte ve (çerezi taşıyan istemci için) kısa bir
+    süre boyunca okumalar primary'den yapılır, kullanıcı kendi yazdığını görür.
+    """
+    g.primary_reads = True
+    g.set_rw_cookie = True
+
+
+def _read_your_writes_deadline() -> float:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+@app.after_request
+def _read_your_writes_cookie(response):
+    if g.get("set_rw_cookie") and READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            secure=app.session_interface.get_cookie_secure(app),
+            samesite="Lax",
+        )
+    return response
+
+# -----------------------------------------------------
+# Salt okunur (degraded) mod: snapshot'lar ve rapor kuyruğu
+# -----------------------------------------------------
+# DB'ye ulaşılamazken kategoriler, önlemler ve raporların ilk sayfası son başarılı
+# okumanın yerel kopyasından sunulur; gelen raporlar yerel bir dosyaya (JSON satırları)
+# yazılıp devre kapanınca DB'ye aktarılır. Dizin worker'lar arasında paylaşılır;
+# üretimde kalıcı bir diske (volume) bağlayın.
+DEGRADED_DATA_DIR = os.getenv("DEGRADED_DATA_DIR") or os.path.join(tempfile.gettempdir(), "exp-degraded")
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "60"))
+REPORT_SPOOL_PATH = os.path.join(DEGRADED_DATA_DIR, "report_spool.jsonl")
+
+_snapshot_saved_at = {}
+_REPLAY_LOCK = threading.Lock()
+
+
+def _snapshot_path(name: str) -> str:
+    return os.path.join(DEGRADED_DATA_DIR, f"snapshot_{name}.json")
+
+
+def save_snapshot(name: str, data):
+    """
+    Başarılı bir okumanın sonucunu diske yazar (en fazla SNAPSHOT_REFRESH_SECONDS'ta bir).
+    Yazım atomiktir: yarım dosya okunmaz.
+    """
+    now = time.monotonic()
+    if now - _snapshot_saved_at.get(name, -SNAPSHOT_REFRESH_SECONDS) < SNAPSHOT_REFRESH_SECONDS:
+        return
+    _snapshot_saved_at[name] = now
+    try:
+        os.makedirs(DEGRADED_DATA_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=DEGRADED_DATA_DIR, prefix=".snapshot-")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"saved_at": datetime.utcnow().isoformat(), "data": data}, fh, ensure_ascii=False)
+        os.replace(tmp_path, _snapshot_path(name))
+    except Exception:
+        app.logger.exception("Snapshot yazılamadı: %s", name)
+
+
+def load_snapshot(name: str):
+    """
+    (data, saved_at) veya snapshot yoksa None.
+    """
+    try:
+        with open(_snapshot_path(name), encoding="utf-8") as fh:
+            payload = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    metrics.inc("degraded_responses_total", (("snapshot", name),))
+    return payload["data"], payload["saved_at"]
+
+
+MAX_WITNESSES = 20
+
+
+def parse_witness_ids(values) -> list[int]:
+    ids = []
+    for value in values or []:
+        try:
+            uid = int(value)
+        except (TypeError, ValueError):
+            continue
+        if uid > 0 and uid not in ids:
+            ids.append(uid)
+    return ids[:MAX_WITNESSES]
+
+
+def resolve_witnesses(conn, witness_ids, witnesses_text) -> list[int]:
+    """
+    Öneriden seçilen id'ler ve serbest metindeki isimler tek sorguda kullanıcıya
+    çözülür. İsimler yalnızca tek bir kullanıcıyla birebir (büyük/küçük harf
+    duyarsız) eşleşiyorsa kabul edilir.
+    """
+    names = [n.strip().lower() for n in (witnesses_text or "").split(",") if n.strip()][:MAX_WITNESSES]
+    if not witness_ids and not names:
+        return []
+    rows = conn.execute(
+        text("""
+            SELECT id FROM users WHERE id = ANY(:ids)
+            UNION
+            SELECT MIN(id) FROM users
+            WHERE LOWER(fullname) = ANY(:names)
+            GROUP BY LOWER(fullname)
+            HAVING COUNT(*) = 1
+        """),
+        {"ids": list(witness_ids), "names": names}
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def backfill_report_witnesses(batch_size: int = 10000) -> int:
+    """
+    Eski raporların serbest metin witnesses alanını report_witnesses'a aktarır
+    (resolve_witnesses ile aynı kural: tekil ve birebir isim eşleşmesi).
+    report_id aralıkları halinde ilerler. Dönüş: eklenen satır sayısı.
+    """
+    with get_db_connection() as conn:
+        max_id = conn.execute(text("SELECT COALESCE(MAX(report_id), 0) FROM reports")).scalar()
+
+    inserted, start = 0, 0
+    while start < max_id:
+        with db.engine.begin() as conn:
+            result = conn.execute(
+                text("""
+                    INSERT INTO report_witnesses (report_id, user_id)
+                    SELECT r.report_id, u.id
+                    FROM reports r
+                    CROSS JOIN LATERAL unnest(string_to_array(r.witnesses, ',')) AS w(name)
+                    JOIN (
+                        SELECT LOWER(fullname) AS lname, MIN(id) AS id
+                        FROM users
+                        GROUP BY LOWER(fullname)
+                        HAVING COUNT(*) = 1
+                    ) u ON u.lname = LOWER(btrim(w.name))
+                    WHERE r.report_id > :start AND r.report_id <= :end
+                      AND r.witnesses IS NOT NULL
+                    ON CONFLICT DO NOTHING
+                """),
+                {"start": start, "end": start + batch_size}
+            )
+        inserted += result.rowcount
+        start += batch_size
+    return inserted
+
+
+def insert_report(conn, entry: dict) -> int:
+    """
+    Tek rapor satırı yazar ve report_id döner. entry'de uid yoksa email ile
+    kullanıcı çözülür (mobil rapor DB yokken kuyruğa alındıysa). Tanıklar aynı
+    transaction'da report_witnesses'a yazılır.
+    """
+    uid, fullname = entry.get("uid"), entry.get("fullname")
+    if uid is None:
+        user = conn.execute(
+            text("SELECT id, fullname FROM users WHERE LOWER(email)=LOWER(:e) LIMIT 1"),
+            {"e": entry.get("email") or ""}
+        ).mappings().first()
+        if not user:
+            raise ValueError(f"Kullanıcı bulunamadı: {entry.get('email')}")
+        uid, fullname = user["id"], user["fullname"] or ""
+
+    report_id = conn.execute(
+        text("""
+            INSERT INTO reports (id, type, date, fullname, details, witnesses, department)
+            VALUES (
+                :uid, :type, :date,
+                -- Oturumdaki ad eskimiş olabilir; listeler bu kolonu okur
+                COALESCE((SELECT fullname FROM users WHERE id = :uid), :fullname),
+                :details, :witnesses, :department
+            )
+            RETURNING report_id
+        """),
+        {
+            "uid": uid,
+            "type": entry["type"],
+            "date": entry["date"],
+            "fullname": fullname,
+            "details": entry.get("details"),
+            "witnesses": entry.get("witnesses"),
+            "department": entry.get("department"),
+        }
+    ).scalar()
+
+    witness_user_ids = resolve_witnesses(conn, entry.get("witness_ids") or [], entry.get("witnesses"))
+    if witness_user_ids:
+        conn.execute(
+            text("""
+                INSERT INTO report_witnesses (report_id, user_id)
+                SELECT :rid, unnest(CAST(:uids AS INTEGER[]))
+                ON CONFLICT DO NOTHING
+            """),
+            {"rid": report_id, "uids": witness_user_ids}
+        )
+    return report_id
+
+
+def spool_report(entry: dict):
+    """
+    Raporu yerel kuyruğa ekler (flock + fsync; birden çok worker aynı dosyaya yazar).
+    """
+    record = dict(entry)
+    if isinstance(record.get("date"), datetime):
+        record["date"] = record["date"].isoformat()
+    os.makedirs(DEGRADED_DATA_DIR, exist_ok=True)
+    with open(REPORT_SPOOL_PATH, "a", encoding="utf-8") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+    metrics.inc("report_spool_total", (("result", "queued"),))
+
+
+def store_report(entry: dict) -> bool:
+    """
+    Raporu DB'ye yazar; DB'ye ulaşılamıyorsa kuyruğa alır.
+    Dönüş: True = yazıldı, False = kuyruğa alındı.
+    """
+    try:
+        with db.engine.begin() as conn:
+            insert_report(conn, entry)
+        return True
+    except DB_UNAVAILABLE_ERRORS as e:
+        app.logger.warning("DB'ye ulaşılamıyor, rapor kuyruğa alındı: %s", e)
+        spool_report(entry)
+        return False
+
+
+def replay_spooled_reports() -> int:
+    """
+    Kuyruktaki raporları tek transaction'da (satır başına SAVEPOINT) DB'ye aktarır.
+    Veri hatası veren satırlar .failed dosyasına taşınır. DB hâlâ yoksa kuyruk
+    olduğu gibi bırakılır. Dönüş: aktarılan rapor sayısı.
+    """
+    if not os.path.exists(REPORT_SPOOL_PATH):
+        return 0
+    with _REPLAY_LOCK, open(REPORT_SPOOL_PATH, "r+", encoding="utf-8") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            lines = [line for line in fh.read().splitlines() if line.strip()]
+            if not lines:
+                return 0
+
+            failed = []
+            try:
+                with db.engine.begin() as conn:
+                    for line in lines:
+                        try:
+                            with conn.begin_nested():
+                                insert_report(conn, json.loads(line))
+                        except DB_UNAVAILABLE_ERRORS:
+                            raise
+                        except Exception as e:
+                            app.logger.error("Kuyruktaki rapor aktarılamadı: %s", e)
+                            failed.append(line)
+            except DB_UNAVAILABLE_ERRORS as e:
+                app.logger.warning("Kuyruk aktarımı ertelendi, DB yok: %s", e)
+                return 0
+
+            if failed:
+                with open(REPORT_SPOOL_PATH + ".failed", "a", encoding="utf-8") as failed_fh:
+                    failed_fh.write("\n".join(failed) + "\n")
+                metrics.inc("report_spool_total", (("result", "failed"),), len(failed))
+
+            fh.seek(0)
+            fh.truncate()
+            fh.flush()
+            os.fsync(fh.fileno())
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+    replayed = len(lines) - len(failed)
+    metrics.inc("report_spool_total", (("result", "replayed"),), replayed)
+    app.logger.warning("Kuyruktan %s rapor aktarıldı (%s hatalı)", replayed, len(failed))
+    return replayed
+
+
+@db_breaker.on_close
+def _replay_after_recovery():
+    # İsteği bekletmemek için arka planda
+    def run():
+        with app.app_context():
+            try:
+                replay_spooled_reports()
+            except Exception:
+                app.logger.exception("Kuyruk aktarımı başarısız")
+    threading.Thread(target=run, name="report-spool-replay", daemon=True).start()
+
+
+def spooled_response(message: str):
+    return jsonify({
+        "success": True,
+        "queued": True,
+        "message": f"{message} (veritabanına şu an ulaşılamıyor; bağlantı gelince kaydedilecek)",
+    }), 202
+
+
+def db_unavailable_response():
+    return jsonify({"success": False, "message": "Veritabanına şu an ulaşılamıyor, lütfen biraz sonra tekrar deneyin"}), 503
+
+# -----------------------------------------------------
+# Metrikler: route gecikmeleri, DB süresi, yavaş sorgular
+# -----------------------------------------------------
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+# /metrics için Bearer token; tanımlı değilse uç noktalar yalnızca admin oturumuna açıktır
+METRICS_TOKEN = (os.getenv("METRICS_TOKEN") or "").strip()
+
+# Çok process'li (gunicorn) çalışmada her worker kendi metriklerini bu dizine
+# yazar; /metrics hangi worker'a düşerse düşsün tüm dosyaları birleştirip döner
+# (prometheus_client multiprocess modu gibi). Dizin tmpfs olmalı ve sunucu
+# açılışında boşaltılmalıdır (gunicorn.conf.py on_starting). Boşsa: worker başına.
+METRICS_MULTIPROC_DIR = (os.getenv("METRICS_MULTIPROC_DIR") or "").strip()
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+class MetricsRegistry:
+    """
+    Process başına bellek içi metrik deposu.
+    Counter/gauge/histogram tutar ve Prometheus metin formatında dışa aktarır.
+
+    multiproc_dir verilirse her process durumunu metrics_<pid>.json olarak oraya
+    yazar (flush) ve render() tüm dosyaları birleştirir: counter ve histogram'lar
+    toplanır (ölen/yenilenen worker'larınki metrics_dead.json'da birikir, sayaçlar
+    sıfırlanmaz), gauge'lar yalnızca yaşayan process'lerden pid etiketiyle gelir.
+    """
+
+    DEAD_FILE = "metrics_dead.json"
+
+    def __init__(self, multiproc_dir: str = ""):
+        self._lock = threading.Lock()
+        self._meta = {}        # name -> (type, help, buckets)
+        self._values = {}      # (name, labels) -> float
+        self._histograms = {}  # (name, labels) -> [bucket sayaçları..., sum, count]
+        self.slow_queries = deque(maxlen=50)
+        self.multiproc_dir = multiproc_dir
+        self._flusher = None
+
+    def describe(self, name, kind, help_text, buckets=None):
+        self._meta[name] = (kind, help_text, buckets)
+
+    def inc(self, name, labels=(), value=1.0):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name, value, labels=()):
+        with self._lock:
+            self._values[(name, tuple(labels))] = float(value)
+
+    def observe(self, name, value, labels=()):
+        buckets = self._meta[name][2]
+        key = (name, tuple(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for i, upper in enumerate(buckets):
+                if value <= upper:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    @staticmethod
+    def _fmt_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " "))
+            for k, v in pairs
+        )
+        return "{" + body + "}"
+
+    def _local_state(self):
+        with self._lock:
+            values = dict(self._values)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+        return values, histograms
+
+    # ---- çok process'li birleştirme ----
+    @staticmethod
+    def _encode(values, histograms, slow_queries=()):
+        return {
+            "values": [[name, [list(p) for p in labels], v] for (name, labels), v in values.items()],
+            "histograms": [[name, [list(p) for p in labels], h] for (name, labels), h in histograms.items()],
+            "slow_queries": list(slow_queries),
+        }
+
+    @staticmethod
+    def _decode(payload):
+        values = {(name, tuple(tuple(p) for p in labels)): v for name, labels, v in payload.get("values", [])}
+        histograms = {(name, tuple(tuple(p) for p in labels)): h for name, labels, h in payload.get("histograms", [])}
+        return values, histograms, payload.get("slow_queries", [])
+
+    def _write_json(self, filename: str, payload):
+        path = os.path.join(self.multiproc_dir, filename)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _read_json(self, filename: str):
+        try:
+            with open(os.path.join(self.multiproc_dir, filename), encoding="utf-8") as fh:
+                return self._decode(json.load(fh))
+        except FileNotFoundError:
+            return {}, {}, []
+        except ValueError:
+            app.logger.warning("Bozuk metrik dosyası atlandı: %s", filename)
+            return {}, {}, []
+
+    def flush(self):
+        """Bu process'in durumunu paylaşılan dizine atomik olarak yazar."""
+        if not self.multiproc_dir:
+            return
+        values, histograms = self._local_state()
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        self._write_json(f"metrics_{os.getpid()}.json", self._encode(values, histograms, self.slow_queries))
+
+    def start_flusher(self):
+        """Worker'da çağrılır: METRICS_FLUSH_SECONDS'ta bir ve çıkışta flush eder."""
+        if not self.multiproc_dir or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        def loop():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError:
+                    app.logger.exception("Metrikler yazılamadı: %s", self.multiproc_dir)
+
+        self._flusher = threading.Thread(target=loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _add(self, values, histograms, src_values, src_histograms, pid=None):
+        for (name, labels), v in src_values.items():
+            kind = self._meta.get(name, ("gauge",))[0]
+            if kind == "gauge":
+                if pid is None:
+                    continue
+                labels = labels + (("pid", pid),)
+                values[(name, labels)] = v
+            else:
+                values[(name, labels)] = values.get((name, labels), 0.0) + v
+        for key, hist in src_histograms.items():
+            acc = histograms.get(key)
+            histograms[key] = list(hist) if acc is None else [a + b for a, b in zip(acc, hist)]
+
+    def collect(self):
+        """
+        Tüm process'lerin birleşik (values, histograms, slow_queries) görünümü.
+        Ölmüş process dosyaları kilit altında metrics_dead.json'a katlanıp silinir.
+        """
+        if not self.multiproc_dir:
+            values, histograms = self._local_state()
+            return values, histograms, list(self.slow_queries)
+
+        self.flush()
+        own = os.getpid()
+        values, histograms, slow = {}, {}, []
+        with open(os.path.join(self.multiproc_dir, ".lock"), "a") as lock_fh:
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+            try:
+                dead_values, dead_histograms, _ = self._read_json(self.DEAD_FILE)
+                folded = []
+                for filename in os.listdir(self.multiproc_dir):
+                    m = re.fullmatch(r"metrics_(\d+)\.json", filename)
+                    if not m:
+                        continue
+                    pid = int(m.group(1))
+                    src_values, src_histograms, src_slow = self._read_json(filename)
+                    if pid == own or self._pid_alive(pid):
+                        self._add(values, histograms, src_values, src_histograms, pid)
+                        slow.extend(src_slow)
+                    else:
+                        self._add(dead_values, dead_histograms, src_values, src_histograms)
+                        folded.append(filename)
+                if folded:
+                    self._write_json(self.DEAD_FILE, self._encode(dead_values, dead_histograms))
+                    for filename in folded:
+                        os.remove(os.path.join(self.multiproc_dir, filename))
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+        self._add(values, histograms, dead_values, dead_histograms)
+        slow.sort(key=lambda item: item.get("at", ""))
+        return values, histograms, slow[-self.slow_queries.maxlen:]
+
+    def render(self) -> str:
+        values, histograms, _ = self.collect()
+
+        lines = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (hname, labels), hist in sorted(histograms.items(), key=lambda kv: str(kv[0])):
+                    if hname != name:
+                        continue
+                    for i, upper in enumerate(buckets):
+                        lines.append(f"{name}_bucket{self._fmt_labels(labels, [('le', upper)])} {hist[i]}")
+                    lines.append(f"{name}_bucket{self._fmt_labels(labels, [('le', '+Inf')])} {hist[-1]}")
+                    lines.append(f"{name}_sum{self._fmt_labels(labels)} {hist[-2]}")
+                    lines.append(f"{name}_count{self._fmt_labels(labels)} {hist[-1]}")
+            else:
+                for (vname, labels), value in sorted(values.items(), key=lambda kv: str(kv[0])):
+                    if vname == name:
+                        lines.append(f"{name}{self._fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(METRICS_MULTIPROC_DIR)
+metrics.describe("http_requests_total", "counter", "Route, method ve durum koduna göre istek sayısı")
+metrics.describe("http_request_duration_seconds", "histogram", "Route bazında toplam istek süresi", LATENCY_BUCKETS)
+metrics.describe("http_request_db_seconds", "histogram", "İstek başına veritabanında geçen süre", LATENCY_BUCKETS)
+metrics.describe("http_request_python_seconds", "histogram", "İstek başına Python tarafında geçen süre", LATENCY_BUCKETS)
+metrics.describe("http_request_queries", "histogram", "İstek başına çalıştırılan SQL sayısı", QUERY_COUNT_BUCKETS)
+metrics.describe("db_slow_queries_total", "counter", f"{SLOW_QUERY_MS:g} ms üzerindeki sorgu sayısı")
+metrics.describe("db_up", "gauge", "Son /metrics çağrısında veritabanı erişilebilir mi (1/0)")
+metrics.describe("db_pool_wait_seconds", "histogram", "Havuzdan bağlantı alma (checkout) bekleme süresi", LATENCY_BUCKETS)
+metrics.describe("db_pool_timeouts_total", "counter", "pool_timeout aşılarak başarısız olan checkout sayısı")
+metrics.describe("db_disconnects_total", "counter", "Kopma nedeniyle geçersiz kılınan bağlantı sayısı")
+metrics.describe("db_pool_connections", "gauge", "Havuz durumu (state=size|checked_out|overflow)")
+metrics.describe("db_read_routing_total", "counter", "Okuma bağlantılarının yönlendirildiği hedef ve nedeni")
+metrics.describe("db_replica_lag_seconds", "gauge", "Son ölçülen replika gecikmesi")
+metrics.describe("session_lookups_total", "counter", "Sunucu tarafı oturum okumaları (source=lru|db)")
+metrics.describe("session_expired_deleted_total", "counter", "Temizlenen süresi dolmuş oturum sayısı")
+metrics.describe("template_fragment_cache_total", "counter", "Şablon fragment cache isabetleri (result=hit|miss)")
+metrics.describe("db_circuit_state", "gauge", "DB devre kesici durumu (0=closed, 1=half_open, 2=open)")
+metrics.describe("db_circuit_rejections_total", "counter", "Devre açıkken beklemeden reddedilen bağlantı istekleri")
+metrics.describe("degraded_responses_total", "counter", "DB yokken snapshot'tan sunulan yanıtlar (snapshot=ad)")
+metrics.describe("report_spool_total", "counter", "Yerel kuyruğa alınan / yeniden oynatılan raporlar (result=queued|replayed|failed)")
+metrics.describe("rate_limited_total", "counter", "Hız sınırına takılıp 429 alan istekler (policy, route, scope=ip|user)")
+metrics.describe("db_compiled_cache_total", "counter", "Derlenmiş SQL cache'i (construct=core|text|driver, result=hit|miss|uncached)")
+metrics.describe("db_compiled_cache_entries", "gauge", "Engine'in derlenmiş SQL cache'indeki giriş sayısı (engine=primary|replica)")
+metrics.describe("report_facet_cache_total", "counter", "Rapor facet sayımı cache isabetleri (result=hit|miss)")
+metrics.describe("app_warmup_seconds", "gauge", "Son açılış ısınmasında adım süreleri (task=schema|pool|templates|caches)")
+metrics.describe("app_warmup_errors_total", "counter", "Başarısız ısınma adımları (task)")
+metrics.describe("retention_deleted_total", "counter", "Saklama süresi dolduğu için silinen kayıtlar (kind=reports|files, policy)")
+metrics.describe("retention_batches_total", "counter", "Retention silme grubu sayısı (policy)")
+metrics.describe("retention_last_report_id", "gauge", "Retention'ın son sildiği report_id (ilerleme, policy)")
+metrics.describe("retention_last_run_seconds", "gauge", "Son retention çalıştırmasının süresi")
+metrics.describe("retention_last_run_timestamp", "gauge", "Son retention çalıştırmasının bitiş zamanı (unix)")
+metrics.describe("reporter_sync_updated_total", "counter", "Ad değişikliği nedeniyle güncellenen rapor sayısı (reports.fullname)")
+metrics.describe("scheduler_leader", "gauge", "Bu worker zamanlayıcı lideri mi (1/0)")
+metrics.describe("scheduler_job_runs_total", "counter", "Zamanlanmış iş çalıştırmaları (job, status=ok|error|skipped)")
+metrics.describe("scheduler_job_last_duration_seconds", "gauge", "İşin son çalıştırma süresi (job)")
+metrics.describe("scheduler_job_last_success_timestamp", "gauge", "İşin son başarılı bitişi, unix (job)")
+
+
+_SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Yavaş sorgu logu için SQL'i sadeleştirir: boşlukları tekler, sabitleri ? yapar.
+    """
+    statement = _SQL_LITERAL_RE.sub("?", statement or "")
+    return _SQL_SPACE_RE.sub(" ", statement).strip()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    if has_request_context() and "req_start" in g:
+        g.db_time += elapsed
+        g.db_queries += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        normalized = normalize_sql(statement)
+        route = request.url_rule.rule if has_request_context() and request.url_rule else "-"
+        metrics.inc("db_slow_queries_total")
+        metrics.slow_queries.append({
+            "ms": round(elapsed * 1000, 1),
+            "route": route,
+            "sql": normalized,
+            "at": datetime.utcnow().isoformat(),
+        })
+        app.logger.warning("Yavaş sorgu (%.1f ms) [%s]: %s", elapsed * 1000, route, normalized)
+
+
+# Derlenmiş cache sonucu: text() de cache'lenir ama f-string'le değişen metin her
+# seferinde yeni bir giriş (miss) demektir; driver = exec_driver_sql (derleme yok)
+_COMPILED_CACHE_RESULTS = {"CACHE_HIT": "hit", "CACHE_MISS": "miss"}
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _compiled_cache_stats(conn, cursor, statement, parameters, context, executemany):
+    compiled = getattr(context, "compiled", None)
+    if compiled is None:
+        construct = "driver"
+    else:
+        construct = "text" if getattr(compiled.statement, "__visit_name__", "") == "textclause" else "core"
+    result = _COMPILED_CACHE_RESULTS.get(context.cache_hit.name, "uncached")
+    metrics.inc("db_compiled_cache_total", (("construct", construct), ("result", result)))
+
+
+@app.before_request
+def _metrics_start():
+    g.req_start = time.perf_counter()
+    g.db_time = 0.0
+    g.db_queries = 0
+
+
+def _record_request(status_code: int):
+    if "req_start" not in g or g.get("metrics_recorded"):
+        return
+    g.metrics_recorded = True
+
+    total = time.perf_counter() - g.req_start
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    labels = (("route", route), ("method", request.method))
+
+    metrics.inc("http_requests_total", labels + (("status", status_code),))
+    metrics.observe("http_request_duration_seconds", total, labels)
+    metrics.observe("http_request_db_seconds", g.db_time, labels)
+    metrics.observe("http_request_python_seconds", max(total - g.db_time, 0.0), labels)
+    metrics.observe("http_request_queries", g.db_queries, labels)
+
+
+@app.after_request
+def _metrics_after(response):
+    _record_request(response.status_code)
+    return response
+
+
+@app.teardown_request
+def _metrics_teardown(exc):
+    # after_request'e ulaşamayan (yakalanmamış hata) istekler
+    if exc is not None:
+        _record_request(500)
+
+# -----------------------------------------------------
+# Sunucu tarafı oturum (opsiyonel)
+# -----------------------------------------------------
+# cookie: Flask'ın imzalı cookie oturumu (varsayılan)
+# server: cookie'de sadece imzalı oturum id'si, veri Postgres'te + worker içi LRU
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cookie").strip().lower()
+SESSION_LIFETIME_SECONDS = int(os.getenv("SESSION_LIFETIME_SECONDS", str(14 * 24 * 3600)))
+SESSION_LRU_SIZE = int(os.getenv("SESSION_LRU_SIZE", "4096"))
+SESSION_CLEANUP_BATCH = int(os.getenv("SESSION_CLEANUP_BATCH", "500"))
+SESSION_CLEANUP_EVERY = int(os.getenv("SESSION_CLEANUP_EVERY", "200"))  # ~her N kayıtta bir temizlik turu
+# Değişen oturumun eski id'si, paralel istekler kırılmasın diye kısa bir süre daha geçerli
+SESSION_ROTATE_GRACE_SECONDS = int(os.getenv("SESSION_ROTATE_GRACE_SECONDS", "30"))
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class PostgresSessionInterface(SessionInterface):
+    """
+    Oturum verisi web_sessions tablosunda, cookie'de yalnızca imzalı id.
+
+    Kayıtlar değişmezdir: oturum her değiştiğinde yeni bir id üretilir ve eski
+    id kısa bir süre sonra geçersiz olur. Böylece worker'lardaki LRU önbellekleri
+    hiçbir zaman bayat veri döndürmez ve değişmeyen isteklerde DB'ye yazılmaz,
+    Set-Cookie de gönderilmez.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # sid -> serileştirilmiş veri; her açılışta yeniden çözülür ki istek içi
+        # değişiklikler (örn. _flashes listesine append) önbelleği bozmasın
+        self._lru = OrderedDict()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="server-session")
+
+    # ---- LRU ----
+    def _cache_get(self, sid):
+        with self._lock:
+            payload = self._lru.get(sid)
+            if payload is not None:
+                self._lru.move_to_end(sid)
+            return payload
+
+    def _cache_put(self, sid, payload):
+        with self._lock:
+            self._lru[sid] = payload
+            self._lru.move_to_end(sid)
+            while len(self._lru) > SESSION_LRU_SIZE:
+                self._lru.popitem(last=False)
+
+    def _cache_drop(self, sid):
+        with self._lock:
+            self._lru.pop(sid, None)
+
+    # ---- DB ----
+    def _load(self, sid):
+        payload = self._cache_get(sid)
+        if payload is not None:
+            metrics.inc("session_lookups_total", (("source", "lru"),))
+            return self.serializer.loads(payload)
+        try:
+            with get_db_connection() as conn:
+                row = conn.execute(
+                    text("SELECT data FROM web_sessions WHERE sid=:sid AND expires_at > NOW()"),
+                    {"sid": sid}
+                ).fetchone()
+        except Exception:
+            app.logger.exception("Oturum okunamadı")
+            return None
+        metrics.inc("session_lookups_total", (("source", "db"),))
+        if not row:
+            return None
+        self._cache_put(sid, row[0])
+        return self.serializer.loads(row[0])
+
+    def cached_value(self, app, request, key):
+        """Oturumdaki bir değer, yalnızca kayıt LRU'daysa (DB'ye gitmez)."""
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return None
+        try:
+            sid = self._signer(app).unsign(cookie).decode()
+        except BadSignature:
+            return None
+        payload = self._cache_get(sid)
+        return self.serializer.loads(payload).get(key) if payload is not None else None
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self._load(sid)
+                if data is not None:
+                    return ServerSession(data, sid=sid)
+        return ServerSession(sid=None, new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session.modified:
+            return
+
+        old_sid = session.sid
+        if not session:
+            # logout / session.clear(): eski kaydı hemen sil
+            if old_sid:
+                self._cache_drop(old_sid)
+                with db.engine.begin() as conn:
+                    conn.execute(text("DELETE FROM web_sessions WHERE sid=:sid"), {"sid": old_sid})
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        new_sid = secrets.token_urlsafe(24)
+        payload = self.serializer.dumps(dict(session))
+        with db.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO web_sessions (sid, data, expires_at)
+                VALUES (:sid, :data, NOW() + make_interval(secs => :ttl))
+            """), {"sid": new_sid, "data": payload, "ttl": SESSION_LIFETIME_SECONDS})
+            if old_sid:
+                conn.execute(text("""
+                    UPDATE web_sessions
+                    SET expires_at = LEAST(expires_at, NOW() + make_interval(secs => :grace))
+                    WHERE sid=:sid
+                """), {"sid": old_sid, "grace": SESSION_ROTATE_GRACE_SECONDS})
+        if old_sid:
+            self._cache_drop(old_sid)
+        self._cache_put(new_sid, payload)
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(new_sid.encode()).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+        if SESSION_CLEANUP_EVERY and random.randrange(SESSION_CLEANUP_EVERY) == 0:
+            try:
+                cleanup_expired_sessions(max_batches=1)
+            except Exception:
+                app.logger.exception("Oturum temizliği başarısız")
+
+
+def cleanup_expired_sessions(max_batches: int | None = None) -> int:
+    """
+    Süresi dolmuş oturumları SESSION_CLEANUP_BATCH'lik gruplar halinde siler.
+    Uzun kilit tutmamak için her grup ayrı transaction'dır.
+    """
+    deleted, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            result = conn.execute(text("""
+                DELETE FROM web_sessions
+                WHERE sid IN (
+                    SELECT sid FROM web_sessions
+                    WHERE expires_at <= NOW()
+                    ORDER BY expires_at
+                    LIMIT :batch
+                )
+            """), {"batch": SESSION_CLEANUP_BATCH})
+        deleted += result.rowcount
+        batches += 1
+        if result.rowcount < SESSION_CLEANUP_BATCH:
+            break
+    if deleted:
+        metrics.inc("session_expired_deleted_total", value=deleted)
+    return deleted
+
+
+if SESSION_BACKEND == "server":
+    app.session_interface = PostgresSessionInterface()
+elif SESSION_BACKEND != "cookie":
+    raise RuntimeError(f"Geçersiz SESSION_BACKEND: {SESSION_BACKEND}")
+
+# -----------------------------------------------------
+# Şablon önbellekleri: Jinja bytecode + fragment cache
+# -----------------------------------------------------
+# Derlenmiş şablonlar diskte tutulur; worker'lar ve yeniden başlatmalar arasında
+# paylaşılır (Jinja kaynak checksum'ı değişince kendiliğinden geçersiz olur).
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "exp-jinja-cache")
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "256"))
+
+try:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+except OSError as e:
+    app.logger.warning("Jinja bytecode cache devre dışı (%s): %s", JINJA_CACHE_DIR, e)
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache "ad", anahtar1, anahtar2 %} ... {% endcache %}
+
+    Bloğun render çıktısını worker içinde saklar. Anahtara şablon adı ve
+    dosyanın değişiklik zamanı (şablon sürümü) otomatik eklenir. Yalnızca
+    kullanıcıya özel veri içermeyen bloklar için kullanın (rol gibi düşük
+    kardinaliteli anahtarlarla).
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self._lock = threading.Lock()
+        self._store = OrderedDict()
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+
+        try:
+            version = int(os.path.getmtime(parser.filename)) if parser.filename else 0
+        except OSError:
+            version = 0
+        prefix = nodes.Const(f"{parser.name}@{version}")
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_cached", [prefix, nodes.List(args)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _cached(self, prefix, key_parts, caller):
+        key = (prefix,) + tuple(str(k) for k in key_parts)
+        with self._lock:
+            rv = self._store.get(key)
+            if rv is not None:
+                self._store.move_to_end(key)
+        if rv is not None:
+            metrics.inc("template_fragment_cache_total", (("result", "hit"),))
+            return rv
+
+        metrics.inc("template_fragment_cache_total", (("result", "miss"),))
+        rv = caller()
+        with self._lock:
+            self._store[key] = rv
+            while len(self._store) > FRAGMENT_CACHE_SIZE:
+                self._store.popitem(last=False)
+        return rv
+
+
+app.jinja_env.add_extension(FragmentCacheExtension)
+
+# -----------------------------------------------------
+# Statik dosyalar: parmak izli (fingerprint) asset'ler
+# -----------------------------------------------------
+# build_assets.py, static/ altındaki dosyaları içerik hash'li adlarla static/dist/
+# altına yazar ve manifest.json üretir. Manifest yoksa (geliştirme) orijinal
+# dosyalar kullanılır.
+ASSET_MANIFEST_PATH = os.path.join(app.static_folder, "dist", "manifest.json")
+ASSET_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+
+def _load_asset_manifest() -> dict:
+    try:
+        with open(ASSET_MANIFEST_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        app.logger.exception("Asset manifest okunamadı: %s", ASSET_MANIFEST_PATH)
+        return {}
+
+
+ASSET_MANIFEST = _load_asset_manifest()
+
+
+@app.template_global()
+def asset_url(filename: str) -> str:
+    """
+    Şablonlarda url_for('static', ...) yerine: build sonrası hash'li dosyayı döner.
+    """
+    return url_for("static", filename=ASSET_MANIFEST.get(filename, filename))
+
+
+@app.after_request
+def _immutable_asset_headers(response):
+    # Hash'li dosyaların içeriği asla değişmez: tarayıcı bir yıl tekrar sormasın
+    if request.path.startswith(app.static_url_path + "/dist/") and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = ASSET_MAX_AGE_SECONDS
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+# -----------------------------------------------------
+# İstek kabulü: token bucket hız sınırlama
+# -----------------------------------------------------
+# Politika: "kapasite/saniye" (ör. "10/60": 10'luk patlama, dakikada 10 jeton dolumu).
+# Kova anahtarı (politika, route, kapsam, değer): kapsam IP ve (DB'ye gitmeden
+# biliniyorsa) kullanıcıdır.
+# Kontrol, DB'ye dokunan before_request kancalarından ve şifre hash'inden önce yapılır.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+# memory: worker başına; postgres: tüm worker'lar tek UNLOGGED tabloyu paylaşır
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+RATE_LIMIT_EVICT_SECONDS = float(os.getenv("RATE_LIMIT_EVICT_SECONDS", "60"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+# Önümüzdeki güvenilir proxy sayısı. Varsayılan 1: Render/Heroku yük dengeleyicisi
+# (yoksa tüm istemciler dengeleyicinin adresinden gelir ve tek kovayı paylaşır).
+# X-Forwarded-For yoksa (yerel geliştirme) remote_addr kullanılır. Önünde proxy
+# olmayan bir deploy'da 0 verin; aksi halde istemci başlığı taklit edebilir.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "1"))
+_proxy_warning_logged = False
+
+if RATE_LIMIT_BACKEND not in ("memory", "postgres"):
+    raise RuntimeError(f"Geçersiz RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+
+
+def _parse_rate(value: str) -> tuple[float, float]:
+    capacity, _, per_seconds = value.partition("/")
+    capacity, per_seconds = float(capacity), float(per_seconds or 60)
+    return capacity, capacity / per_seconds
+
+
+RATE_LIMIT_POLICIES = {
+    # login/register/şifre: hash hesaplaması pahalı
+    "auth": _parse_rate(os.getenv("RATE_LIMIT_AUTH", "10/60")),
+    # rapor gönderimleri: DB yazımı + görsel kaydı
+    "report": _parse_rate(os.getenv("RATE_LIMIT_REPORT", "20/60")),
+}
+
+
+class TokenBucketLimiter:
+    """
+    Worker içi token bucket deposu: anahtar -> [jeton, son_güncelleme, kapasite, dolum_hızı].
+    Dolmuş (yeniden tam kapasiteye ulaşmış) kovalar periyodik olarak atılır.
+    """
+
+    def __init__(self, evict_seconds: float, max_keys: int):
+        self.evict_seconds = evict_seconds
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._next_evict = time.monotonic() + evict_seconds
+
+    def take(self, key, capacity: float, rate: float) -> float:
+        """
+        Bir jeton harcar. İzin varsa 0, yoksa tekrar denemeden önce beklenecek saniye.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_evict or len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now, capacity, rate]
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / rate
+
+    def _evict(self, now: float):
+        self._next_evict = now + self.evict_seconds
+        full = [
+            key for key, (tokens, ts, capacity, rate) in self._buckets.items()
+            if tokens + (now - ts) * rate >= capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+        # Hâlâ çok fazlaysa (saldırı altında) en eski güncellenenler atılır
+        overflow = len(self._buckets) - self.max_keys // 2
+        if overflow > 0:
+            oldest = sorted(self._buckets.items(), key=lambda item: item[1][1])[:overflow]
+            for key, _ in oldest:
+                del self._buckets[key]
+
+
+rate_limiter = TokenBucketLimiter(RATE_LIMIT_EVICT_SECONDS, RATE_LIMIT_MAX_KEYS)
+
+
+def _take_token_postgres(key: str, capacity: float, rate: float) -> float:
+    # Tek atomik UPSERT: jeton yoksa WHERE satırı güncellemez ve RETURNING boş döner
+    now = time.time()
+    with db.engine.begin() as conn:
+        row = conn.execute(
+            text("""
+                INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+                VALUES (:key, :capacity - 1, :now)
+                ON CONFLICT (key) DO UPDATE SET
+                    tokens = LEAST(:capacity, b.tokens + (:now - b.updated_at) * :rate) - 1,
+                    updated_at = :now
+                WHERE LEAST(:capacity, b.tokens + (:now - b.updated_at) * :rate) >= 1
+                RETURNING tokens
+            """),
+            {"key": key, "capacity": capacity, "rate": rate, "now": now}
+        ).fetchone()
+    return 0.0 if row else 1.0 / rate
+
+
+def take_rate_token(policy: str, route: str, scope: str, value) -> float:
+    capacity, rate = RATE_LIMIT_POLICIES[policy]
+    if RATE_LIMIT_BACKEND == "postgres":
+        try:
+            return _take_token_postgres(f"{policy}:{route}:{scope}:{value}", capacity, rate)
+        except DB_UNAVAILABLE_ERRORS:
+            pass  # DB yoksa worker içi kovaya düş
+    return rate_limiter.take((policy, route, scope, value), capacity, rate)
+
+
+def client_ip() -> str:
+    global _proxy_warning_logged
+    forwarded = [p.strip() for p in request.headers.get("X-Forwarded-For", "").split(",") if p.strip()]
+    if TRUSTED_PROXY_COUNT > 0:
+        if len(forwarded) >= TRUSTED_PROXY_COUNT:
+            return forwarded[-TRUSTED_PROXY_COUNT]
+    elif forwarded and not _proxy_warning_logged:
+        # Proxy arkasında 0: herkes proxy'nin IP kovasını paylaşır (site geneli sınır)
+        _proxy_warning_logged = True
+        app.logger.error(
+            "X-Forwarded-For geldi ama TRUSTED_PROXY_COUNT=0: hız sınırı tüm istemcileri "
+            "%s adresinden sayıyor. Proxy arkasındaysanız TRUSTED_PROXY_COUNT ayarlayın.",
+            request.remote_addr,
+        )
+    return request.remote_addr or "-"
+
+
+def _rate_limit_identity():
+    # Yalnızca DB'ye gitmeden bilinen kimlikler: cookie oturumu (sunucu oturumunda
+    # yalnızca LRU'daki kayıt), mobil token ya da formdaki/JSON'daki e-posta
+    if isinstance(app.session_interface, PostgresSessionInterface):
+        uid = app.session_interface.cached_value(app, request, "user_id")
+    else:
+        uid = session.get("user_id")
+    if uid is None:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            uid = verify_mobile_token(auth[7:].strip())
+    if uid is not None:
+        return f"uid:{uid}"
+    email = request.form.get("email")
+    if email is None and request.is_json:
+        email = (request.get_json(silent=True) or {}).get("email")
+    email = (email or "").strip().lower() if isinstance(email, str) else ""
+    return f"email:{email}" if email else None
+
+
+def rate_limited(policy: str, html: bool = False):
+    """
+    Route'a hız sınırı politikası atar (POST istekleri için). Kontrolü
+    _admission_control kancası yapar; html=True ise düz metin 429 döner.
+    """
+    if policy not in RATE_LIMIT_POLICIES:
+        raise ValueError(f"Bilinmeyen hız sınırı politikası: {policy}")
+
+    def deco(f):
+        f._rate_limit = (policy, html)
+        return f
+    return deco
+
+
+@app.before_request
+def _admission_control():
+    if not RATE_LIMIT_ENABLED or request.method != "POST":
+        return None
+    view = app.view_functions.get(request.endpoint)
+    limit = getattr(view, "_rate_limit", None)
+    if limit is None:
+        return None
+    policy, html = limit
+
+    route = request.endpoint
+    retry_after = take_rate_token(policy, route, "ip", client_ip())
+    scope = "ip"
+    identity = _rate_limit_identity()
+    if not retry_after and identity:
+        retry_after = take_rate_token(policy, route, "user", identity)
+        scope = "user"
+    if not retry_after:
+        return None
+
+    metrics.inc("rate_limited_total", (("policy", policy), ("route", route), ("scope", scope)))
+    message = "Çok fazla istek gönderildi. Lütfen biraz sonra tekrar deneyin."
+    if html:
+        response = Response(message, status=429, mimetype="text/plain")
+    else:
+        response = jsonify({"success": False, "message": message})
+        response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return response
 
 # -----------------------------------------------------
 # Şema: tablolar + tohum veriler
@@ -160,11 +1730,178 @@ def ensure_tables():
             )
         """))
 
+        # Sunucu tarafı oturumlar (SESSION_BACKEND=server)
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS web_sessions (
+                sid VARCHAR(64) PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS web_sessions_expires_idx ON web_sessions (expires_at)"))
+
+        # Paylaşımlı hız sınırı kovaları (RATE_LIMIT_BACKEND=postgres); kaybı önemsiz -> UNLOGGED
+        conn.execute(text("""
+            CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at DOUBLE PRECISION NOT NULL
+            )
+        """))
+
         # reports missing columns (idempotent)
         conn.execute(text("ALTER TABLE reports ADD COLUMN IF NOT EXISTS details TEXT"))
         conn.execute(text("ALTER TABLE reports ADD COLUMN IF NOT EXISTS witnesses TEXT"))
         conn.execute(text("ALTER TABLE reports ADD COLUMN IF NOT EXISTS department VARCHAR(50)"))
 
+        # reports.id raporu yazan kullanıcıdır; raporun kendi kimliği report_id.
+        # BIGSERIAL eklenirken mevcut satırlar da sıradan numara alır.
+        conn.execute(text("ALTER TABLE reports ADD COLUMN IF NOT EXISTS report_id BIGSERIAL"))
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM pg_constraint
+                    WHERE conrelid = 'reports'::regclass AND contype = 'p'
+                ) THEN
+                    ALTER TABLE reports ADD CONSTRAINT reports_pkey PRIMARY KEY (report_id);
+                END IF;
+            END $$
+        """))
+        # Raporu ekleyen transaction'ın xid'i (xid8, PG13+): bildirim imleci commit
+        # sırasına göre ilerler. Mevcut satırlar sabit '1' alır (tablo yeniden
+        # yazılmaz); yeni satırlara pg_current_xact_id() yazılır.
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'reports' AND column_name = 'created_xid'
+                ) THEN
+                    ALTER TABLE reports ADD COLUMN created_xid xid8 NOT NULL DEFAULT '1';
+                    ALTER TABLE reports ALTER COLUMN created_xid SET DEFAULT pg_current_xact_id();
+                END IF;
+            EXCEPTION WHEN duplicate_column THEN
+                NULL;
+            END $$
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS reports_xid_idx ON reports (created_xid, report_id)"))
+
+        # Tanıklar: rapor <-> kullanıcı. "Tanık olduğum raporlar" user_id indeksinden okunur.
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS report_witnesses (
+                report_id BIGINT NOT NULL REFERENCES reports (report_id) ON DELETE CASCADE,
+                user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                PRIMARY KEY (report_id, user_id)
+            )
+        """))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS report_witnesses_user_idx ON report_witnesses (user_id, report_id)"))
+        # Raporu yazan kullanıcıya göre erişim (reports.id = users.id)
+        conn.execute(text("CREATE INDEX IF NOT EXISTS reports_user_idx ON reports (id, report_id)"))
+        # Rapor listeleri: ORDER BY date DESC LIMIT ve tarih aralığı / tip filtreleri
+        # (bench/plan_check.py bu sorguların seq scan'e düşmediğini doğrular).
+        # Listeler yalnızca reports'u okur; kapsayan indeks sayfa (fields= kısa
+        # liste) ve sayım/facet sorgularını heap'e gitmeden (index-only) karşılar.
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS reports_date_cover_idx
+            ON reports (date DESC) INCLUDE (report_id, id, type, fullname, department)
+        """))
+        conn.execute(text("DROP INDEX IF EXISTS reports_date_idx"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS reports_type_date_idx ON reports (LOWER(type), date DESC)"))
+        # Ad araması (LOWER(fullname) LIKE '%..%') için trigram indeksleri; pg_trgm
+        # kurulamıyorsa (yetki yok) arama indekssiz çalışmaya devam eder
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            EXCEPTION WHEN insufficient_privilege OR undefined_file OR unique_violation THEN
+                RAISE NOTICE 'pg_trgm kurulamadı: %', SQLERRM;
+            END $$
+        """))
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                    CREATE INDEX IF NOT EXISTS users_fullname_trgm_idx
+                        ON users USING gin (LOWER(fullname) gin_trgm_ops);
+                    CREATE INDEX IF NOT EXISTS reports_fullname_trgm_idx
+                        ON reports USING gin (LOWER(fullname) gin_trgm_ops);
+                END IF;
+            END $$
+        """))
+        # users.fullname değişince kullanıcı kuyruğa girer; sync-reporter-names işi
+        # reports.fullname'i günceller. Tablo ilk kez kurulurken adı zaten farklı
+        # olan raporların sahipleri de kuyruğa alınır (tek seferlik geçiş).
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF to_regclass('reporter_name_sync_queue') IS NULL THEN
+                    CREATE TABLE reporter_name_sync_queue (
+                        user_id INTEGER PRIMARY KEY,
+                        queued_at TIMESTAMP NOT NULL DEFAULT NOW()
+                    );
+                    INSERT INTO reporter_name_sync_queue (user_id)
+                    SELECT DISTINCT r.id
+                    FROM reports r
+                    JOIN users u ON u.id = r.id
+                    WHERE r.fullname IS DISTINCT FROM COALESCE(u.fullname, '');
+                END IF;
+            EXCEPTION WHEN duplicate_table OR unique_violation THEN
+                NULL;
+            END $$
+        """))
+        conn.execute(text("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'queue_reporter_name_sync') THEN
+                    CREATE FUNCTION queue_reporter_name_sync() RETURNS trigger AS $fn$
+                    BEGIN
+                        INSERT INTO reporter_name_sync_queue (user_id) VALUES (NEW.id)
+                        ON CONFLICT (user_id) DO NOTHING;
+                        RETURN NULL;
+                    END $fn$ LANGUAGE plpgsql;
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'users_fullname_sync_trg') THEN
+                    CREATE TRIGGER users_fullname_sync_trg
+                        AFTER UPDATE OF fullname ON users
+                        FOR EACH ROW WHEN (OLD.fullname IS DISTINCT FROM NEW.fullname)
+                        EXECUTE FUNCTION queue_reporter_name_sync();
+                END IF;
+            EXCEPTION WHEN duplicate_function OR duplicate_object OR unique_violation THEN
+                NULL;
+            END $$
+        """))
+
+        # Admin başına son görülen rapor (check-new-reports imleci)
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS admin_report_cursors (
+                user_id INTEGER PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+                last_seen_report_id BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """))
+        # İmleç konumu (last_seen_xid, last_seen_report_id); eski imleçler '1' ile
+        # report_id sırasında devam eder
+        conn.execute(text(
+            "ALTER TABLE admin_report_cursors ADD COLUMN IF NOT EXISTS last_seen_xid xid8 NOT NULL DEFAULT '1'"
+        ))
+
+        # Zamanlayıcı: iş başına son çalıştırma (yeniden başlatmada takvim korunur)
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS scheduled_job_runs (
+                name TEXT PRIMARY KEY,
+                last_started_at TIMESTAMP,
+                last_finished_at TIMESTAMP,
+                last_status VARCHAR(16),
+                last_error TEXT,
+                last_duration_seconds DOUBLE PRECISION,
+                last_trigger VARCHAR(16)
+            )
+        """))
+
+        # Katalogun LOWER(...) tekil indeksleri ayrı transaction'da kurulur
+        # (ensure_catalog_indexes); kopyalar bu toplu migrasyonu geri almasın.
+
 
 def seed_default_categories():
     """
@@ -186,33 +1923,35 @@ def seed_default_categories():
         "Şiddet/Kavga",
     ]
     with db.engine.begin() as conn:
-        for r in seed_risks:
-            conn.execute(text("""
-                INSERT INTO riskcategories (type)
-                SELECT :t
-                WHERE NOT EXISTS (SELECT 1 FROM riskcategories WHERE LOWER(type)=LOWER(:t))
-            """), {"t": r})
-
-        for e in seed_events:
-            conn.execute(text("""
-                INSERT INTO eventcategories (type)
-                SELECT :t
-                WHERE NOT EXISTS (SELECT 1 FROM eventcategories WHERE LOWER(type)=LOWER(:t))
-            """), {"t": e})
+        import_categories(conn, [("risk", r) for r in seed_risks] + [("event", e) for e in seed_events])
 
 # Flask 3.x'le before_first_request kaldırıldığı için init bayrağıyla çalışıyoruz
 _INIT_DONE = False
+_INIT_LOCK = threading.Lock()  # gthread worker'larda init'i tek thread yapsın
 
-@app.before_request
-def _init_once_and_admin_flag():
+
+def init_schema_once() -> bool:
+    """
+    Şema + seed'i worker başına bir kez çalıştırır (warmup veya ilk istek,
+    hangisi önce gelirse; diğeri kilitte bekler). Dönüş: init tamamlandı mı.
+    """
     global _INIT_DONE
     if not _INIT_DONE:
-        try:
-            ensure_tables()
-            seed_default_categories()
-            _INIT_DONE = True
-        except Exception as e:
-            app.logger.exception("Şema/seed init hatası: %s", e)
+        with _INIT_LOCK:
+            if not _INIT_DONE:
+                try:
+                    ensure_tables()
+                    ensure_catalog_indexes()
+                    seed_default_categories()
+                    _INIT_DONE = True
+                except Exception as e:
+                    app.logger.exception("Şema/seed init hatası: %s", e)
+    return _INIT_DONE
+
+
+@app.before_request
+def _init_once_and_admin_flag():
+    init_schema_once()
 
     # Admin flag'i taşı
     try:
@@ -226,6 +1965,155 @@ def _init_once_and_admin_flag():
     except Exception:
         pass
 
+# -----------------------------------------------------
+# Uygulama fabrikası ve paralel ısınma (warmup)
+# -----------------------------------------------------
+# Modül import'u DB'ye dokunmaz (engine tembel bağlanır). Şema/seed, havuz
+# bağlantıları, şablon derlemesi ve önbellekler warmup() ile paralel thread'lerde
+# hazırlanır; warmup bitmeden gelen istek init_schema_once() kilidinde bekler.
+#
+# gunicorn --preload: master modülü bir kez import eder ve yalnızca DB'siz işleri
+# (şablonlar) yapar, worker'lar bunu copy-on-write paylaşır. Fork sonrası her
+# worker after_fork() ile kalıtılan havuzu bırakır ve DB warmup'ını kendisi yapar.
+APP_WARMUP = os.getenv("APP_WARMUP", "1") == "1"
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", str(min(DB_POOL_SIZE, 4))))
+WARMUP_DB_TASKS = ("schema", "pool", "caches")
+WARMUP_LOCAL_TASKS = ("templates",)
+_warmup_thread = None
+
+
+def _warm_pool():
+    # Bağlantılar aynı anda açılır ki TLS el sıkışmaları sıraya girmesin; kapatılınca
+    # havuzda (pool_size'a kadar) kalırlar
+    count = max(0, min(WARMUP_POOL_CONNECTIONS, DB_POOL_SIZE))
+    if count == 0:
+        return 0
+    engines = [db.engine] + ([db.engines["replica"]] if REPLICA_DB_URL else [])
+    with ThreadPoolExecutor(max_workers=count * len(engines), thread_name_prefix="warmup-pool") as pool:
+        conns = list(pool.map(lambda engine: engine.connect(), [e for e in engines for _ in range(count)]))
+    for conn in conns:
+        conn.close()
+    return len(conns)
+
+
+def _warm_templates():
+    # Bytecode cache diskteyse sadece yükleme; değilse derleyip cache'e yazar
+    names = [n for n in app.jinja_env.list_templates() if n.endswith(".html")]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def _warm_caches():
+    # DB kesintisinde gösterilecek snapshot'lar açılışta tazelenir
+    with get_read_connection() as conn:
+        precautions_rows = conn.execute(text("SELECT id, title, explanation FROM precautions ORDER BY id")).fetchall()
+        risk = conn.execute(text("SELECT type FROM riskcategories ORDER BY type ASC")).fetchall()
+        event = conn.execute(text("SELECT type FROM eventcategories ORDER BY type ASC")).fetchall()
+    save_snapshot("precautions", [list(row) for row in precautions_rows])
+    save_snapshot("categories_risk", [r[0] for r in risk])
+    save_snapshot("categories_event", [r[0] for r in event])
+    return len(precautions_rows) + len(risk) + len(event)
+
+
+def _warm_schema():
+    if not init_schema_once():
+        raise RuntimeError("şema/seed init tamamlanamadı")
+    return True
+
+
+_WARMUP_FUNCS = {
+    "schema": _warm_schema,
+    "pool": _warm_pool,
+    "templates": _warm_templates,
+    "caches": _warm_caches,
+}
+
+
+def warmup(tasks=WARMUP_DB_TASKS + WARMUP_LOCAL_TASKS) -> dict:
+    """
+    Verilen ısınma adımlarını paralel çalıştırır; bir adımın hatası diğerlerini
+    durdurmaz (ilk istek eksik kalanı zaten tembel yapar).
+    Dönüş: adım -> {"seconds", "result" | "error"}.
+    """
+    def run(name):
+        t0 = time.perf_counter()
+        with app.app_context():
+            try:
+                outcome = {"result": _WARMUP_FUNCS[name]()}
+            except Exception as e:
+                app.logger.warning("Warmup adımı başarısız (%s): %s", name, e)
+                metrics.inc("app_warmup_errors_total", (("task", name),))
+                outcome = {"error": str(e)}
+        outcome["seconds"] = round(time.perf_counter() - t0, 4)
+        metrics.set("app_warmup_seconds", outcome["seconds"], (("task", name),))
+        return name, outcome
+
+    # DB'siz adımlar hemen başlar; pool/caches tablolar yokken hata vereceği için
+    # şemanın bitmesini bekler, sonra paralel koşar (şema başarısızsa DB'ye gidilmez)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(tasks)), thread_name_prefix="warmup") as pool:
+        futures = [pool.submit(run, t) for t in tasks if t not in WARMUP_DB_TASKS]
+        if "schema" in tasks:
+            results.update([run("schema")])
+        if "error" not in results.get("schema", {}):
+            futures += [pool.submit(run, t) for t in tasks if t in WARMUP_DB_TASKS and t != "schema"]
+        results.update(f.result() for f in futures)
+    return results
+
+
+def start_warmup(tasks=WARMUP_DB_TASKS + WARMUP_LOCAL_TASKS):
+    """Warmup'ı arka planda başlatır; worker istek kabul etmeyi beklemez."""
+    global _warmup_thread
+    _warmup_thread = threading.Thread(target=warmup, args=(tasks,), name="app-warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+
+def after_fork():
+    """
+    gunicorn --preload ile fork edilen worker'da çağrılır (gunicorn.conf.py post_fork).
+    Master'dan kalıtılan bağlantılar iki process arasında paylaşılmasın diye havuzlar
+    close=False ile bırakılır (soketler master'ınkilere dokunmadan unutulur).
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    if APP_WARMUP:
+        start_warmup(WARMUP_DB_TASKS)
+    metrics.start_flusher()
+    start_scheduler()
+
+
+def create_app(warmup_mode: str | None = None):
+    """
+    Uygulama giriş noktası (gunicorn: "expOrigin-main.app:create_app()").
+
+    warmup_mode:
+        "background" (varsayılan) - tüm ısınma arka planda
+        "preload"   - yalnızca DB'siz ısınma, senkron (gunicorn master; DB ve
+                      zamanlayıcı after_fork'ta)
+        "off"       - ısınma yok; her şey ilk istekte tembel yapılır
+    Preload dışındaki modlarda zamanlayıcı (SCHEDULER_ENABLED) ve metrik yazma
+    (METRICS_MULTIPROC_DIR) thread'leri de başlatılır.
+    """
+    if warmup_mode is None:
+        if not APP_WARMUP:
+            warmup_mode = "off"
+        else:
+            warmup_mode = "preload" if os.getenv("APP_PRELOADED") == "1" else "background"
+    if warmup_mode == "preload":
+        # Master'da thread/bağlantı açılmaz; zamanlayıcı after_fork'ta başlar
+        warmup(WARMUP_LOCAL_TASKS)
+        return app
+    if warmup_mode == "background":
+        start_warmup()
+    elif warmup_mode != "off":
+        raise ValueError(f"Geçersiz warmup modu: {warmup_mode}")
+    metrics.start_flusher()
+    start_scheduler()
+    return app
+
 # -----------------------------------------------------
 # Auth decorator’lar
 # -----------------------------------------------------
@@ -332,15 +2220,23 @@ def raporlar():
 @app.route("/precautions")
 def precautions():
     try:
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             precautions_data = conn.execute(
                 text("SELECT id, title, explanation FROM precautions ORDER BY id")
             ).fetchall()
+        save_snapshot("precautions", [list(row) for row in precautions_data])
         return render_template(
             "precautions.html",
             active_page="precautions",
             precautions=precautions_data
         )
+    except DB_UNAVAILABLE_ERRORS as e:
+        snapshot = load_snapshot("precautions")
+        if snapshot is None:
+            flash(f"Veri yükleme hatası: {e}", "error")
+            return render_template("precautions.html", active_page="precautions", precautions=[])
+        flash("Veritabanına şu an ulaşılamıyor; son kaydedilen önlemler gösteriliyor.", "error")
+        return render_template("precautions.html", active_page="precautions", precautions=snapshot[0])
     except Exception as e:
         flash(f"Veri yükleme hatası: {e}", "error")
         return render_template("precautions.html", active_page="precautions", precautions=[])
@@ -352,28 +2248,16 @@ def submit_precautions():
         title = (request.form.get("title") or "").strip()
         explanation = (request.form.get("explanation") or "").strip()
 
-        if not title or len(title) < 5:
-            return jsonify({"success": False, "message": "Başlık en az 5 karakter olmalıdır!"})
-        if not explanation or len(explanation) < 10:
-            return jsonify({"success": False, "message": "Açıklama en az 10 karakter olmalıdır!"})
-        if len(title) > 200:
-            return jsonify({"success": False, "message": "Başlık en fazla 200 karakter olabilir!"})
-        if len(explanation) > 1000:
-            return jsonify({"success": False, "message": "Açıklama en fazla 1000 karakter olabilir!"})
+        error = validate_precaution(title, explanation)
+        if error:
+            return jsonify({"success": False, "message": error})
 
         with db.engine.begin() as conn:
-            exists = conn.execute(
-                text("SELECT 1 FROM precautions WHERE LOWER(title)=LOWER(:t) LIMIT 1"),
-                {"t": title}
-            ).fetchone()
-            if exists:
-                return jsonify({"success": False, "message": "Bu başlıkta bir önlem zaten mevcut!"})
-
-            conn.execute(
-                text("INSERT INTO precautions (title, explanation) VALUES (:t, :e)"),
-                {"t": title, "e": explanation}
-            )
+            diff = import_precautions(conn, [(title, explanation)], update_existing=False)
+        if not diff["added"]:
+            return jsonify({"success": False, "message": "Bu başlıkta bir önlem zaten mevcut!"})
 
+        mark_primary_reads()
         return jsonify({"success": True, "message": "Önlem başarıyla eklendi!"})
     except Exception as e:
         return jsonify({"success": False, "message": f"Veritabanı hatası: {e}"})
@@ -409,6 +2293,7 @@ def delete_precautions():
                 {"ids": existing_ids}
             )
 
+        mark_primary_reads()
         return jsonify({
             "success": True,
             "message": f"{result.rowcount} adet önlem başarıyla silindi!",
@@ -427,13 +2312,20 @@ def list_categories():
         if cat_type not in ("risk", "event"):
             return jsonify({"success": False, "message": "Geçersiz kategori tipi"}), 400
 
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             if cat_type == "risk":
                 rows = conn.execute(text("SELECT type FROM riskcategories ORDER BY type ASC")).fetchall()
             else:
                 rows = conn.execute(text("SELECT type FROM eventcategories ORDER BY type ASC")).fetchall()
 
-        return jsonify({"success": True, "items": [r[0] for r in rows]})
+        items = [r[0] for r in rows]
+        save_snapshot(f"categories_{cat_type}", items)
+        return jsonify({"success": True, "items": items})
+    except DB_UNAVAILABLE_ERRORS:
+        snapshot = load_snapshot(f"categories_{cat_type}")
+        if snapshot is None:
+            return db_unavailable_response()
+        return jsonify({"success": True, "items": snapshot[0], "degraded": True, "snapshot_at": snapshot[1]})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
@@ -452,22 +2344,10 @@ def add_category():
             return jsonify({"success": False, "message": "Geçersiz/eksik alanlar"}), 400
 
         with db.engine.begin() as conn:
-            if cat_type == "risk":
-                exists = conn.execute(
-                    text("SELECT 1 FROM riskcategories WHERE LOWER(type)=LOWER(:n) LIMIT 1"),
-                    {"n": name}
-                ).fetchone()
-                if not exists:
-                    conn.execute(text("INSERT INTO riskcategories (type) VALUES (:n)"), {"n": name})
-            else:
-                exists = conn.execute(
-                    text("SELECT 1 FROM eventcategories WHERE LOWER(type)=LOWER(:n) LIMIT 1"),
-                    {"n": name}
-                ).fetchone()
-                if not exists:
-                    conn.execute(text("INSERT INTO eventcategories (type) VALUES (:n)"), {"n": name})
+            diff = import_categories(conn, [(cat_type, name)])
 
-        return jsonify({"success": True})
+        mark_primary_reads()
+        return jsonify({"success": True, "added": bool(diff[cat_type]["added"])})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
@@ -494,15 +2374,480 @@ def delete_categories():
                     {"names": names}
                 )
 
+        mark_primary_reads()
         return jsonify({"success": True, "deleted": result.rowcount})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
+# -----------------------------------------------------
+# Toplu içe/dışa aktarma (kategoriler & önlemler)
+# -----------------------------------------------------
+# Katalog CSV, JSON veya satır listesi (categories.txt gibi) olarak gelir ve tablo
+# başına tek bir INSERT ... ON CONFLICT (LOWER(...)) ile uygulanır. dry_run yazmadan
+# aynı farkı (eklenecek / güncellenecek / değişmeyecek) döner.
+CATALOG_UNIQUE_COLUMNS = {"riskcategories": "type", "eventcategories": "type", "precautions": "title"}
+CATEGORY_TABLES = {"risk": "riskcategories", "event": "eventcategories"}
+# Satır listelerinde tipi değiştiren (madde işaretsiz) bölüm başlıkları
+CATEGORY_SECTION_HEADINGS = {"riskler": "risk", "olaylar": "event", "risk": "risk", "event": "event"}
+CATALOG_FORMATS = ("csv", "json", "lines")
+CATALOG_MIMETYPES = {"csv": "text/csv", "json": "application/json", "lines": "text/plain"}
+
+
+class CatalogIndexMissing(Exception):
+    """Tablonun LOWER(...) tekil indeksi yok (kopyalar temizlenmemiş); ON CONFLICT kullanılamaz."""
+
+
+def find_catalog_duplicates(conn) -> list:
+    """
+    Harf farkıyla tekrarlanan katalog satırları; her grupta en eski (en küçük id)
+    satır kalır, diğerleri listelenir.
+    """
+    duplicates = []
+    for table, column in CATALOG_UNIQUE_COLUMNS.items():
+        rows = conn.execute(text(f"""
+            SELECT a.id, a.{column}, MIN(b.id) AS keep_id
+            FROM {table} a
+            JOIN {table} b ON LOWER(b.{column}) = LOWER(a.{column}) AND b.id < a.id
+            GROUP BY a.id, a.{column}
+            ORDER BY a.id
+        """)).fetchall()
+        duplicates += [
+            {"table": table, "id": r[0], "value": r[1], "keep_id": r[2]} for r in rows
+        ]
+    return duplicates
+
+
+def missing_catalog_indexes(conn, tables=None) -> list:
+    """Henüz kurulmamış LOWER(...) tekil indekslerinin (tablo, kolon) listesi."""
+    return [
+        (table, column) for table, column in CATALOG_UNIQUE_COLUMNS.items()
+        if (tables is None or table in tables)
+        and conn.execute(text("SELECT to_regclass(:name)"),
+                         {"name": f"{table}_{column}_lower_key"}).scalar() is None
+    ]
+
+
+def create_catalog_unique_indexes(conn) -> list:
+    """
+    Eksik LOWER(...) tekil indekslerini kopyası olmayan tablolarda kurar.
+    Dönüş: kopyası olduğu için indeksi kurulamayan tablolardaki kopyalar.
+    """
+    missing = missing_catalog_indexes(conn)
+    if not missing:
+        return []
+    duplicates = [d for d in find_catalog_duplicates(conn)
+                  if (d["table"], CATALOG_UNIQUE_COLUMNS[d["table"]]) in missing]
+    blocked = {d["table"] for d in duplicates}
+    for table, column in missing:
+        if table not in blocked:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_{column}_lower_key ON {table} (LOWER({column}))"
+            ))
+    return duplicates
+
+
+def ensure_catalog_indexes():
+    """
+    Şema migrasyonundan sonra, kendi transaction'ında çalışır. Kopya varsa o
+    tabloların indeksi kurulmaz, uyarı yazılır ve init yine tamamlanır; toplu
+    içe aktarma indeks kurulana dek reddedilir (CatalogIndexMissing).
+    """
+    with db.engine.begin() as conn:
+        duplicates = create_catalog_unique_indexes(conn)
+    if duplicates:
+        app.logger.warning(
+            "Katalogda %d büyük/küçük harf kopyası var (%s); tekil indeks kurulmadı, toplu içe "
+            "aktarma kapalı. İncelemek için: flask --app expOrigin-main/app.py dedupe-catalog "
+            "(silmek için --apply)",
+            len(duplicates), ", ".join(sorted({d["table"] for d in duplicates})),
+        )
+
+
+def dedupe_catalog(apply: bool = False) -> list:
+    """
+    Katalogdaki harf farkı kopyalarını döner; apply ise siler ve tekil indeksleri
+    kurar (tek transaction).
+    """
+    with db.engine.begin() as conn:
+        duplicates = find_catalog_duplicates(conn)
+        if apply:
+            for table in CATALOG_UNIQUE_COLUMNS:
+                ids = [d["id"] for d in duplicates if d["table"] == table]
+                if ids:
+                    conn.execute(text(f"DELETE FROM {table} WHERE id = ANY(:ids)"), {"ids": ids})
+            create_catalog_unique_indexes(conn)
+    return duplicates
+
+
+BULK_IMPORT_MAX_ITEMS = int(os.getenv("BULK_IMPORT_MAX_ITEMS", "5000"))
+_LIST_BULLET_RE = re.compile(r"^\s*(?:[•·\-*]|\d+[.)])\s*")
+
+
+def validate_precaution(title: str, explanation: str) -> str | None:
+    if not title or len(title) < 5:
+        return "Başlık en az 5 karakter olmalıdır!"
+    if not explanation or len(explanation) < 10:
+        return "Açıklama en az 10 karakter olmalıdır!"
+    if len(title) > 200:
+        return "Başlık en fazla 200 karakter olabilir!"
+    if len(explanation) > 1000:
+        return "Açıklama en fazla 1000 karakter olabilir!"
+    return None
+
+
+def decode_catalog(raw: bytes) -> str:
+    # Windows'ta kaydedilmiş UTF-16 listeler de kabul edilir
+    if raw[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return raw.decode("utf-16")
+    return raw.decode("utf-8-sig")
+
+
+def catalog_format(fmt: str | None, filename: str = "", mimetype: str = "") -> str:
+    fmt = (fmt or "").strip().lower()
+    if not fmt:
+        ext = os.path.splitext(filename or "")[1].lower()
+        if ext in (".csv", ".json"):
+            fmt = ext[1:]
+        elif "json" in (mimetype or ""):
+            fmt = "json"
+        elif "csv" in (mimetype or ""):
+            fmt = "csv"
+        else:
+            fmt = "lines"
+    if fmt not in CATALOG_FORMATS:
+        raise ValueError(f"Geçersiz format: {fmt}")
+    return fmt
+
+
+def _csv_rows(body: str, columns: tuple) -> list[list[str]]:
+    """Başlık satırı varsa sütunlar adla, yoksa sırayla eşlenir."""
+    rows = [row for row in csv.reader(io.StringIO(body)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    if columns[0] in header:
+        index = [header.index(c) if c in header else None for c in columns]
+        rows = rows[1:]
+    else:
+        index = list(range(len(columns)))
+    return [
+        [row[i].strip() if i is not None and i < len(row) else "" for i in index]
+        for row in rows
+    ]
+
+
+def _json_items(body: str) -> list:
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = data.get("items")
+    if not isinstance(data, list):
+        raise ValueError("JSON bir dizi veya {\"items\": [...]} olmalıdır")
+    return data
+
+
+def parse_category_catalog(body: str, fmt: str, default_type: str | None = None) -> list[tuple[str, str]]:
+    """
+    -> [(tip, ad)], tip 'risk' | 'event'. Aynı tipte harf farkı olan tekrarlar atılır.
+    lines: "• ad" satırları, "Riskler"/"Olaylar" başlıkları tipi değiştirir
+    csv:   name[,type]
+    json:  ["ad", ...] veya [{"name": ..., "type": ...}, ...]
+    """
+    items = []
+    if fmt == "lines":
+        current = default_type
+        for line in body.splitlines():
+            name = _LIST_BULLET_RE.sub("", line).strip()
+            if not name:
+                continue
+            if name == line.strip() and name.lower() in CATEGORY_SECTION_HEADINGS:
+                current = CATEGORY_SECTION_HEADINGS[name.lower()]
+                continue
+            items.append((current, name))
+    elif fmt == "csv":
+        for name, cat_type in _csv_rows(body, ("name", "type")):
+            items.append((cat_type.lower() or default_type, name))
+    else:
+        for entry in _json_items(body):
+            if isinstance(entry, dict):
+                cat_type = str(entry.get("type") or "").strip().lower() or default_type
+                items.append((cat_type, str(entry.get("name") or "").strip()))
+            else:
+                items.append((default_type, str(entry).strip()))
+
+    result, seen = [], set()
+    for cat_type, name in items:
+        if not name:
+            continue
+        if cat_type not in CATEGORY_TABLES:
+            raise ValueError(f"Kategori tipi belirsiz ('{name}'): type=risk|event verin")
+        key = (cat_type, name.lower())
+        if key not in seen:
+            seen.add(key)
+            result.append((cat_type, name))
+    if len(result) > BULK_IMPORT_MAX_ITEMS:
+        raise ValueError(f"En fazla {BULK_IMPORT_MAX_ITEMS} kayıt içe aktarılabilir")
+    return result
+
+
+def parse_precaution_catalog(body: str, fmt: str) -> list[tuple[str, str]]:
+    """
+    -> [(başlık, açıklama)]; her kayıt submit_precautions kurallarıyla doğrulanır.
+    lines: "başlık<TAB>açıklama", csv: title,explanation,
+    json: [{"title": ..., "explanation": ...}, ...]
+    """
+    if fmt == "lines":
+        pairs = []
+        for line in body.splitlines():
+            if line.strip():
+                title, _, explanation = line.partition("\t")
+                pairs.append((title, explanation))
+    elif fmt == "csv":
+        pairs = [tuple(row) for row in _csv_rows(body, ("title", "explanation"))]
+    else:
+        pairs = [
+            (str(e.get("title") or ""), str(e.get("explanation") or "")) if isinstance(e, dict) else ("", "")
+            for e in _json_items(body)
+        ]
+
+    result, seen = [], set()
+    for no, (title, explanation) in enumerate(pairs, start=1):
+        title, explanation = title.strip(), explanation.strip()
+        error = validate_precaution(title, explanation)
+        if error:
+            raise ValueError(f"{no}. kayıt: {error}")
+        if title.lower() not in seen:
+            seen.add(title.lower())
+            result.append((title, explanation))
+    if len(result) > BULK_IMPORT_MAX_ITEMS:
+        raise ValueError(f"En fazla {BULK_IMPORT_MAX_ITEMS} kayıt içe aktarılabilir")
+    return result
+
+
+def import_categories(conn, items, dry_run: bool = False) -> dict:
+    """
+    Tip başına tek sorgu. Dönüş: {"risk": {"added": [...], "existing": [...]}, ...}
+    """
+    diff = {}
+    for cat_type, table in CATEGORY_TABLES.items():
+        names = [name for t, name in items if t == cat_type]
+        if not names:
+            continue
+        if dry_run:
+            added = conn.execute(text(f"""
+                SELECT t.name
+                FROM unnest(CAST(:names AS text[])) AS t(name)
+                WHERE NOT EXISTS (SELECT 1 FROM {table} c WHERE LOWER(c.type) = LOWER(t.name))
+            """), {"names": names}).scalars().all()
+        else:
+            # DISTINCT ON: Python'un lower()'ı ile Postgres'in LOWER()'ı ayrışırsa da tek satır
+            added = conn.execute(text(f"""
+                INSERT INTO {table} (type)
+                SELECT name FROM (
+                    SELECT DISTINCT ON (LOWER(name)) name, ord
+                    FROM unnest(CAST(:names AS text[])) WITH ORDINALITY AS t(name, ord)
+                    ORDER BY LOWER(name), ord
+                ) AS d
+                ORDER BY ord
+                ON CONFLICT (LOWER(type)) DO NOTHING
+                RETURNING type
+            """), {"names": names}).scalars().all()
+        added = set(added)
+        diff[cat_type] = {
+            "added": [n for n in names if n in added],
+            "existing": [n for n in names if n not in added],
+        }
+    return diff
+
+
+def import_precautions(conn, items, dry_run: bool = False, update_existing: bool = True) -> dict:
+    """
+    Tek INSERT ... ON CONFLICT. Mevcut başlığın açıklaması farklıysa (update_existing)
+    güncellenir. Dönüş: {"added": [...], "updated": [...], "unchanged": [...]}
+    """
+    if not items:
+        return {"added": [], "updated": [], "unchanged": []}
+    params = {"titles": [t for t, _ in items], "explanations": [e for _, e in items]}
+    if dry_run:
+        rows = conn.execute(text("""
+            SELECT t.title,
+                   CASE WHEN p.id IS NULL THEN 'added'
+                        WHEN :update AND p.explanation IS DISTINCT FROM t.explanation THEN 'updated'
+                        ELSE 'unchanged' END AS action
+            FROM unnest(CAST(:titles AS text[]), CAST(:explanations AS text[])) AS t(title, explanation)
+            LEFT JOIN precautions p ON LOWER(p.title) = LOWER(t.title)
+        """), {**params, "update": update_existing}).fetchall()
+        actions = {title.lower(): action for title, action in rows}
+    else:
+        conflict = """DO UPDATE SET explanation = EXCLUDED.explanation
+                WHERE precautions.explanation IS DISTINCT FROM EXCLUDED.explanation""" if update_existing else "DO NOTHING"
+        rows = conn.execute(text(f"""
+            INSERT INTO precautions (title, explanation)
+            SELECT title, explanation FROM (
+                SELECT DISTINCT ON (LOWER(title)) title, explanation, ord
+                FROM unnest(CAST(:titles AS text[]), CAST(:explanations AS text[]))
+                     WITH ORDINALITY AS t(title, explanation, ord)
+                ORDER BY LOWER(title), ord
+            ) AS d
+            ORDER BY ord
+            ON CONFLICT (LOWER(title)) {conflict}
+            RETURNING title, (xmax = 0) AS inserted
+        """), params).fetchall()
+        # Güncellenen satırda dönen başlık mevcut kaydınkidir (harf farkı olabilir)
+        actions = {title.lower(): ("added" if inserted else "updated") for title, inserted in rows}
+
+    diff = {"added": [], "updated": [], "unchanged": []}
+    for title, _ in items:
+        diff[actions.get(title.lower(), "unchanged")].append(title)
+    return diff
+
+
+def import_catalog(kind: str, body: str, fmt: str, cat_type: str | None = None,
+                   dry_run: bool = False, update_existing: bool = True) -> dict:
+    """
+    Ayrıştırır ve tek transaction'da uygular. ValueError: geçersiz içerik,
+    CatalogIndexMissing: tekil indeks kurulmamış (yazan içe aktarma reddedilir).
+    """
+    if kind == "categories":
+        items = parse_category_catalog(body, fmt, cat_type)
+    else:
+        items = parse_precaution_catalog(body, fmt)
+    with db.engine.begin() as conn:
+        if not dry_run:
+            tables = CATEGORY_TABLES.values() if kind == "categories" else ("precautions",)
+            missing = missing_catalog_indexes(conn, tables)
+            if missing:
+                raise CatalogIndexMissing(
+                    f"{', '.join(t for t, _ in missing)} için tekil indeks yok (harf farkı kopyaları); "
+                    "önce: flask --app expOrigin-main/app.py dedupe-catalog --apply"
+                )
+        if kind == "categories":
+            diff = import_categories(conn, items, dry_run)
+        else:
+            diff = import_precautions(conn, items, dry_run, update_existing)
+    return diff
+
+
+def export_catalog(kind: str, fmt: str, cat_type: str | None = None) -> str:
+    """
+    import_catalog'un okuyabildiği biçimde dışa aktarır (satır listesi
+    categories.txt gibi bölüm başlıklıdır).
+    """
+    with get_read_connection() as conn:
+        if kind == "categories":
+            rows = []
+            for t, table in CATEGORY_TABLES.items():
+                if cat_type in (None, t):
+                    names = conn.execute(text(f"SELECT type FROM {table} ORDER BY id")).scalars().all()
+                    rows.extend((t, name) for name in names)
+        else:
+            rows = conn.execute(text("SELECT title, explanation FROM precautions ORDER BY id")).fetchall()
+
+    out = io.StringIO()
+    if kind == "categories":
+        if fmt == "json":
+            json.dump([{"type": t, "name": n} for t, n in rows], out, ensure_ascii=False, indent=2)
+        elif fmt == "csv":
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(["name", "type"])
+            writer.writerows((n, t) for t, n in rows)
+        else:
+            headings = {"risk": "Riskler", "event": "Olaylar"}
+            for t in CATEGORY_TABLES:
+                section = [n for rt, n in rows if rt == t]
+                if section:
+                    out.write(headings[t] + "\n" + "".join(f"• {n}\n" for n in section) + "\n")
+    else:
+        if fmt == "json":
+            json.dump([{"title": t, "explanation": e} for t, e in rows], out, ensure_ascii=False, indent=2)
+        elif fmt == "csv":
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(["title", "explanation"])
+            writer.writerows(rows)
+        else:
+            out.writelines(f"{t}\t{(e or '').replace(chr(10), ' ')}\n" for t, e in rows)
+    return out.getvalue()
+
+
+def _catalog_request_body() -> tuple[str, str]:
+    upload = request.files.get("file")
+    if upload:
+        return decode_catalog(upload.read()), catalog_format(request.values.get("format"), upload.filename, upload.mimetype)
+    return decode_catalog(request.get_data()), catalog_format(request.args.get("format"), "", request.mimetype)
+
+
+def _catalog_import_response(kind: str):
+    try:
+        body, fmt = _catalog_request_body()
+        cat_type = (request.values.get("type") or "").strip().lower() or None
+        if cat_type is not None and cat_type not in CATEGORY_TABLES:
+            return jsonify({"success": False, "message": "Geçersiz kategori tipi"}), 400
+        dry_run = request.values.get("dry_run") in ("1", "true")
+        update_existing = request.values.get("on_conflict", "update") != "skip"
+        diff = import_catalog(kind, body, fmt, cat_type, dry_run, update_existing)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"success": False, "message": f"Geçersiz içerik: {e}"}), 400
+    except CatalogIndexMissing as e:
+        return jsonify({"success": False, "message": str(e)}), 409
+    except DB_UNAVAILABLE_ERRORS:
+        return db_unavailable_response()
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+    if not dry_run:
+        mark_primary_reads()
+    return jsonify({"success": True, "dry_run": dry_run, "diff": diff})
+
+
+def _catalog_export_response(kind: str):
+    try:
+        fmt = catalog_format(request.args.get("format") or "json")
+        cat_type = (request.args.get("type") or "").strip().lower() or None
+        if cat_type is not None and cat_type not in CATEGORY_TABLES:
+            return jsonify({"success": False, "message": "Geçersiz kategori tipi"}), 400
+        body = export_catalog(kind, fmt, cat_type)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except DB_UNAVAILABLE_ERRORS:
+        return db_unavailable_response()
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+    ext = "txt" if fmt == "lines" else fmt
+    response = Response(body, mimetype=CATALOG_MIMETYPES[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{kind}.{ext}"'
+    return response
+
+
+@app.route("/api/categories/import", methods=["POST"])
+@admin_required
+def import_categories_route():
+    return _catalog_import_response("categories")
+
+
+@app.route("/api/categories/export", methods=["GET"])
+@admin_required
+@statement_budget("export")
+def export_categories_route():
+    return _catalog_export_response("categories")
+
+
+@app.route("/api/precautions/import", methods=["POST"])
+@admin_required
+def import_precautions_route():
+    return _catalog_import_response("precautions")
+
+
+@app.route("/api/precautions/export", methods=["GET"])
+@admin_required
+@statement_budget("export")
+def export_precautions_route():
+    return _catalog_export_response("precautions")
+
 # -----------------------------------------------------
 # Raporlar API’leri
 # -----------------------------------------------------
 def ensure_upload_dir():
-    upload_dir = os.path.join("static", "uploads")
+    upload_dir = UPLOAD_DIR
     if not os.path.isdir(upload_dir):
         try:
             os.makedirs(upload_dir, exist_ok=True)
@@ -510,9 +2855,434 @@ def ensure_upload_dir():
             print("Upload klasörü oluşturulamadı:", e)
     return upload_dir
 
+# -----------------------------------------------------
+# Ek dosya (görsel) servisi
+# -----------------------------------------------------
+# Yetki kontrolü Python'da yapılır; byte kopyalama worker dışında kalır:
+#   UPLOAD_OFFLOAD=""         send_file (gunicorn wsgi.file_wrapper -> sendfile(2))
+#   UPLOAD_OFFLOAD="nginx"    X-Accel-Redirect: UPLOAD_ACCEL_PREFIX + dosya adı
+#                             (nginx'te aynı prefix "internal" location olarak UPLOAD_DIR'e bağlanmalı)
+#   UPLOAD_OFFLOAD="sendfile" X-Sendfile: mutlak dosya yolu (Apache mod_xsendfile / lighttpd)
+UPLOAD_DIR = os.path.abspath(os.getenv("UPLOAD_DIR") or os.path.join(app.static_folder, "uploads"))
+UPLOAD_OFFLOAD = os.getenv("UPLOAD_OFFLOAD", "").strip().lower()
+UPLOAD_ACCEL_PREFIX = "/" + os.getenv("UPLOAD_ACCEL_PREFIX", "/_protected_uploads/").strip("/") + "/"
+UPLOAD_MAX_AGE_SECONDS = int(os.getenv("UPLOAD_MAX_AGE_SECONDS", "86400"))
+
+if UPLOAD_OFFLOAD not in ("", "nginx", "sendfile"):
+    raise RuntimeError(f"Geçersiz UPLOAD_OFFLOAD: {UPLOAD_OFFLOAD}")
+
+
+def _upload_viewer() -> tuple[int | None, bool]:
+    """
+    (user_id, is_admin). Web oturumu yoksa mobil Bearer token denenir.
+    """
+    if "user_id" in session:
+        return session["user_id"], bool(session.get("is_admin"))
+
+    auth = request.headers.get("Authorization", "")
+    if not auth.startswith("Bearer "):
+        return None, False
+    uid = verify_mobile_token(auth.split(" ", 1)[1].strip())
+    if uid is None:
+        return None, False
+    with get_read_connection() as conn:
+        row = conn.execute(text("SELECT role FROM users WHERE id=:uid"), {"uid": uid}).fetchone()
+    return uid, bool(row and row[0])
+
+
+@app.route("/uploads/<filename>")
+def serve_upload(filename):
+    # Yükleme adları "<user_id>_<zaman><uzantı>" biçimindedir; başka bir şey servis edilmez
+    if secure_filename(filename) != filename or "_" not in filename:
+        return jsonify({"success": False, "message": "Dosya bulunamadı"}), 404
+
+    uid, is_admin = _upload_viewer()
+    if uid is None:
+        return jsonify({"success": False, "message": "Giriş gerekli"}), 401
+    if not is_admin and not filename.startswith(f"{uid}_"):
+        return jsonify({"success": False, "message": "Erişim reddedildi"}), 403
+
+    path = os.path.join(UPLOAD_DIR, filename)
+    if not os.path.isfile(path):
+        return jsonify({"success": False, "message": "Dosya bulunamadı"}), 404
+
+    if UPLOAD_OFFLOAD:
+        # Range/ETag/If-None-Match işini proxy yapar; biz sadece yolu veririz
+        response = Response(status=200, mimetype=None)
+        if UPLOAD_OFFLOAD == "nginx":
+            response.headers["X-Accel-Redirect"] = UPLOAD_ACCEL_PREFIX + filename
+        else:
+            response.headers["X-Sendfile"] = path
+        response.headers.pop("Content-Type", None)
+    else:
+        # conditional=True: ETag + Last-Modified, If-None-Match/If-Modified-Since -> 304,
+        # Range -> 206. Dosya adı içerik başına benzersiz olduğu için ETag dosya başınadır.
+        response = send_file(path, conditional=True, etag=True, max_age=UPLOAD_MAX_AGE_SECONDS)
+
+    # Yetkiye bağlı içerik: paylaşımlı cache'ler saklamasın
+    response.cache_control.private = True
+    response.cache_control.public = None
+    response.cache_control.max_age = UPLOAD_MAX_AGE_SECONDS
+    return response
+
+
+@app.before_request
+def _legacy_upload_redirect():
+    # Eski raporlardaki /static/uploads/... bağlantıları yetki kontrolünden geçsin
+    prefix = app.static_url_path + "/uploads/"
+    if request.path.startswith(prefix):
+        return redirect(url_for("serve_upload", filename=request.path[len(prefix):]), code=301)
+
+
+# -----------------------------------------------------
+# Rapor sorguları (SQLAlchemy Core)
+# -----------------------------------------------------
+# Liste, sayım, facet ve bildirim sorguları istek başına f-string'le üretilmez;
+# aşağıdaki sabit Core ifadelerinden kurulur. Aynı "şekil" (seçilen alanlar +
+# hangi filtrelerin verildiği) her zaman aynı SQL metnine derlenir: SQLAlchemy'nin
+# engine başına derlenmiş cache'i yeniden kullanılır (db_compiled_cache_total)
+# ve Postgres değerler değişse de aynı ifadeyi görür. Değerler (LIMIT/OFFSET
+# dahil) her zaman bind parametresidir.
+# Hiçbiri users'a JOIN yapmaz: raporlayanın adı reports.fullname'dir (ad
+# değişiklikleri sync-reporter-names işiyle taşınır).
+_reports = table(
+    "reports",
+    column("report_id", Integer),
+    column("id", Integer),
+    column("type", Text),
+    column("date", DateTime),
+    column("fullname", Text),
+    column("details", Text),
+    column("witnesses", Text),
+    column("department", Text),
+    column("created_xid"),
+)
+_report_witnesses = table("report_witnesses", column("report_id", Integer), column("user_id", Integer))
+_r = _reports.alias("r")
+
+# Liste uç noktalarında fields= ile seçilebilen kolonlar (ad -> Core ifadesi).
+# "summary" kartlarda gösterilen kısa kısımdır (serbest metin "Detaylar:" öncesi).
+REPORT_FIELDS = {
+    "report_id": _r.c.report_id,
+    "user_id": _r.c.id,
+    "type": _r.c.type,
+    "date": _r.c.date,
+    "fullname": _r.c.fullname,
+    "reporter_name": _r.c.fullname,
+    "summary": func.left(func.split_part(_r.c.details, " | Detaylar: ", 1), 300),
+    "details": _r.c.details,
+    "witnesses": _r.c.witnesses,
+    "department": _r.c.department,
+}
+# fields= verilmezse eski yanıt şekli korunur (+ report_id)
+REPORT_DEFAULT_FIELDS = (
+    "report_id", "user_id", "type", "date", "fullname",
+    "reporter_name", "details", "witnesses", "department",
+)
+MOBILE_REPORT_DEFAULT_FIELDS = tuple(f for f in REPORT_DEFAULT_FIELDS if f != "fullname")
+# Bildirim akışı (check-new-reports, unread, debug) eski anahtarlarıyla: user_id yerine id
+REPORT_FEED_COLUMNS = (
+    _r.c.report_id,
+    _r.c.id,
+    _r.c.type,
+    _r.c.date,
+    _r.c.fullname,
+    REPORT_FIELDS["reporter_name"].label("reporter_name"),
+    _r.c.witnesses,
+    _r.c.department,
+)
+REPORT_FILTER_KEYS = ("q", "type", "date_from", "date_to")
+
+
+def parse_report_fields(default_fields) -> list[str]:
+    """
+    ?fields=report_id,type,date gibi bir listeyi doğrular. Bilinmeyen alan -> ValueError.
+    """
+    raw = (request.args.get("fields") or "").strip()
+    if not raw:
+        return list(default_fields)
+    fields = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in REPORT_FIELDS:
+            raise ValueError(f"Bilinmeyen alan: {name}")
+        fields.append(name)
+    return fields or list(default_fields)
+
+
+def parse_report_filters() -> dict:
+    """?q=, ?type=, ?date_from=, ?date_to= içinden dolu olanlar."""
+    filters = {}
+    for key in REPORT_FILTER_KEYS:
+        value = (request.args.get(key) or "").strip()
+        if value:
+            filters[key] = value
+    return filters
+
+
+def report_columns(fields) -> list:
+    return [REPORT_FIELDS[name].label(name) for name in fields]
+
+
+def report_filter_criteria(filters: dict) -> list:
+    # Metin parametreleri Text'e sabitlenir: aksi halde ASCII olmayan değerler
+    # (Türkçe isimler) Unicode tipine çıkarılır ve aynı sorgu iki ayrı cache kaydı alır
+    criteria = []
+    if "q" in filters:
+        criteria.append(func.lower(_r.c.fullname).like(func.lower(literal(f"%{filters['q']}%", Text))))
+    if "type" in filters:
+        criteria.append(func.lower(_r.c.type) == func.lower(literal(filters["type"], Text)))
+    if "date_from" in filters:
+        criteria.append(_r.c.date >= filters["date_from"])
+    if "date_to" in filters:
+        criteria.append(_r.c.date <= filters["date_to"])
+    return criteria
+
+
+def report_count_query(filters: dict):
+    return select(func.count()).select_from(_r).where(*report_filter_criteria(filters))
+
+
+def report_page_query(fields, filters: dict, limit: int, offset: int):
+    return (
+        select(*report_columns(fields))
+        .select_from(_r)
+        .where(*report_filter_criteria(filters))
+        .order_by(_r.c.date.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def report_feed_criteria(after: tuple) -> list:
+    """
+    İmleç konumundan (xid, report_id) sonraki, commit'i kesinleşmiş raporlar.
+    Snapshot xmin'inden küçük xid'li transaction'ların hepsi bitmiştir: bu küme
+    artık değişmez. report_id tek başına yetmez; küçük id alan bir transaction
+    büyük id'li biri teslim edildikten sonra commit edebilir.
+    """
+    xid, report_id = after
+    return [
+        tuple_(_r.c.created_xid, _r.c.report_id) > tuple_(xid, report_id),
+        _r.c.created_xid < func.pg_snapshot_xmin(func.pg_current_snapshot()),
+    ]
+
+
+def report_feed_query(limit: int, after: tuple | None = None):
+    """
+    after verilirse imleçten sonraki raporlar commit sırasıyla (imleç akışı),
+    verilmezse en yeni raporlar.
+    """
+    stmt = select(*REPORT_FEED_COLUMNS).select_from(_r)
+    if after is None:
+        return stmt.order_by(_r.c.report_id.desc()).limit(limit)
+    return (
+        stmt.where(*report_feed_criteria(after))
+        .order_by(_r.c.created_xid, _r.c.report_id)
+        .limit(limit)
+    )
+
+
+def report_detail_query(report_id: int):
+    return (
+        select(*report_columns(REPORT_DEFAULT_FIELDS))
+        .select_from(_r)
+        .where(_r.c.report_id == report_id)
+    )
+
+
+def report_involving_query(uid: int, fields, before: int, limit: int):
+    """
+    Kullanıcının tanık ya da raporlayan olduğu raporlar (keyset: before'dan küçükler).
+    İki kol da indeks taramasıdır: report_witnesses (user_id, report_id) ve
+    reports (id, report_id).
+    """
+    involved = union_all(
+        select(_report_witnesses.c.report_id, literal_column("'witness'").label("role"))
+        .where(_report_witnesses.c.user_id == uid, _report_witnesses.c.report_id < before),
+        select(_reports.c.report_id, literal_column("'reporter'").label("role"))
+        .where(_reports.c.id == uid, _reports.c.report_id < before),
+    ).cte("involved")
+    page = (
+        select(
+            involved.c.report_id,
+            func.array_agg(aggregate_order_by(involved.c.role, involved.c.role)).label("involvement"),
+        )
+        .group_by(involved.c.report_id)
+        .order_by(involved.c.report_id.desc())
+        .limit(limit)
+        .cte("page")
+    )
+    return (
+        select(*report_columns(fields), page.c.involvement)
+        .select_from(page.join(_r, _r.c.report_id == page.c.report_id))
+        .order_by(_r.c.report_id.desc())
+    )
+
+
+def serialize_report(row) -> dict:
+    item = dict(row)
+    raw_date = item.get("date")
+    if "date" in item:
+        item["date"] = raw_date.isoformat() if isinstance(raw_date, datetime) else (str(raw_date) if raw_date else None)
+    return item
+
+
+class TTLCache:
+    """
+    Worker içi, boyutu sınırlı ve süreli basit cache (thread-safe).
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 256):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._store = OrderedDict()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._store[key]
+                return None
+            self._store.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._store[key] = (time.monotonic() + self.ttl, value)
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+
+
+# facets= ile istenebilen gruplamalar (ad -> GROUP BY ifadesi)
+REPORT_FACETS = {
+    "type": _r.c.type,
+    "department": _r.c.department,
+    "day": cast(_r.c.date, Date),
+}
+REPORT_FACET_MAX_DAYS = int(os.getenv("REPORT_FACET_MAX_DAYS", "90"))
+FACET_CACHE_TTL_SECONDS = float(os.getenv("FACET_CACHE_TTL_SECONDS", "30"))
+_facet_cache = TTLCache(FACET_CACHE_TTL_SECONDS)
+
+
+def parse_report_facets() -> list[str]:
+    raw = (request.args.get("facets") or "").strip()
+    facets = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name or name in facets:
+            continue
+        if name not in REPORT_FACETS:
+            raise ValueError(f"Bilinmeyen facet: {name}")
+        facets.append(name)
+    return facets
+
+
+def report_facets_query(facets, filters: dict):
+    columns = []
+    for name in facets:
+        expr = REPORT_FACETS[name]
+        columns += [expr.label(name), func.grouping(expr).label(f"g_{name}")]
+    grouping_sets = [tuple_(REPORT_FACETS[name]) for name in facets] + [tuple_()]
+    return (
+        select(*columns, func.count().label("n"))
+        .select_from(_r)
+        .where(*report_filter_criteria(filters))
+        .group_by(func.grouping_sets(*grouping_sets))
+    )
+
+
+def compute_report_facets(conn, facets, filters: dict) -> tuple[int, dict]:
+    """
+    İstenen tüm facet sayımlarını ve toplamı tek sorguda (GROUPING SETS) hesaplar.
+    Dönüş: (toplam, {"type": [{"value": ..., "count": ...}], ...})
+    Sonuç filtre + facet kombinasyonu için FACET_CACHE_TTL_SECONDS boyunca saklanır.
+    """
+    cache_key = (tuple(facets), tuple(sorted(filters.items())))
+    cached = _facet_cache.get(cache_key)
+    if cached is not None:
+        metrics.inc("report_facet_cache_total", (("result", "hit"),))
+        return cached
+    metrics.inc("report_facet_cache_total", (("result", "miss"),))
+
+    rows = conn.execute(report_facets_query(facets, filters)).mappings().all()
+
+    total, result = 0, {f: [] for f in facets}
+    for row in rows:
+        grouped = [f for f in facets if row[f"g_{f}"] == 0]
+        if not grouped:
+            total = row["n"]
+            continue
+        name = grouped[0]
+        value = row[name]
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        result[name].append({"value": value, "count": row["n"]})
+
+    for name, buckets in result.items():
+        if name == "day":
+            buckets.sort(key=lambda b: b["value"] or "", reverse=True)
+            del buckets[REPORT_FACET_MAX_DAYS:]
+        else:
+            buckets.sort(key=lambda b: (-b["count"], b["value"] or ""))
+
+    _facet_cache.set(cache_key, (total, result))
+    return total, result
+
+
+INVOLVING_DEFAULT_FIELDS = ("report_id", "type", "date", "reporter_name", "summary", "department")
+
+
+def fetch_reports_involving(uid: int, fields, before: int | None, limit: int) -> list[dict]:
+    """
+    Kullanıcının tanık ya da raporlayan olduğu raporlar, report_id'ye göre yeniden eskiye.
+    """
+    with get_read_connection() as conn:
+        rows = conn.execute(report_involving_query(uid, fields, before or 2**62, limit)).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def _involving_page(uid: int, default_fields):
+    """
+    (payload, None) veya (None, hata yanıtı). ?fields=, ?before=<report_id>, ?limit=
+    """
+    try:
+        fields = parse_report_fields(default_fields)
+        limit = max(1, min(int(request.args.get("limit", 20)), 100))
+        before = int(request.args["before"]) if request.args.get("before") else None
+    except ValueError as e:
+        return None, (jsonify({"success": False, "message": f"Geçersiz parametre: {e}"}), 400)
+
+    if "report_id" not in fields:
+        fields = ["report_id"] + fields
+    items = fetch_reports_involving(uid, fields, before, limit)
+    return {
+        "success": True,
+        "items": items,
+        "next_before": items[-1]["report_id"] if len(items) == limit else None,
+    }, None
+
+
+def fetch_report_detail(report_id: int):
+    with get_read_connection() as conn:
+        row = conn.execute(report_detail_query(report_id)).mappings().first()
+    return dict(row) if row else None
+
+
 @app.route("/api/reports")
 @login_required
 def api_reports():
+    snapshot_name = None
     try:
         # params
         try:
@@ -524,6 +3294,17 @@ def api_reports():
         limit = max(1, min(limit, 100))
         offset = max(0, offset)
 
+        try:
+            fields = parse_report_fields(REPORT_DEFAULT_FIELDS)
+            facets = parse_report_facets()
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        filters = parse_report_filters()
+
+        # Filtresiz ilk sayfa DB yokken son bilinen haliyle sunulabilir
+        if offset == 0 and not filters:
+            snapshot_name = "reports_" + "-".join(fields)
+
         with get_db_connection() as conn:
             role_row = conn.execute(
                 text("SELECT role FROM users WHERE id = :uid"),
@@ -532,87 +3313,87 @@ def api_reports():
         if not role_row or not role_row[0]:
             return jsonify({"success": False, "message": "Erişim reddedildi"}), 403
 
-        q = (request.args.get("q") or "").strip()
-        report_type = (request.args.get("type") or "").strip()
-        date_from = (request.args.get("date_from") or "").strip()
-        date_to = (request.args.get("date_to") or "").strip()
-
-        where_clauses, params = [], {}
-        if q:
-            where_clauses.append("LOWER(u.fullname) LIKE LOWER(:q)")
-            params["q"] = f"%{q}%"
-        if report_type:
-            where_clauses.append("LOWER(r.type) = LOWER(:rtype)")
-            params["rtype"] = report_type
-        if date_from:
-            where_clauses.append("r.date::timestamp >= :dfrom")
-            params["dfrom"] = date_from
-        if date_to:
-            where_clauses.append("r.date::timestamp <= :dto")
-            params["dto"] = date_to
-
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-
-        with get_db_connection() as conn:
-            total_count = conn.execute(
-                text(f"""
-                    SELECT COUNT(*)
-                    FROM reports r
-                    LEFT JOIN users u ON r.id = u.id
-
-                    {where_sql}
-                """),
-                params
-            ).scalar() or 0
-
-            rows = conn.execute(
-                text(f"""
-                    SELECT
-                        r.id,
-                        r.type,
-                        r.date,
-                        r.fullname,
-                        COALESCE(u.fullname, r.fullname) AS reporter_name,
-                        r.details,
-                        r.witnesses,
-                        r.department
-                    FROM reports r
-                    JOIN users u ON r.id = u.id
-                    {where_sql}
-                    ORDER BY r.date DESC
-                    LIMIT :limit OFFSET :offset
-                """),
-                {**params, "limit": limit, "offset": offset}
-            ).fetchall()
+        facet_counts = None
+        with get_read_connection() as conn:
+            if facets:
+                # Toplam da aynı GROUPING SETS sorgusundan gelir; ayrı COUNT gerekmez
+                total_count, facet_counts = compute_report_facets(conn, facets, filters)
+            else:
+                total_count = conn.execute(report_count_query(filters)).scalar() or 0
 
-        items = []
-        for row in rows:
-            raw_date = row[2]
-            date_value = raw_date.isoformat() if isinstance(raw_date, datetime) else (str(raw_date) if raw_date else None)
-            items.append({
-                "user_id": row[0],
-                "type": row[1],
-                "date": date_value,
-                "fullname": row[3],
-                "reporter_name": row[4],
-                "details": row[5],
-                "witnesses": row[6],
-                "department": row[7],
-            })
+            rows = conn.execute(report_page_query(fields, filters, limit, offset)).mappings().all()
+
+        items = [serialize_report(row) for row in rows]
 
         has_more = offset + len(items) < total_count
 
-        return jsonify({
+        payload = {
             "success": True,
             "items": items,
             "total": total_count,
             "has_more": has_more,
             "next_offset": offset + len(items),
-        })
+        }
+        if facet_counts is not None:
+            payload["facets"] = facet_counts
+        if snapshot_name:
+            save_snapshot(snapshot_name, payload)
+        return jsonify(payload)
+    except DB_UNAVAILABLE_ERRORS:
+        # Rol DB'den okunamadığı için oturumdaki admin bayrağına güvenilir
+        snapshot = load_snapshot(snapshot_name) if snapshot_name and session.get("is_admin") else None
+        if snapshot is None:
+            return db_unavailable_response()
+        payload, saved_at = snapshot
+        return jsonify({**payload, "has_more": False, "degraded": True, "snapshot_at": saved_at})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+@app.route("/api/reports/<int:report_id>")
+@login_required
+def api_report_detail(report_id):
+    """
+    Listede fields= ile kısaltılmış raporun tam hali (details/witnesses).
+    Admin her raporu, kullanıcı yalnızca kendi raporunu görür.
+    """
+    try:
+        item = fetch_report_detail(report_id)
+        if not item:
+            return jsonify({"success": False, "message": "Rapor bulunamadı"}), 404
+        item = serialize_report(item)
+
+        if item["user_id"] != session["user_id"]:
+            with get_db_connection() as conn:
+                role_row = conn.execute(
+                    text("SELECT role FROM users WHERE id = :uid"),
+                    {"uid": session["user_id"]}
+                ).fetchone()
+            if not role_row or not role_row[0]:
+                return jsonify({"success": False, "message": "Erişim reddedildi"}), 403
+
+        return jsonify({"success": True, "item": item})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+@app.route("/api/reports/involving-me")
+@login_required
+def api_reports_involving_me():
+    """
+    Oturumdaki kullanıcının tanık olduğu veya yazdığı raporlar (involvement alanında).
+    """
+    try:
+        payload, error = _involving_page(session["user_id"], INVOLVING_DEFAULT_FIELDS)
+        if error:
+            return error
+        payload["items"] = [serialize_report(item) for item in payload["items"]]
+        return jsonify(payload)
+    except DB_UNAVAILABLE_ERRORS:
+        return db_unavailable_response()
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
 @app.route("/submit-risk-report", methods=["POST"])
+@rate_limited("report")
 def submit_risk_report():
     if "user_id" not in session:
         return jsonify({"success": False, "message": "Giriş gerekli"}), 401
@@ -621,6 +3402,7 @@ def submit_risk_report():
     risk_types = request.form.getlist("risk_type[]")
     details = (request.form.get("details") or "").strip()
     witnesses = (request.form.get("witnesses") or "").strip()  # ✅ EKLENDİ
+    witness_ids = parse_witness_ids(request.form.getlist("witness_ids[]"))
 
     if not department or not risk_types or len(details) < 5:
         return jsonify({"success": False, "message": "Eksik veya hatalı alanlar"}), 400
@@ -640,7 +3422,7 @@ def submit_risk_report():
         filepath = os.path.join(upload_dir, final_name)
         try:
             f.save(filepath)
-            saved_paths.append(f"/static/uploads/{final_name}")
+            saved_paths.append(url_for("serve_upload", filename=final_name))
         except Exception:
             app.logger.exception("Görsel kaydedilemedi")
 
@@ -649,27 +3431,25 @@ def submit_risk_report():
     summary_details = f"Departman: {department} | Risk Türleri: {', '.join(risk_types)} | Detaylar: {details}{attachments_text}"
 
     try:
-        with db.engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO reports (id, type, date, fullname, details, witnesses, department)
-                    VALUES (:uid, :type, :date, :fullname, :details, :witnesses, :department)
-                """),
-                {
-                    "uid": session["user_id"],
-                    "type": summary_type,
-                    "date": datetime.utcnow(),
-                    "fullname": session.get("fullname", ""),
-                    "details": summary_details,
-                    "witnesses": witnesses or None,   # ✅ DEĞİŞTİ
-                    "department": department,
-                }
-            )
+        stored = store_report({
+            "uid": session["user_id"],
+            "type": summary_type,
+            "date": datetime.utcnow(),
+            "fullname": session.get("fullname", ""),
+            "details": summary_details,
+            "witnesses": witnesses or None,   # ✅ DEĞİŞTİ
+            "witness_ids": witness_ids,
+            "department": department,
+        })
+        if not stored:
+            return spooled_response("Risk raporu alındı")
+        mark_primary_reads()
         return jsonify({"success": True, "message": "Risk raporu başarıyla kaydedildi"})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
 @app.route("/submit-event-report", methods=["POST"])
+@rate_limited("report")
 def submit_event_report():
     if "user_id" not in session:
         return jsonify({"success": False, "message": "Giriş gerekli"}), 401
@@ -679,6 +3459,7 @@ def submit_event_report():
     location = (request.form.get("location") or "").strip()
     details = (request.form.get("details") or "").strip()
     witnesses = (request.form.get("witnesses") or "").strip()
+    witness_ids = parse_witness_ids(request.form.getlist("witness_ids[]"))
 
     if not department or not event_types or not location or len(details) < 5:
         return jsonify({"success": False, "message": "Eksik veya hatalı alanlar"}), 400
@@ -698,7 +3479,7 @@ def submit_event_report():
         filepath = os.path.join(upload_dir, final_name)
         try:
             f.save(filepath)
-            saved_paths.append(f"/static/uploads/{final_name}")
+            saved_paths.append(url_for("serve_upload", filename=final_name))
         except Exception:
             app.logger.exception("Görsel kaydedilemedi")
 
@@ -707,112 +3488,195 @@ def submit_event_report():
     summary_details = f"Departman: {department} | Olay Türleri: {', '.join(event_types)} | Yer: {location} | Detaylar: {details}{attachments_text}"
 
     try:
-        with db.engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO reports (id, type, date, fullname, details, witnesses, department)
-                    VALUES (:uid, :type, :date, :fullname, :details, :witnesses, :department)
-                """),
-                {
-                    "uid": session["user_id"],
-                    "type": summary_type,
-                    "date": datetime.utcnow(),
-                    "fullname": session.get("fullname", ""),
-                    "details": summary_details,
-                    "witnesses": witnesses or None,
-                    "department": department,
-                }
-            )
+        stored = store_report({
+            "uid": session["user_id"],
+            "type": summary_type,
+            "date": datetime.utcnow(),
+            "fullname": session.get("fullname", ""),
+            "details": summary_details,
+            "witnesses": witnesses or None,
+            "witness_ids": witness_ids,
+            "department": department,
+        })
+        if not stored:
+            return spooled_response("Olay raporu alındı")
+        mark_primary_reads()
         return jsonify({"success": True, "message": "Olay raporu başarıyla kaydedildi"})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
 @app.route("/submit-emergency-report", methods=["POST"])
+# Bilerek hız sınırı yok: acil yardım sinyali hiçbir koşulda 429 almamalı
 @login_required
 def submit_emergency_report():
     try:
-        with db.engine.begin() as conn:
-            conn.execute(text("""
-                INSERT INTO reports (id, type, date, fullname, witnesses, department)
-                VALUES (:uid, :type, :date, :fullname, :witnesses, :department)
-            """), {
-                "uid": session["user_id"],
-                "type": "Acil Yardım Sinyali",
-                "date": datetime.utcnow(),
-                "fullname": session.get("fullname"),
-                "witnesses": None,
-                "department": None,
-            })
+        stored = store_report({
+            "uid": session["user_id"],
+            "type": "Acil Yardım Sinyali",
+            "date": datetime.utcnow(),
+            "fullname": session.get("fullname"),
+            "details": None,
+            "witnesses": None,
+            "department": None,
+        })
+        if not stored:
+            return spooled_response("Acil yardım sinyali alındı")
+        mark_primary_reads()
         return jsonify({"success": True, "message": "Acil yardım sinyali başarıyla gönderildi!"})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
+# -----------------------------------------------------
+# Admin bildirimleri: admin başına okunmamış imleci
+# -----------------------------------------------------
+# Her admin için son görülen konum (xid, report_id) saklanır; "yeni" = commit'i
+# kesinleşmiş ve konumdan büyük raporlar (bkz. report_feed_criteria). Sorgular
+# reports_xid_idx üzerinde aralık taramasıdır (O(yeni satır)), saat/zaman dilimi
+# farklarından etkilenmez.
+UNREAD_PAGE_SIZE = int(os.getenv("UNREAD_PAGE_SIZE", "50"))
+
+
+def get_admin_cursor(conn, uid: int, for_update: bool = False) -> tuple[str, int]:
+    """
+    Admin'in imlecini (xid, report_id) döner; ilk kez soruluyorsa imleç şu anki
+    commit ufkuna kurulur (geçmiş raporların hepsi "yeni" sayılmasın).
+    """
+    lock_sql = " FOR UPDATE" if for_update else ""
+    select_sql = (
+        "SELECT last_seen_xid::text, last_seen_report_id FROM admin_report_cursors "
+        f"WHERE user_id = :uid{lock_sql}"
+    )
+    row = conn.execute(text(select_sql), {"uid": uid}).fetchone()
+    if row is not None:
+        return row[0], row[1]
+    conn.execute(
+        text("""
+            INSERT INTO admin_report_cursors (user_id, last_seen_xid, last_seen_report_id, updated_at)
+            VALUES (:uid, pg_snapshot_xmin(pg_current_snapshot()), 0, NOW())
+            ON CONFLICT (user_id) DO NOTHING
+        """),
+        {"uid": uid}
+    )
+    row = conn.execute(text(select_sql), {"uid": uid}).fetchone()
+    return row[0], row[1]
+
+
+def peek_admin_cursor(conn, uid: int) -> tuple[str, int]:
+    """
+    Salt okunur get_admin_cursor: imleç yoksa oluşturmaz, şu anki commit ufkunu
+    döner. Okuma bağlantısıyla (replika olabilir) kullanılır.
+    """
+    row = conn.execute(
+        text("SELECT last_seen_xid::text, last_seen_report_id FROM admin_report_cursors WHERE user_id = :uid"),
+        {"uid": uid}
+    ).fetchone()
+    if row is None:
+        row = conn.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text, 0")).fetchone()
+    return row[0], row[1]
+
+
+def fetch_reports_after(conn, cursor: tuple, limit: int) -> list[dict]:
+    rows = conn.execute(report_feed_query(limit, after=cursor)).mappings().all()
+    return [serialize_report(row) for row in rows]
+
+
+def advance_admin_cursor(conn, uid: int, report_id: int):
+    # İmleç asla geri gitmez ve commit'i kesinleşmemiş bir raporun ötesine geçmez
+    conn.execute(
+        text("""
+            UPDATE admin_report_cursors c
+            SET last_seen_xid = r.created_xid, last_seen_report_id = r.report_id, updated_at = NOW()
+            FROM reports r
+            WHERE c.user_id = :uid
+              AND r.report_id = :rid
+              AND (c.last_seen_xid, c.last_seen_report_id) < (r.created_xid, r.report_id)
+              AND r.created_xid < pg_snapshot_xmin(pg_current_snapshot())
+        """),
+        {"uid": uid, "rid": report_id}
+    )
+
+
 @app.route("/check-new-reports")
 @admin_required
 def check_new_reports():
+    """
+    İmleçten sonraki raporları döner ve imleci aynı transaction'da ilerletir:
+    her rapor bir admin'e bir kez bildirilir (aynı admin'in birden çok sekmesi
+    FOR UPDATE ile sıraya girer). Yanıt yeniden eskiye sıralıdır.
+    """
     try:
-        with get_db_connection() as conn:
-            rows = conn.execute(text("""
-                SELECT r.id, r.type, r.date, r.fullname, u.fullname AS reporter_name, r.witnesses, r.department
-                FROM reports r
-                JOIN users u ON r.id = u.id
-                WHERE r.date::timestamp >= NOW() - INTERVAL '10 second'
-                ORDER BY r.date DESC
-            """)).fetchall()
-
-        reports_data = [{
-            "id": row[0],
-            "type": row[1],
-            "date": row[2].isoformat() if isinstance(row[2], datetime) else str(row[2]),
-            "fullname": row[3],
-            "reporter_name": row[4],
-            "witnesses": row[5],
-            "department": row[6],
-        } for row in rows]
+        uid = session["user_id"]
+        with db.engine.begin() as conn:
+            cursor = get_admin_cursor(conn, uid, for_update=True)
+            items = fetch_reports_after(conn, cursor, UNREAD_PAGE_SIZE)
+            if items:
+                advance_admin_cursor(conn, uid, items[-1]["report_id"])
 
+        reports_data = list(reversed(items))
         return jsonify({"success": True, "new_reports": reports_data, "count": len(reports_data)})
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
+@app.route("/api/reports/unread")
+@admin_required
+def api_reports_unread():
+    """
+    İmleci ilerletmeden okunmamış sayısı + imleçten sonraki ilk sayfa.
+    Teslim edilenler POST /api/reports/unread/ack ile onaylanır.
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit", UNREAD_PAGE_SIZE)), 200))
+    except ValueError:
+        return jsonify({"success": False, "message": "Geçersiz parametre"}), 400
+    try:
+        with get_read_connection() as conn:
+            cursor = peek_admin_cursor(conn, session["user_id"])
+            unread = conn.execute(
+                select(func.count()).select_from(_r).where(*report_feed_criteria(cursor))
+            ).scalar() or 0
+            items = fetch_reports_after(conn, cursor, limit)
+        return jsonify({"success": True, "cursor": cursor[1], "unread_count": unread, "items": items})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+@app.route("/api/reports/unread/ack", methods=["POST"])
+@admin_required
+def api_reports_unread_ack():
+    data = request.get_json(silent=True) or {}
+    try:
+        up_to = int(data.get("up_to"))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "up_to (report_id) gerekli"}), 400
+    try:
+        with db.engine.begin() as conn:
+            get_admin_cursor(conn, session["user_id"], for_update=True)
+            advance_admin_cursor(conn, session["user_id"], up_to)
+        # Sonraki /unread okuması replikadaki eski imleci görmesin
+        mark_primary_reads()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
 @app.route("/debug-reports")
-@login_required
+@admin_required
 def debug_reports():
     try:
-        with get_db_connection() as conn:
-            all_reports = conn.execute(text("""
-                SELECT r.id, r.type, r.date, r.fullname, u.fullname AS reporter_name, r.witnesses, r.department
-                FROM reports r
-                JOIN users u ON r.id = u.id
-                ORDER BY r.date DESC
-                LIMIT 10
-            """)).fetchall()
-
-            new_reports = conn.execute(text("""
-                SELECT r.id, r.type, r.date, r.fullname, u.fullname AS reporter_name, r.witnesses, r.department
-                FROM reports r
-                JOIN users u ON r.id = u.id
-                WHERE r.date::timestamp >= NOW() - INTERVAL '10 second'
-                ORDER BY r.date DESC
-            """)).fetchall()
-
-        def serialize(rows):
-            return [{
-                "id": r[0],
-                "type": r[1],
-                "date": r[2].isoformat() if isinstance(r[2], datetime) else str(r[2]),
-                "fullname": r[3],
-                "reporter_name": r[4],
-                "witnesses": r[5],
-                "department": r[6],
-            } for r in rows]
+        # Yeni = oturumdaki admin'in imlecinden sonrakiler (imleç oluşturulmaz/ilerletilmez)
+        with get_read_connection() as conn:
+            all_reports = [
+                serialize_report(row) for row in conn.execute(report_feed_query(10)).mappings().all()
+            ]
+            cursor = peek_admin_cursor(conn, session["user_id"])
+            new_reports = fetch_reports_after(conn, cursor, UNREAD_PAGE_SIZE)
 
         return jsonify({
             "success": True,
-            "all_reports": serialize(all_reports),
-            "new_reports": serialize(new_reports),
+            "all_reports": all_reports,
+            "new_reports": new_reports,
             "current_time": datetime.utcnow().isoformat(),
             "total_reports": len(all_reports),
             "new_reports_count": len(new_reports),
+            "cursor": cursor[1],
         })
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
@@ -835,6 +3699,7 @@ def check_admin_status():
 # Kullanıcı Yönetimi
 # -----------------------------------------------------
 @app.route("/register", methods=["GET", "POST"])
+@rate_limited("auth", html=True)
 def register():
     if request.method == "POST":
         fullname = (request.form.get("fullname") or "").strip()
@@ -872,6 +3737,7 @@ def register():
     return render_template("register.html", active_page="register")
 
 @app.route("/login", methods=["GET", "POST"])
+@rate_limited("auth", html=True)
 def login():
     if request.method == "POST":
         email = (request.form.get("email") or "").strip()
@@ -968,6 +3834,7 @@ def api_update_email():
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
 
 @app.route("/api/profile/password", methods=["POST"])
+@rate_limited("auth")
 @login_required
 def api_update_password():
     try:
@@ -992,7 +3859,7 @@ def search_users():
         if len(query) < 2:
             return jsonify({"success": True, "users": []})
 
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             rows = conn.execute(text("""
                 SELECT id, fullname
                 FROM users
@@ -1014,7 +3881,83 @@ def logout():
     flash("Başarıyla çıkış yaptınız.", "success")
     return redirect(url_for("index"))
 
+# -----------------------------------------------------
+# Mobil API: içerik anlaşması (JSON / MessagePack)
+# -----------------------------------------------------
+# "Accept: application/msgpack" gönderen istemciye MessagePack döner:
+#   - datetime alanları UTC epoch milisaniye (int) olarak kodlanır
+#   - ?dict=type,department ile items içindeki tekrarlı metinler indekse çevrilir,
+#     değerler yanıttaki "dictionary" alanında gelir (JSON'da da çalışır)
+# msgpack kurulu değilse her zaman JSON döner. Hata yanıtları JSON kalır.
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+MOBILE_DICT_FIELDS = ("type", "department", "reporter_name")
+
+
+def wants_msgpack() -> bool:
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def _encode_value(value, binary: bool):
+    if isinstance(value, datetime):
+        if not binary:
+            return value.isoformat()
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, dict):
+        return {k: _encode_value(v, binary) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v, binary) for v in value]
+    return value
+
+
+def _dictionary_encode(payload: dict, fields):
+    items = payload.get("items")
+    if not isinstance(items, list):
+        return
+    dictionary = {}
+    for field in fields:
+        index, values = {}, []
+        for item in items:
+            if field not in item:
+                continue
+            value = item[field]
+            if value not in index:
+                index[value] = len(values)
+                values.append(value)
+            item[field] = index[value]
+        dictionary[field] = values
+    payload["dictionary"] = dictionary
+
+
+def mobile_response(payload: dict, status: int = 200):
+    dict_fields = [
+        f for f in (request.args.get("dict") or "").split(",")
+        if f.strip() in MOBILE_DICT_FIELDS
+    ]
+    if dict_fields:
+        _dictionary_encode(payload, [f.strip() for f in dict_fields])
+
+    if wants_msgpack():
+        body = msgpack.packb(_encode_value(payload, binary=True), use_bin_type=True)
+        response = Response(body, status=status, mimetype=MSGPACK_MIMETYPES[0])
+    else:
+        response = jsonify(_encode_value(payload, binary=False))
+        response.status_code = status
+    response.vary.add("Accept")
+    return response
+
+
 @app.route("/api/mobile-login", methods=["POST"])
+@rate_limited("auth")
 def api_mobile_login():
     try:
         data = request.get_json(force=True) or {}
@@ -1037,7 +3980,7 @@ def api_mobile_login():
 
         token = create_mobile_token(user[0])  # ✅ EKLENDİ
 
-        return jsonify({
+        return mobile_response({
             "success": True,
             "message": "Giriş başarılı!",
             "token": token,  # ✅ EKLENDİ
@@ -1047,7 +3990,7 @@ def api_mobile_login():
                 "email": user[2],
                 "is_admin": bool(user[4])
             }
-        }), 200
+        }, 200)
 
     except Exception as e:
         return jsonify({"success": False, "message": f"Hata: {e}"}), 500
@@ -1066,78 +4009,22 @@ def api_mobile_admin_reports():
         limit = max(1, min(limit, 100))
         offset = max(0, offset)
 
-        q = (request.args.get("q") or "").strip()
-        report_type = (request.args.get("type") or "").strip()
-        date_from = (request.args.get("date_from") or "").strip()
-        date_to = (request.args.get("date_to") or "").strip()
-
-        where_clauses, params = [], {}
-
-        if q:
-            where_clauses.append("LOWER(u.fullname) LIKE LOWER(:q)")
-            params["q"] = f"%{q}%"
-
-        if report_type:
-            where_clauses.append("LOWER(r.type) = LOWER(:rtype)")
-            params["rtype"] = report_type
-
-        if date_from:
-            where_clauses.append("r.date::timestamp >= :dfrom")
-            params["dfrom"] = date_from
-
-        if date_to:
-            where_clauses.append("r.date::timestamp <= :dto")
-            params["dto"] = date_to
-
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
-
-        with get_db_connection() as conn:
-            total_count = conn.execute(
-                text(f"""
-                    SELECT COUNT(*)
-                    FROM reports r
-                    JOIN users u ON r.id = u.id
-                    {where_sql}
-                """),
-                params
-            ).scalar() or 0
+        try:
+            fields = parse_report_fields(MOBILE_REPORT_DEFAULT_FIELDS)
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+        filters = parse_report_filters()
 
-            rows = conn.execute(
-                text(f"""
-                    SELECT
-                        r.id as user_id,
-                        r.type,
-                        r.date,
-                        u.fullname AS reporter_name,
-                        r.details,
-                        r.witnesses,
-                        r.department
-                    FROM reports r
-                    JOIN users u ON r.id = u.id
-                    {where_sql}
-                    ORDER BY r.date DESC
-                    LIMIT :limit OFFSET :offset
-                """),
-                {**params, "limit": limit, "offset": offset}
-            ).fetchall()
+        with get_read_connection() as conn:
+            total_count = conn.execute(report_count_query(filters)).scalar() or 0
+            rows = conn.execute(report_page_query(fields, filters, limit, offset)).mappings().all()
 
-        items = []
-        for row in rows:
-            raw_date = row[2]
-            date_value = raw_date.isoformat() if isinstance(raw_date, datetime) else (str(raw_date) if raw_date else None)
-            items.append({
-                "user_id": row[0],
-                "type": row[1],
-                "date": date_value,
-                "reporter_name": row[3],
-                "details": row[4],
-                "witnesses": row[5],
-                "department": row[6],
-            })
+        # Tarihler mobile_response'ta biçime göre (ISO / epoch ms) kodlanır
+        items = [dict(row) for row in rows]
 
         has_more = offset + len(items) < total_count
 
-        return jsonify({
+        return mobile_response({
             "success": True,
             "items": items,
             "total": total_count,
@@ -1149,7 +4036,33 @@ def api_mobile_admin_reports():
 
 
 
+@app.route("/api/mobile/reports/<int:report_id>", methods=["GET"])
+@mobile_auth_required(admin_only=True)
+def api_mobile_report_detail(report_id):
+    try:
+        item = fetch_report_detail(report_id)
+        if not item:
+            return jsonify({"success": False, "message": "Rapor bulunamadı"}), 404
+        item.pop("fullname", None)
+        return mobile_response({"success": True, "item": item})
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+
+@app.route("/api/mobile/reports/involving-me", methods=["GET"])
+@mobile_auth_required()
+def api_mobile_reports_involving_me():
+    try:
+        payload, error = _involving_page(request.mobile_user["id"], INVOLVING_DEFAULT_FIELDS)
+        if error:
+            return error
+        return mobile_response(payload)
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Hata: {e}"}), 500
+
+
 @app.route("/api/mobile-register", methods=["POST"])
+@rate_limited("auth")
 def api_mobile_register():
     data = request.get_json(silent=True) or {}
     fullname = (data.get("fullname") or "").strip()
@@ -1184,10 +4097,10 @@ def api_mobile_register():
 @app.route('/api/mobile-event-categories', methods=['GET'])
 def get_mobile_event_categories():
     try:
-        with get_db_connection() as conn:
+        with get_read_connection() as conn:
             rows = conn.execute(text("SELECT type FROM eventcategories ORDER BY id ASC")).fetchall()
         categories = [r[0] for r in rows]
-        return jsonify({"success": True, "categories": categories}), 200
+        return mobile_response({"success": True, "categories": categories})
     except Exception as e:
         app.logger.exception("ERROR /api/mobile-event-categories")
         return jsonify({"success": False, "message": str(e)}), 500
@@ -1195,6 +4108,7 @@ def get_mobile_event_categories():
 
 
 @app.route('/api/mobile-event-report', methods=['POST'])
+@rate_limited("report")
 def submit_event_report_mobile():
     try:
         payload = request.get_json(silent=True) or {}
@@ -1229,30 +4143,29 @@ def submit_event_report_mobile():
         if not email:
             return jsonify({"success": False, "message": "E-posta zorunludur (mobil rapor için)."}), 400
 
-        with db.engine.begin() as conn:
-            user = conn.execute(
-                text("SELECT id, fullname FROM users WHERE LOWER(email)=LOWER(:e) LIMIT 1"),
-                {"e": email}
-            ).mappings().first()
+        entry = {
+            "type": summary_type,
+            "date": datetime.utcnow(),
+            "details": summary_details,
+            "witnesses": witnesses or None,
+            "witness_ids": parse_witness_ids(payload.get("witness_ids")),
+            "department": department,
+        }
+        try:
+            with db.engine.begin() as conn:
+                user = conn.execute(
+                    text("SELECT id, fullname FROM users WHERE LOWER(email)=LOWER(:e) LIMIT 1"),
+                    {"e": email}
+                ).mappings().first()
 
-            if not user:
-                return jsonify({"success": False, "message": "Kullanıcı bulunamadı."}), 404
+                if not user:
+                    return jsonify({"success": False, "message": "Kullanıcı bulunamadı."}), 404
 
-            conn.execute(
-                text("""
-                    INSERT INTO reports (id, type, date, fullname, details, witnesses, department)
-                    VALUES (:uid, :type, :date, :fullname, :details, :witnesses, :department)
-                """),
-                {
-                    "uid": user["id"],
-                    "type": summary_type,
-                    "date": datetime.utcnow(),
-                    "fullname": user["fullname"] or "",
-                    "details": summary_details,
-                    "witnesses": witnesses or None,
-                    "department": department,
-                }
-            )
+                insert_report(conn, {**entry, "uid": user["id"], "fullname": user["fullname"] or ""})
+        except DB_UNAVAILABLE_ERRORS:
+            # Kullanıcı, kuyruk DB'ye aktarılırken e-postadan çözülür
+            spool_report({**entry, "email": email})
+            return spooled_response("Olay raporu alındı")
 
         return jsonify({"success": True, "message": "Olay raporu başarıyla kaydedildi!"}), 200
 
@@ -1264,6 +4177,7 @@ def submit_event_report_mobile():
 
 
 @app.route("/api/mobile/profile/password", methods=["POST"])
+@rate_limited("auth")
 def mobile_api_update_password():
     try:
         payload = request.get_json(force=True)  # force=True -> JSON parse garanti
@@ -1304,21 +4218,1134 @@ def mobile_api_update_password():
 # -----------------------------------------------------
 # Araçlar / Debug
 # -----------------------------------------------------
-@app.route("/db-ping")
-def db_ping():
+def _metrics_authorized() -> bool:
+    """
+    Varsayılan kapalı: scraper METRICS_TOKEN ile (Bearer), tarayıcıdan yalnızca
+    admin oturumu erişir. Token tanımlı değilse token ile erişim de yoktur.
+    """
+    auth = request.headers.get("Authorization", "")
+    if METRICS_TOKEN and auth.startswith("Bearer "):
+        return secrets.compare_digest(auth.split(" ", 1)[1].strip(), METRICS_TOKEN)
+    return "user_id" in session and bool(session.get("is_admin"))
+
+@app.route("/metrics")
+def metrics_endpoint():
+    if not _metrics_authorized():
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+
+    # /db-ping yerine: bağlantı durumu gauge olarak
+    try:
+        with get_db_connection() as conn:
+            conn.execute(text("SELECT 1"))
+        metrics.set("db_up", 1)
+    except Exception:
+        app.logger.exception("DB PING FAILED")
+        metrics.set("db_up", 0)
+
+    pool = db.engine.pool
+    metrics.set("db_pool_connections", pool.size(), (("state", "size"),))
+    metrics.set("db_pool_connections", pool.checkedout(), (("state", "checked_out"),))
+    metrics.set("db_pool_connections", pool.overflow(), (("state", "overflow"),))
+    for bind, engine in db.engines.items():
+        cache = engine._compiled_cache
+        if cache is not None:
+            metrics.set("db_compiled_cache_entries", len(cache), (("engine", bind or "primary"),))
+
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route("/metrics/slow-queries")
+def metrics_slow_queries():
+    if not _metrics_authorized():
+        return jsonify({"success": False, "message": "Yetkisiz"}), 401
+    return jsonify({
+        "success": True,
+        "threshold_ms": SLOW_QUERY_MS,
+        "items": list(reversed(metrics.collect()[2])),
+    })
+
+# -----------------------------------------------------
+# Örneklemeli profiler (admin, opt-in)
+# -----------------------------------------------------
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_MIN_INTERVAL_MS = float(os.getenv("PROFILER_MIN_INTERVAL_MS", "5"))
+PROFILER_MAX_OVERHEAD_PCT = float(os.getenv("PROFILER_MAX_OVERHEAD_PCT", "5"))
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "64"))
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR") or os.path.join(tempfile.gettempdir(), "exp-profiles")
+
+_PROFILE_ID_RE = re.compile(r"^\d+-\d+$")
+
+
+class SamplingProfiler:
+    """
+    sys._current_frames() ile bu worker'daki tüm thread'lerin yığınlarını örnekler
+    ve sonucu flamegraph.pl / speedscope uyumlu "collapsed stack" dosyasına yazar.
+
+    Overhead sınırı: bir örnekleme turu T sürdüyse, bir sonraki tura kadar en az
+    T * (100 / PROFILER_MAX_OVERHEAD_PCT) beklenir. Aynı anda tek oturum çalışır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval_ms: float) -> str:
+        with self._lock:
+            if self.is_running():
+                raise RuntimeError("Bu worker'da zaten çalışan bir profil oturumu var")
+            os.makedirs(PROFILER_OUTPUT_DIR, exist_ok=True)
+            profile_id = f"{os.getpid()}-{int(time.time())}"
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(profile_id, seconds, interval_ms / 1000.0),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+            return profile_id
+
+    @staticmethod
+    def output_path(profile_id: str) -> str:
+        return os.path.join(PROFILER_OUTPUT_DIR, f"{profile_id}.collapsed")
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        # Jinja şablon kodu, şablon dosya adıyla görünür (örn. reports.html:root)
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _run(self, profile_id: str, seconds: float, interval: float):
+        me = threading.get_ident()
+        counts = {}
+        samples = 0
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                counts[key] = counts.get(key, 0) + 1
+            samples += 1
+            spent = time.perf_counter() - t0
+            time.sleep(max(interval, spent * 100.0 / PROFILER_MAX_OVERHEAD_PCT - spent))
+
+        path = self.output_path(profile_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            for stack, count in sorted(counts.items(), key=lambda kv: -kv[1]):
+                fh.write(f"{stack} {count}\n")
+        os.replace(tmp_path, path)
+        app.logger.info("Profil tamamlandı: %s (%d örnek, %d farklı yığın)", path, samples, len(counts))
+
+
+profiler = SamplingProfiler()
+
+
+@app.route("/admin/profiler/start", methods=["POST"])
+@admin_required
+def profiler_start():
+    if not PROFILER_ENABLED:
+        return jsonify({"success": False, "message": "Profiler kapalı (PROFILER_ENABLED=1)"}), 404
+
+    payload = request.get_json(silent=True) or request.form
+    try:
+        seconds = float(payload.get("seconds", 10))
+        interval_ms = float(payload.get("interval_ms", 10))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "Geçersiz parametre"}), 400
+
+    seconds = max(1.0, min(seconds, PROFILER_MAX_SECONDS))
+    interval_ms = max(PROFILER_MIN_INTERVAL_MS, interval_ms)
+
+    try:
+        profile_id = profiler.start(seconds, interval_ms)
+    except RuntimeError as e:
+        return jsonify({"success": False, "message": str(e)}), 409
+
+    return jsonify({
+        "success": True,
+        "profile_id": profile_id,
+        "pid": os.getpid(),
+        "seconds": seconds,
+        "interval_ms": interval_ms,
+        "download_url": url_for("profiler_download", profile_id=profile_id),
+    }), 202
+
+@app.route("/admin/profiler/<profile_id>")
+@admin_required
+def profiler_download(profile_id):
+    if not PROFILER_ENABLED:
+        return jsonify({"success": False, "message": "Profiler kapalı (PROFILER_ENABLED=1)"}), 404
+    if not _PROFILE_ID_RE.match(profile_id):
+        return jsonify({"success": False, "message": "Geçersiz profil"}), 400
+
+    # Dosya ortak dizinde: indirme isteği başka bir worker'a düşse de bulunur
+    path = SamplingProfiler.output_path(profile_id)
+    if not os.path.exists(path):
+        return jsonify({"success": True, "ready": False, "message": "Profil henüz hazır değil"}), 202
+    return send_file(
+        path,
+        mimetype="text/plain",
+        as_attachment=True,
+        download_name=f"profile-{profile_id}.collapsed",
+    )
+
+# -----------------------------------------------------
+# Saklama süresi (retention): eski raporlar ve görselleri
+# -----------------------------------------------------
+# RETENTION_DAYS tüm tipler için varsayılan süredir (0 = sınırsız, hiçbir şey silinmez).
+# RETENTION_POLICY tip bazında geçersiz kılar, örn. acil sinyaller daha uzun:
+#     RETENTION_DAYS=730
+#     RETENTION_POLICY="Acil Yardım Sinyali=3650,Risk Bildirim Raporlaması=365"
+# Silme report_id sırasıyla küçük gruplar halinde ve gruplar arasında beklenerek
+# yapılır: kilit ve WAL patlaması olmaz, replikalar geride kalmaz.
+def _parse_retention_policy(value: str) -> dict:
+    policy = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        report_type, sep, days = item.rpartition("=")
+        if not sep or not report_type.strip() or not days.strip().isdigit():
+            raise RuntimeError(f"Geçersiz RETENTION_POLICY girdisi: {item}")
+        policy[report_type.strip()] = int(days)
+    return policy
+
+
+RETENTION_DEFAULT_DAYS = int(os.getenv("RETENTION_DAYS", "0"))
+RETENTION_POLICY = _parse_retention_policy(os.getenv("RETENTION_POLICY", ""))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_BATCH_SLEEP_SECONDS = float(os.getenv("RETENTION_BATCH_SLEEP_SECONDS", "0.5"))
+_UPLOAD_REF_RE = re.compile(r"/uploads/([A-Za-z0-9_.-]+)")
+
+
+def _retention_targets() -> list[tuple[str, str, dict, int]]:
+    """-> [(etiket, WHERE parçası, parametreler, gün)]; 0 günlük hedefler atlanır."""
+    targets = [
+        (report_type, "type = :type", {"type": report_type}, days)
+        for report_type, days in RETENTION_POLICY.items()
+    ]
+    # Politikada adı geçmeyen tipler (ve tipsiz eski satırlar) varsayılan süreye tabi
+    targets.append((
+        "default",
+        "(type IS NULL OR NOT (type = ANY(CAST(:types AS text[]))))",
+        {"types": list(RETENTION_POLICY)},
+        RETENTION_DEFAULT_DAYS,
+    ))
+    return [t for t in targets if t[3] > 0]
+
+
+def remove_report_uploads(details: str | None) -> int:
+    """Rapor metnindeki /uploads/... görsellerini diskten siler."""
+    removed = 0
+    for name in _UPLOAD_REF_RE.findall(details or ""):
+        path = os.path.join(UPLOAD_DIR, secure_filename(name))
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            app.logger.exception("Yükleme silinemedi: %s", path)
+    return removed
+
+
+def purge_reports(label: str, where_sql: str, params: dict, days: int,
+                  batch_size: int | None = None, sleep_seconds: float | None = None,
+                  max_batches: int | None = None) -> tuple[int, int]:
+    """
+    Süresi dolan raporları keyset (report_id) sırasıyla gruplar halinde siler.
+    Her grup ayrı transaction; dosyalar ancak commit'ten sonra silinir.
+    Dönüş: (silinen rapor, silinen dosya).
+    """
+    batch_size = batch_size or RETENTION_BATCH_SIZE
+    sleep_seconds = RETENTION_BATCH_SLEEP_SECONDS if sleep_seconds is None else sleep_seconds
+    deleted_reports, deleted_files, batches, after = 0, 0, 0, 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            rows = conn.execute(text(f"""
+                DELETE FROM reports
+                WHERE report_id IN (
+                    SELECT report_id FROM reports
+                    WHERE report_id > :after
+                      AND date < (NOW() AT TIME ZONE 'UTC') - make_interval(days => :days)
+                      AND {where_sql}
+                    ORDER BY report_id
+                    LIMIT :batch
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING report_id, details
+            """), {**params, "after": after, "days": days, "batch": batch_size}).fetchall()
+        if not rows:
+            break
+        batches += 1
+        after = max(row[0] for row in rows)
+        files = sum(remove_report_uploads(row[1]) for row in rows)
+        deleted_reports += len(rows)
+        deleted_files += files
+        metrics.inc("retention_deleted_total", (("kind", "reports"), ("policy", label)), len(rows))
+        metrics.inc("retention_deleted_total", (("kind", "files"), ("policy", label)), files)
+        metrics.inc("retention_batches_total", (("policy", label),))
+        metrics.set("retention_last_report_id", after, (("policy", label),))
+        app.logger.info("Retention [%s]: %d rapor, %d dosya silindi (report_id <= %d)",
+                        label, len(rows), files, after)
+        if len(rows) < batch_size:
+            break
+        time.sleep(sleep_seconds)
+    return deleted_reports, deleted_files
+
+
+def sweep_orphan_uploads(min_age_days: int | None = None) -> int:
+    """
+    Hiçbir raporun metninde (ve yerel rapor kuyruğunda) geçmeyen, min_age_days'ten
+    eski yüklemeleri siler: rapor gönderilemeden kalan ya da metinde anılmadığı için
+    purge_reports'un göremediği görseller. Varsayılan yaş, en kısa saklama süresidir.
+    Dönüş: silinen dosya sayısı.
+    """
+    if min_age_days is None:
+        min_age_days = min((t[3] for t in _retention_targets()), default=0)
+    if min_age_days <= 0 or not os.path.isdir(UPLOAD_DIR):
+        return 0
+    cutoff = time.time() - min_age_days * 86400
+    candidates = []
+    for entry in os.scandir(UPLOAD_DIR):
+        # serve_upload'un servis ettiği adlar: "<user_id>_<zaman><uzantı>"
+        if entry.is_file() and re.match(r"^\d+_", entry.name) and entry.stat().st_mtime < cutoff:
+            candidates.append(entry.name)
+    if not candidates:
+        return 0
+
+    referenced = set()
+    for path in (REPORT_SPOOL_PATH, REPORT_SPOOL_PATH + ".failed"):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                referenced.update(_UPLOAD_REF_RE.findall(fh.read()))
+        except FileNotFoundError:
+            pass
+    with get_db_connection() as conn:
+        referenced.update(conn.execute(text("""
+            SELECT DISTINCT m[1]
+            FROM reports r, regexp_matches(r.details, '/uploads/([A-Za-z0-9_.-]+)', 'g') AS m
+            WHERE r.details LIKE '%/uploads/%'
+              AND m[1] = ANY(CAST(:names AS text[]))
+        """), {"names": candidates}).scalars().all())
+
+    removed = 0
+    for name in candidates:
+        if name in referenced:
+            continue
+        try:
+            os.remove(os.path.join(UPLOAD_DIR, name))
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            app.logger.exception("Sahipsiz yükleme silinemedi: %s", name)
+    if removed:
+        metrics.inc("retention_deleted_total", (("kind", "files"), ("policy", "orphan-uploads")), removed)
+        app.logger.info("Retention: %d sahipsiz yükleme silindi", removed)
+    return removed
+
+
+def count_expired_reports() -> dict:
+    """Yazmadan: politika başına silinecek rapor sayısı."""
+    counts = {}
+    with get_read_connection() as conn:
+        for label, where_sql, params, days in _retention_targets():
+            counts[label] = conn.execute(text(f"""
+                SELECT COUNT(*) FROM reports
+                WHERE date < (NOW() AT TIME ZONE 'UTC') - make_interval(days => :days)
+                  AND {where_sql}
+            """), {**params, "days": days}).scalar()
+    return counts
+
+
+def run_retention(max_batches: int | None = None) -> dict:
+    """
+    Tüm politikaları uygular, ardından metinde anılmayan eski yüklemeleri süpürür.
+    Dönüş: etiket -> {"reports", "files"}.
+    """
+    t0 = time.monotonic()
+    result = {}
+    for label, where_sql, params, days in _retention_targets():
+        reports_deleted, files_deleted = purge_reports(label, where_sql, params, days, max_batches=max_batches)
+        result[label] = {"reports": reports_deleted, "files": files_deleted}
+    if result:
+        result["orphan-uploads"] = {"reports": 0, "files": sweep_orphan_uploads()}
+    metrics.set("retention_last_run_seconds", time.monotonic() - t0)
+    metrics.set("retention_last_run_timestamp", time.time())
+    return result
+
+# -----------------------------------------------------
+# Raporlayan adı senkronu (reports.fullname)
+# -----------------------------------------------------
+# Rapor listeleri users'a JOIN yapmaz; raporlayanın adı reports.fullname'den okunur.
+# users.fullname değişince trigger kullanıcıyı reporter_name_sync_queue'ya ekler;
+# bu iş kuyruktaki kullanıcıların raporlarını (reports_user_idx üzerinden) gruplar
+# halinde günceller. Ad değişikliği listelere en geç bir iş periyodu sonra yansır.
+REPORTER_SYNC_BATCH_SIZE = int(os.getenv("REPORTER_SYNC_BATCH_SIZE", "100"))
+
+
+def sync_reporter_names(batch_size: int | None = None, max_batches: int | None = None) -> int:
+    """
+    Kuyruğu boşaltır. Dönüş: güncellenen rapor sayısı.
+    Kuyruk satırları SKIP LOCKED ile alınır; işlenirken gelen yeni bir ad
+    değişikliği satır silinip commit edilince yeniden kuyruğa girer.
+    """
+    batch_size = batch_size or REPORTER_SYNC_BATCH_SIZE
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.engine.begin() as conn:
+            updated, picked = conn.execute(
+                text("""
+                    WITH picked AS (
+                        SELECT user_id
+                        FROM reporter_name_sync_queue
+                        ORDER BY queued_at
+                        LIMIT :batch
+                        FOR UPDATE SKIP LOCKED
+                    ),
+                    updated AS (
+                        UPDATE reports r
+                        SET fullname = COALESCE(u.fullname, '')
+                        FROM picked p
+                        JOIN users u ON u.id = p.user_id
+                        WHERE r.id = p.user_id
+                          AND r.fullname IS DISTINCT FROM COALESCE(u.fullname, '')
+                        RETURNING r.report_id
+                    ),
+                    done AS (
+                        DELETE FROM reporter_name_sync_queue q
+                        USING picked p
+                        WHERE q.user_id = p.user_id
+                        RETURNING q.user_id
+                    )
+                    SELECT (SELECT COUNT(*) FROM updated), (SELECT COUNT(*) FROM done)
+                """),
+                {"batch": batch_size}
+            ).one()
+        batches += 1
+        total += updated
+        if updated:
+            metrics.inc("reporter_sync_updated_total", value=updated)
+        if picked < batch_size:
+            break
+    return total
+
+
+def queue_all_reporter_names() -> int:
+    """Adı users ile uyuşmayan tüm raporların sahiplerini kuyruğa alır (tam tarama)."""
+    with db.engine.begin() as conn:
+        result = conn.execute(text("""
+            INSERT INTO reporter_name_sync_queue (user_id)
+            SELECT DISTINCT r.id
+            FROM reports r
+            JOIN users u ON u.id = r.id
+            WHERE r.fullname IS DISTINCT FROM COALESCE(u.fullname, '')
+            ON CONFLICT (user_id) DO NOTHING
+        """))
+    return result.rowcount
+
+# -----------------------------------------------------
+# Analitik snapshot'ları (Parquet / Arrow IPC)
+# -----------------------------------------------------
+# reports + users, (created_xid, report_id) high-water mark'ına göre artımlı olarak
+# aylık bölümlere (month=YYYY-MM/) sıkıştırılmış kolonlu dosyalar halinde yazılır.
+# Okuma, admin rapor akışıyla aynı koşulu (report_feed_criteria) kullanır: yalnızca
+# commit'i kesinleşmiş (xid < snapshot xmin) raporlar, commit sırasıyla.
+# Analistler dizini pyarrow/duckdb/polars ile doğrudan sorgular; üretim DB'sine gitmez.
+# pyarrow requirements.txt'tedir; import'u ağır olduğu için web worker açılışında
+# değil, yalnızca snapshot alınırken yüklenir.
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as pa_ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow kurulu değil: pip install pyarrow")
+    return pa, pa_ipc, pq
+
+
+ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR") or os.path.join(app.instance_path, "report_snapshots")
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "50000"))
+# Raporlayanın e-postası (kişisel veri) dosyalara varsayılan olarak yazılmaz.
+# Açılırsa yalnızca sonraki bölümler kolonu içerir; okurken şema birleştirin.
+ANALYTICS_INCLUDE_EMAIL = os.getenv("ANALYTICS_INCLUDE_EMAIL", "0") == "1"
+
+_ANALYTICS_COLUMNS = (
+    "report_id", "user_id", "type", "date", "fullname", "reporter_name",
+    *(("reporter_email",) if ANALYTICS_INCLUDE_EMAIL else ()),
+    "department", "details", "witnesses",
+)
+
+
+def _analytics_schema(pa):
+    types = {
+        "report_id": pa.int64(),
+        "user_id": pa.int64(),
+        "date": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(col, types.get(col, pa.string())) for col in _ANALYTICS_COLUMNS])
+
+
+_users = table("users", column("id", Integer), column("fullname", Text), column("email", Text))
+_PARTITION_RE = re.compile(r"^part-(\d{20})-(\d{12})\.(?:parquet|arrow)(\.tmp)?$")
+
+
+def analytics_batch_query(after: tuple, limit: int):
+    """İmleçten (xid, report_id) sonraki kesinleşmiş raporlar, users ile, commit sırasıyla."""
+    u = _users.alias("u")
+    columns = [
+        _r.c.report_id,
+        _r.c.id.label("user_id"),
+        _r.c.type,
+        _r.c.date,
+        _r.c.fullname,
+        u.c.fullname.label("reporter_name"),
+        *((u.c.email.label("reporter_email"),) if ANALYTICS_INCLUDE_EMAIL else ()),
+        _r.c.department,
+        _r.c.details,
+        _r.c.witnesses,
+        cast(_r.c.created_xid, Text).label("created_xid"),
+    ]
+    return (
+        select(*columns)
+        .select_from(_r.outerjoin(u, u.c.id == _r.c.id))
+        .where(*report_feed_criteria(after))
+        .order_by(_r.c.created_xid, _r.c.report_id)
+        .limit(limit)
+    )
+
+
+def _read_watermark(export_dir: str) -> tuple[str, int]:
+    try:
+        with open(os.path.join(export_dir, "_watermark.json"), encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return "0", 0
+    if "xid" not in data:
+        raise RuntimeError(
+            f"{export_dir}: eski (yalnızca report_id) watermark biçimi; dizini boşaltıp "
+            "snapshot'ı baştan alın"
+        )
+    return str(data["xid"]), int(data["report_id"])
+
+
+def _write_watermark(export_dir: str, position: tuple[str, int]):
+    fd, tmp_path = tempfile.mkstemp(dir=export_dir, prefix=".watermark-")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump({"xid": position[0], "report_id": position[1],
+                   "updated_at": datetime.utcnow().isoformat()}, fh)
+    os.replace(tmp_path, os.path.join(export_dir, "_watermark.json"))
+
+
+def _partition_name(position: tuple[str, int], ext: str) -> str:
+    return f"part-{int(position[0]):020d}-{position[1]:012d}.{ext}"
+
+
+def _drop_orphan_partitions(export_dir: str, watermark: tuple[str, int]) -> int:
+    """
+    Bölüm dosyası, yazdığı grubun başladığı watermark'la adlandırılır. Watermark'tan
+    küçük olmayan adlar, watermark yazılmadan yarıda kalmış bir çalıştırmanındır;
+    silinir ki tekrar çalıştırma farklı grup sınırıyla yazsa da satırlar çiftlenmesin.
+    """
+    current = (int(watermark[0]), watermark[1])
+    dropped = 0
+    for month_dir in os.listdir(export_dir):
+        path = os.path.join(export_dir, month_dir)
+        if not month_dir.startswith("month=") or not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            m = _PARTITION_RE.match(name)
+            if m and (m.group(3) or (int(m.group(1)), int(m.group(2))) >= current):
+                os.remove(os.path.join(path, name))
+                dropped += 1
+    return dropped
+
+
+def _write_partition(rows: list, path: str, fmt: str):
+    pa, pa_ipc, pq = _pyarrow()
+    table = pa.Table.from_pydict(
+        {col: [row[col] for row in rows] for col in _ANALYTICS_COLUMNS},
+        schema=_analytics_schema(pa),
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    if fmt == "parquet":
+        pq.write_table(table, tmp_path, compression="zstd")
+    else:
+        options = pa_ipc.IpcWriteOptions(compression="zstd")
+        with pa_ipc.new_file(tmp_path, table.schema, options=options) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def snapshot_reports(export_dir: str | None = None, fmt: str = "parquet") -> int:
+    """
+    Watermark'tan sonraki raporları keyset sayfalarıyla okur, ay bazında dosyalara
+    yazar ve watermark'ı ilerletir. Dosya adı grubun başladığı watermark'tır ve
+    açılışta watermark'ı geçmiş (yarıda kalmış) dosyalar silinir: tekrar
+    çalıştırma aynı satırları ikinci kez yazmaz. Dönüş: yazılan satır sayısı.
+    """
+    _pyarrow()
+    if fmt not in ("parquet", "arrow"):
+        raise ValueError(f"Geçersiz format: {fmt}")
+
+    export_dir = export_dir or ANALYTICS_EXPORT_DIR
+    os.makedirs(export_dir, exist_ok=True)
+    watermark = _read_watermark(export_dir)
+    dropped = _drop_orphan_partitions(export_dir, watermark)
+    if dropped:
+        app.logger.warning("Snapshot: yarıda kalmış %d bölüm dosyası silindi", dropped)
+    ext = "parquet" if fmt == "parquet" else "arrow"
+    written = 0
+
+    while True:
+        with get_read_connection() as conn:
+            rows = conn.execute(analytics_batch_query(watermark, ANALYTICS_BATCH_SIZE)).mappings().all()
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            item = dict(row)
+            if item["date"] is not None and item["date"].tzinfo is None:
+                item["date"] = item["date"].replace(tzinfo=timezone.utc)
+            month = item["date"].strftime("%Y-%m") if item["date"] else "unknown"
+            by_month.setdefault(month, []).append(item)
+        name = _partition_name(watermark, ext)
+        for month, month_rows in by_month.items():
+            _write_partition(month_rows, os.path.join(export_dir, f"month={month}", name), fmt)
+
+        watermark = (rows[-1]["created_xid"], rows[-1]["report_id"])
+        _write_watermark(export_dir, watermark)
+        written += len(rows)
+        if len(rows) < ANALYTICS_BATCH_SIZE:
+            break
+
+    return written
+
+# -----------------------------------------------------
+# Arka plan zamanlayıcı (bakım işleri)
+# -----------------------------------------------------
+# Zamanlayıcı web worker'larında varsayılan olarak çalışmaz: bakım işleri istek
+# işleyen process'lerde koşmasın ve her worker DB bağlantısı tutmasın diye ayrı,
+# tek bir process'te çalıştırılır (flask run-scheduler, Procfile "scheduler").
+# SCHEDULER_ENABLED=1 ise create_app() worker içinde bir thread olarak başlatır.
+# Birden fazla zamanlayıcı varsa işleri yalnızca Postgres advisory lock'unu alan
+# (lider) çalıştırır. Process başına tek kalıcı bağlantı vardır: lider kilidi,
+# iş kilitleri ve lider olmayanın yoklamaları (geri çekilmeli) bu bağlantıdan
+# yapılır. Lider düşerse bağlantısı kapanır, kilit serbest kalır, diğeri devralır.
+# Son çalıştırmalar scheduled_job_runs'ta tutulur: yeniden başlatmada günlük
+# iş baştan sayılmaz, kaçırılan cron zamanı bir kez telafi edilir.
+#
+# Zamanlama ifadeleri (UTC): "@every 15m" (s/m/h/d), 5 alanlı cron "30 3 * * *",
+# "@hourly" / "@daily" / "@weekly" / "@monthly". Her iş env ile değiştirilebilir:
+# SCHEDULE_<AD> (örn. SCHEDULE_RETENTION="0 4 * * *"); "off" kapatır.
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "0") == "1"
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "15"))
+# Lider olmayan zamanlayıcının kilit yoklama aralığı katlanarak bu süreye kadar uzar
+SCHEDULER_PROBE_MAX_SECONDS = float(os.getenv("SCHEDULER_PROBE_MAX_SECONDS", "300"))
+# Lider kilidi (tek argümanlı bigint); iş kilitleri (key, hashtext(ad)) çiftidir
+SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", "7241001"))
+
+_INTERVAL_RE = re.compile(r"^@every\s+(\d+)\s*([smhd])$")
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# dakika, saat, ayın günü, ay, haftanın günü (0 ve 7 = pazar)
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(field: str, lo: int, hi: int) -> frozenset:
+    values = set()
+    for part in field.split(","):
+        rng, slash, step = part.partition("/")
+        step = int(step) if slash else 1
+        if rng == "*":
+            start, end = lo, hi
+        elif "-" in rng:
+            start, end = (int(v) for v in rng.split("-", 1))
+        else:
+            start = int(rng)
+            end = hi if slash else start  # "5/10": 5'ten itibaren 10'ar
+        if step < 1 or start < lo or end > hi or start > end:
+            raise ValueError(f"Geçersiz cron alanı: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class Schedule:
+    """Aralık ("@every 15m") veya cron ifadesi; next_after() bir sonraki UTC zamanı verir."""
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip()
+        self.interval = None
+        match = _INTERVAL_RE.match(self.spec)
+        if match:
+            self.interval = timedelta(seconds=int(match.group(1)) * _INTERVAL_UNITS[match.group(2)])
+            if not self.interval:
+                raise ValueError(f"Geçersiz aralık: {spec}")
+            return
+        fields = _CRON_ALIASES.get(self.spec, self.spec).split()
+        if len(fields) != 5:
+            raise ValueError(f"Geçersiz zamanlama: {spec}")
+        minutes, hours, days, months, weekdays = (
+            _parse_cron_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_RANGES)
+        )
+        self.minutes, self.hours, self.days, self.months = minutes, hours, days, months
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        # Cron kuralı: gün ve haftanın günü ikisi de kısıtlıysa biri tutması yeter.
+        # "*" ile başlayan alan ("*/2" dahil) kısıtlı sayılmaz (Vixie cron).
+        self.days_restricted = not fields[2].startswith("*")
+        self.weekdays_restricted = not fields[4].startswith("*")
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        if self.interval is not None:
+            return after + self.interval
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Zamanlama hiç tetiklenmiyor: {self.spec}")
+
+
+class ScheduledJob:
+    def __init__(self, name: str, func, spec: str | None, jitter: float, description: str):
+        self.name = name
+        self.func = func
+        self.description = description
+        self.jitter = jitter
+        env_spec = os.getenv("SCHEDULE_" + name.upper().replace("-", "_"))
+        spec = env_spec if env_spec is not None else spec
+        self.spec = None if not spec or spec.strip().lower() == "off" else spec.strip()
+        self.schedule = Schedule(self.spec) if self.spec else None
+
+
+def _dedicated_connection():
+    """
+    Havuzdan ayrılmış (detach) autocommit DBAPI bağlantısı: advisory lock oturum
+    boyunca tutulur ve havuz slotu işgal edilmez. Kapatılınca kilitler bırakılır.
+    """
+    conn = db.engine.raw_connection()
+    conn.detach()
+    conn.driver_connection.autocommit = True
+    # Checkout dinleyicisinin uyguladığı route bütçesi bu oturumda kalmasın: bağlantı
+    # yalnızca kilit tutar, işler havuzdan background bütçesiyle bağlantı alır
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET statement_timeout = 0")
+    finally:
+        cursor.close()
+    return conn
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self._thread = None
+        # Process başına tek kalıcı bağlantı (lider kilidi + iş kilitleri)
+        self._conn = None
+        self._leader = False
+        self._probe_delay = SCHEDULER_TICK_SECONDS
+        self._next_probe = 0.0
+        self._next_run = {}
+
+    def register(self, name: str, func, spec: str | None, jitter: float = 0, description: str = ""):
+        self.jobs[name] = ScheduledJob(name, func, spec, jitter, description)
+
+    # ---- tek iş çalıştırma (zamanlayıcı ve CLI ortak) ----
+    def run_job(self, name: str, trigger: str = "schedule", lock_conn=None) -> str:
+        """
+        İşi iş kilidiyle çalıştırır; aynı iş başka yerde sürüyorsa "skipped".
+        lock_conn verilirse kilit o bağlantıda alınıp iş bitince bırakılır, yoksa
+        (CLI) tek seferlik bir bağlantı açılır.
+        Dönüş: "ok" | "error" | "skipped".
+        """
+        job = self.jobs[name]
+        own_conn = lock_conn is None
+        if own_conn:
+            lock_conn = _dedicated_connection()
+        cur = lock_conn.cursor()
+        locked = False
+        try:
+            cur.execute("SELECT pg_try_advisory_lock(%s, hashtext(%s))", (SCHEDULER_LOCK_KEY, name))
+            locked = cur.fetchone()[0]
+            if not locked:
+                metrics.inc("scheduler_job_runs_total", (("job", name), ("status", "skipped")))
+                return "skipped"
+
+            with db.engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO scheduled_job_runs (name, last_started_at, last_trigger)
+                    VALUES (:name, NOW() AT TIME ZONE 'UTC', :trigger)
+                    ON CONFLICT (name) DO UPDATE SET
+                        last_started_at = EXCLUDED.last_started_at,
+                        last_trigger = EXCLUDED.last_trigger
+                """), {"name": name, "trigger": trigger})
+
+            t0 = time.monotonic()
+            status, error = "ok", None
+            _forced_route_class.value = "background"
+            try:
+                result = job.func()
+                app.logger.info("Zamanlanmış iş tamamlandı: %s (%s) -> %s", name, trigger, result)
+            except Exception as e:
+                status, error = "error", str(e)[:1000]
+                app.logger.exception("Zamanlanmış iş başarısız: %s", name)
+            finally:
+                _forced_route_class.value = None
+            duration = time.monotonic() - t0
+
+            with db.engine.begin() as conn:
+                conn.execute(text("""
+                    UPDATE scheduled_job_runs
+                    SET last_finished_at = NOW() AT TIME ZONE 'UTC',
+                        last_status = :status,
+                        last_error = :error,
+                        last_duration_seconds = :duration
+                    WHERE name = :name
+                """), {"name": name, "status": status, "error": error, "duration": duration})
+
+            metrics.inc("scheduler_job_runs_total", (("job", name), ("status", status)))
+            metrics.set("scheduler_job_last_duration_seconds", duration, (("job", name),))
+            if status == "ok":
+                metrics.set("scheduler_job_last_success_timestamp", time.time(), (("job", name),))
+            return status
+        finally:
+            if own_conn:
+                lock_conn.close()
+            elif locked:
+                cur.execute("SELECT pg_advisory_unlock(%s, hashtext(%s))", (SCHEDULER_LOCK_KEY, name))
+
+    # ---- liderlik ----
+    def _ensure_leader(self) -> bool:
+        if self._leader:
+            try:
+                cur = self._conn.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchone()
+                return True
+            except Exception as e:
+                app.logger.warning("Zamanlayıcı liderliği kaybedildi: %s", e)
+                self._reset()
+
+        # Lider başka bir process'te: her turda değil, geri çekilerek yoklanır
+        now = time.monotonic()
+        if now < self._next_probe:
+            return False
+        try:
+            if self._conn is None:
+                self._conn = _dedicated_connection()
+            cur = self._conn.cursor()
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (SCHEDULER_LOCK_KEY,))
+            acquired = cur.fetchone()[0]
+        except Exception:
+            self._reset()
+            raise
+        if not acquired:
+            self._probe_delay = min(self._probe_delay * 2, SCHEDULER_PROBE_MAX_SECONDS)
+            self._next_probe = now + self._probe_delay
+            return False
+
+        self._leader = True
+        self._probe_delay = SCHEDULER_TICK_SECONDS
+        metrics.set("scheduler_leader", 1)
+        app.logger.info("Zamanlayıcı lideri: pid %s", os.getpid())
+        self._load_next_runs()
+        return True
+
+    def _reset(self):
+        """Bağlantıyı kapatır (liderse kilit bırakılır); sonraki tur hemen yoklar."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._leader = False
+        self._next_probe = 0.0
+        self._next_run = {}
+        metrics.set("scheduler_leader", 0)
+
+    def _with_jitter(self, job: ScheduledJob, when: datetime) -> datetime:
+        return when + timedelta(seconds=random.uniform(0, job.jitter)) if job.jitter else when
+
+    def _load_next_runs(self):
+        with db.engine.connect() as conn:
+            history = {
+                row[0]: (row[1], row[2])
+                for row in conn.execute(text(
+                    "SELECT name, last_started_at, last_finished_at FROM scheduled_job_runs"
+                )).fetchall()
+            }
+        now = datetime.utcnow()
+        for job in self.jobs.values():
+            if job.schedule is None:
+                continue
+            started, finished = history.get(job.name, (None, None))
+            if job.schedule.interval is not None:
+                when = job.schedule.next_after(finished) if finished else now
+            else:
+                when = job.schedule.next_after(started or now)
+            self._next_run[job.name] = self._with_jitter(job, when)
+
+    def _run_due(self):
+        for name, when in sorted(self._next_run.items(), key=lambda item: item[1]):
+            if datetime.utcnow() < when:
+                continue
+            job = self.jobs[name]
+            started = datetime.utcnow()
+            self.run_job(name, lock_conn=self._conn)
+            base = datetime.utcnow() if job.schedule.interval is not None else started
+            self._next_run[name] = self._with_jitter(job, job.schedule.next_after(base))
+
+    def run_forever(self):
+        """Zamanlayıcı döngüsü: worker thread'i veya flask run-scheduler."""
+        while True:
+            try:
+                with app.app_context():
+                    # Tablolar (scheduled_job_runs dahil) hazır olmadan liderlik alınmaz
+                    if init_schema_once() and self._ensure_leader():
+                        self._run_due()
+            except Exception:
+                app.logger.exception("Zamanlayıcı turu başarısız")
+                self._reset()
+            time.sleep(SCHEDULER_TICK_SECONDS)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not any(job.schedule for job in self.jobs.values()):
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+
+
+scheduler = Scheduler()
+
+
+def start_scheduler():
+    """create_app / after_fork'tan çağrılır (preload master'da değil); SCHEDULER_ENABLED=1 ister."""
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+def cleanup_rate_limit_buckets() -> int:
+    # En uzun politikanın dolum süresi kadar dokunulmamış kova zaten dolmuştur;
+    # silmek yeniden oluşturmakla aynı sonucu verir
+    idle_seconds = max(capacity / rate for capacity, rate in RATE_LIMIT_POLICIES.values())
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            text("DELETE FROM rate_limit_buckets WHERE updated_at < :cutoff"),
+            {"cutoff": time.time() - idle_seconds}
+        )
+    return result.rowcount
+
+
+scheduler.register(
+    "cleanup-sessions", cleanup_expired_sessions,
+    "@every 15m" if SESSION_BACKEND == "server" else None, jitter=60,
+    description="Süresi dolmuş sunucu tarafı oturumları siler",
+)
+scheduler.register(
+    "cleanup-rate-limits", cleanup_rate_limit_buckets,
+    "@every 1h" if RATE_LIMIT_BACKEND == "postgres" else None, jitter=300,
+    description="Dolmuş (boşta) hız sınırı kovalarını siler",
+)
+scheduler.register(
+    "sync-reporter-names", sync_reporter_names, "@every 5m", jitter=30,
+    description="Ad değişikliklerini raporlara (reports.fullname) taşır",
+)
+scheduler.register(
+    "retention", run_retention, "30 3 * * *", jitter=600,
+    description="Saklama süresi dolan raporları ve görsellerini siler (RETENTION_*)",
+)
+# pyarrow gerektirir: varsayılan kapalı, SCHEDULE_SNAPSHOT_REPORTS ile açılır
+scheduler.register(
+    "snapshot-reports", snapshot_reports, None, jitter=300,
+    description="Raporların artımlı Parquet snapshot'ı",
+)
+# replay-report-spool bilerek yok: kuyruk her instance'ın yerel diskinde; lider
+# yalnızca kendi kuyruğunu görürdü. Aktarım devre kesici kapanınca yerelde tetiklenir.
+
+# -----------------------------------------------------
+# CLI komutları (flask --app expOrigin-main/app.py <komut>)
+# -----------------------------------------------------
+@app.cli.command("cleanup-sessions")
+def cleanup_sessions_command():
+    """Süresi dolmuş sunucu tarafı oturumları toplu siler."""
+    print(f"{cleanup_expired_sessions()} oturum silindi")
+
+
+@app.cli.command("replay-report-spool")
+def replay_report_spool_command():
+    """DB yokken yerel kuyruğa alınmış raporları veritabanına aktarır."""
+    print(f"{replay_spooled_reports()} rapor aktarıldı")
+
+
+@app.cli.command("backfill-witnesses")
+@click.option("--batch-size", default=10000, show_default=True)
+def backfill_witnesses_command(batch_size):
+    """Eski raporların tanık metnini report_witnesses tablosuna aktarır."""
+    print(f"{backfill_report_witnesses(batch_size)} tanık kaydı eklendi")
+
+
+@app.cli.command("snapshot-reports")
+@click.option("--output", "output_dir", default=None, help="Hedef dizin (varsayılan: ANALYTICS_EXPORT_DIR)")
+@click.option("--format", "fmt", type=click.Choice(["parquet", "arrow"]), default="parquet")
+def snapshot_reports_command(output_dir, fmt):
+    """Raporları artımlı olarak aylık Parquet/Arrow dosyalarına yazar."""
     try:
+        count = snapshot_reports(output_dir, fmt)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    print(f"{count} rapor yazıldı")
+
+
+@app.cli.command("purge-reports")
+@click.option("--dry-run", is_flag=True, help="Silmeden politika başına sayıları göster")
+@click.option("--max-batches", type=int, default=None, help="Politika başına en fazla bu kadar grup sil")
+def purge_reports_command(dry_run, max_batches):
+    """Saklama süresi dolan raporları ve görsellerini gruplar halinde siler."""
+    if not _retention_targets():
+        raise click.ClickException("Retention kapalı: RETENTION_DAYS / RETENTION_POLICY tanımlı değil")
+    if dry_run:
+        for label, count in count_expired_reports().items():
+            print(f"{label}: {count} rapor silinecek")
+        return
+    for label, counts in run_retention(max_batches).items():
+        print(f"{label}: {counts['reports']} rapor, {counts['files']} dosya silindi")
+
+
+@app.cli.command("sync-reporter-names")
+@click.option("--all", "full", is_flag=True, help="Önce adı uyuşmayan tüm raporları kuyruğa al (tam tarama)")
+def sync_reporter_names_command(full):
+    """Kuyruktaki ad değişikliklerini reports.fullname'e uygular."""
+    if full:
+        print(f"{queue_all_reporter_names()} kullanıcı kuyruğa alındı")
+    print(f"{sync_reporter_names()} rapor güncellendi")
+
+
+@app.cli.command("run-scheduler")
+def run_scheduler_command():
+    """Zamanlayıcıyı ön planda, ayrı bir process olarak çalıştırır."""
+    if not any(job.schedule for job in scheduler.jobs.values()):
+        raise click.ClickException("Zamanlanmış iş yok (hepsi kapalı)")
+    for job in scheduler.jobs.values():
+        print(f"{job.name:22s} {job.spec or 'off'}")
+    scheduler.run_forever()
+
+
+@app.cli.command("run-job")
+@click.argument("name", required=False)
+def run_job_command(name):
+    """Zamanlanmış bir işi hemen çalıştırır; ad verilmezse işleri listeler."""
+    if not name:
         with db.engine.connect() as conn:
-            row = conn.execute(text("select version(), current_database();")).fetchone()
-        return f"OK ✅ {row[0]} | DB={row[1]}"
-    except Exception as e:
-        app.logger.exception("DB PING FAILED")
-        return f"DB FAIL ❌ {e}", 500
+            history = {
+                row[0]: row[1:]
+                for row in conn.execute(text(
+                    "SELECT name, last_finished_at, last_status, last_duration_seconds FROM scheduled_job_runs"
+                )).fetchall()
+            }
+        for job in scheduler.jobs.values():
+            finished, status, duration = history.get(job.name, (None, None, None))
+            last = f"{finished:%Y-%m-%d %H:%M} {status} ({duration:.1f}s)" if finished else "-"
+            print(f"{job.name:22s} {job.spec or 'off':16s} {last:32s} {job.description}")
+        return
+    if name not in scheduler.jobs:
+        raise click.ClickException(f"Bilinmeyen iş: {name} (liste için: flask run-job)")
+    status = scheduler.run_job(name, trigger="manual")
+    if status == "skipped":
+        raise click.ClickException(f"{name} şu an başka bir yerde çalışıyor")
+    if status == "error":
+        raise click.ClickException(f"{name} başarısız (ayrıntı log'da)")
+    print(f"{name}: tamamlandı")
+
+
+@app.cli.command("dedupe-catalog")
+@click.option("--apply", "apply_changes", is_flag=True, help="Kopyaları sil ve tekil indeksleri kur")
+def dedupe_catalog_command(apply_changes):
+    """Kategori/önlem tablolarındaki büyük/küçük harf kopyalarını listeler (--apply ile siler)."""
+    duplicates = dedupe_catalog(apply=apply_changes)
+    for d in duplicates:
+        print(f"{d['table']:16s} id={d['id']:<6} {d['value']!r} -> kalan id={d['keep_id']}")
+    if not duplicates:
+        print("Kopya yok")
+    elif apply_changes:
+        print(f"{len(duplicates)} satır silindi, tekil indeksler kuruldu")
+    else:
+        print(f"{len(duplicates)} satır silinecek (uygulamak için --apply)")
+
+
+@app.cli.command("import-catalog")
+@click.argument("kind", type=click.Choice(["categories", "precautions"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--type", "cat_type", type=click.Choice(["risk", "event"]), default=None,
+              help="Tipsiz kategori satırları için (başlıklı listelerde gerekmez)")
+@click.option("--format", "fmt", type=click.Choice(CATALOG_FORMATS), default=None,
+              help="Varsayılan: dosya uzantısından (.csv/.json, diğerleri satır listesi)")
+@click.option("--on-conflict", type=click.Choice(["update", "skip"]), default="update", show_default=True,
+              help="Mevcut önlemin açıklaması güncellensin mi")
+@click.option("--dry-run", is_flag=True, help="Yazmadan farkı göster")
+def import_catalog_command(kind, path, cat_type, fmt, on_conflict, dry_run):
+    """Kategori/önlem kataloğunu (CSV, JSON, satır listesi) toplu içe aktarır."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    try:
+        diff = import_catalog(kind, decode_catalog(raw), catalog_format(fmt, path), cat_type,
+                              dry_run, on_conflict == "update")
+    except (ValueError, UnicodeDecodeError, csv.Error, CatalogIndexMissing) as e:
+        raise click.ClickException(str(e))
+    print(json.dumps({"dry_run": dry_run, "diff": diff}, ensure_ascii=False, indent=2))
+
+
+@app.cli.command("export-catalog")
+@click.argument("kind", type=click.Choice(["categories", "precautions"]))
+@click.option("--type", "cat_type", type=click.Choice(["risk", "event"]), default=None)
+@click.option("--format", "fmt", type=click.Choice(CATALOG_FORMATS), default="json", show_default=True)
+@click.option("--output", "output_path", default=None, help="Hedef dosya (varsayılan: stdout)")
+def export_catalog_command(kind, cat_type, fmt, output_path):
+    """Kategori/önlem kataloğunu import-catalog'un okuyacağı biçimde dışa aktarır."""
+    body = export_catalog(kind, fmt, cat_type)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as fh:
+            fh.write(body)
+    else:
+        click.echo(body, nl=False)
 
 # -----------------------------------------------------
 # Çalıştırma
 # -----------------------------------------------------
 if __name__ == "__main__":
     # Yerelde doğrudan çalıştırırken de şemayı kur
-    ensure_tables()
-    seed_default_categories()
+    create_app(warmup_mode="off")
+    warmup()
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,226 @@
+# bench/bench_reports.py
+"""
+Rapor akışı için tekrarlanabilir benchmark / yük testi.
+
+Gerçek endpoint'leri Flask test client ile sürer ve senaryo başına
+p50/p95/p99 gecikme + throughput değerlerini JSON olarak yazar.
+
+Örnek:
+    # geçici local Postgres açar (initdb/pg_ctl PATH'te olmalı)
+    python bench/bench_reports.py --users 2000 --reports 50000 --output bench.json
+
+    # mevcut bir test veritabanı ile
+    python bench/bench_reports.py --database-url postgresql://u:p@localhost/bench
+
+    # önceki sonuca göre p95 regresyonu %20'yi geçerse çıkış kodu 1
+    python bench/bench_reports.py --baseline bench.json --max-regression 0.2
+
+UYARI: Hedef veritabanındaki users/reports tabloları TRUNCATE edilir.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import BENCH_PASSWORD, LocalPostgres, compare, load_app, seed_data, summarize
+
+
+def _png_payload(size_kb: int) -> bytes:
+    header = b"\x89PNG\r\n\x1a\n"
+    return header + os.urandom(max(0, size_kb * 1024 - len(header)))
+
+
+class Bench:
+    def __init__(self, module, args):
+        self.module = module
+        self.app = module.app
+        self.args = args
+        self.results = {}
+
+    # ---- istemciler ----
+    def login_client(self, user_no: int):
+        client = self.app.test_client()
+        resp = client.post("/login", data={
+            "email": f"user{user_no}@bench.local",
+            "password": BENCH_PASSWORD,
+        })
+        if resp.status_code != 302:
+            raise RuntimeError(f"Bench girişi başarısız (user{user_no}): {resp.status_code}")
+        return client
+
+    # ---- senaryo çalıştırıcı ----
+    def run(self, name, clients, request_fn, iterations=None):
+        """
+        clients: worker başına bir test client; request_fn(client, i) -> Response.
+        Her worker iterations/len(clients) istek atar.
+        """
+        iterations = iterations or self.args.iterations
+        per_worker = max(1, iterations // len(clients))
+        latencies, errors = [], 0
+
+        def worker(client):
+            local, local_errors = [], 0
+            for i in range(per_worker):
+                t0 = time.perf_counter()
+                resp = request_fn(client, i)
+                local.append(time.perf_counter() - t0)
+                if resp.status_code >= 400:
+                    local_errors += 1
+            return local, local_errors
+
+        # ısınma
+        request_fn(clients[0], 0)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+            for local, local_errors in pool.map(worker, clients):
+                latencies.extend(local)
+                errors += local_errors
+        wall = time.perf_counter() - t0
+
+        self.results[name] = summarize(latencies, errors, wall)
+        print(f"{name:40s} p50={self.results[name]['p50_ms']:8.2f}ms "
+              f"p95={self.results[name]['p95_ms']:8.2f}ms "
+              f"rps={self.results[name]['throughput_rps']:8.1f}", file=sys.stderr)
+
+    # ---- senaryolar ----
+    def scenario_reports(self):
+        admin = [self.login_client(1) for _ in range(self.args.concurrency)]
+        for offset in self.args.offsets:
+            self.run(f"api_reports.offset_{offset}", admin,
+                     lambda c, i, o=offset: c.get(f"/api/reports?limit=20&offset={o}"))
+
+        filters = {
+            "type": "type=Risk%20Bildirim%20Raporlamas%C4%B1",
+            "q": "q=Kullan%C4%B1c%C4%B1%201",
+            "date": "date_from=2000-01-01&date_to=2100-01-01",
+            "all": "type=Acil%20Yard%C4%B1m%20Sinyali&q=bench&date_from=2000-01-01",
+        }
+        for label, query in filters.items():
+            self.run(f"api_reports.filter_{label}", admin,
+                     lambda c, i, qs=query: c.get(f"/api/reports?limit=20&offset=0&{qs}"))
+
+    def scenario_submit(self):
+        users = [self.login_client(self.args.admins + 1 + n) for n in range(self.args.concurrency)]
+        form = {
+            "department": "A",
+            "risk_type[]": ["Kaygan Zemin"],
+            "details": "Benchmark risk raporu detayları",
+            "witnesses": "",
+        }
+        self.run("submit_risk.no_image", users,
+                 lambda c, i: c.post("/submit-risk-report", data=dict(form)),
+                 iterations=self.args.submit_iterations)
+
+        image = _png_payload(self.args.image_kb)
+        self.run(f"submit_risk.image_{self.args.image_kb}kb", users,
+                 lambda c, i: c.post("/submit-risk-report", data={
+                     **form,
+                     "images[]": [(io.BytesIO(image), "bench.png", "image/png")],
+                 }, content_type="multipart/form-data"),
+                 iterations=self.args.submit_iterations)
+
+    def scenario_polling(self):
+        admins = [self.login_client(n + 1) for n in range(self.args.admins)]
+        self.run(f"check_new_reports.admins_{self.args.admins}", admins,
+                 lambda c, i: c.get("/check-new-reports"),
+                 iterations=self.args.iterations * self.args.admins)
+
+    def scenario_login(self):
+        clients = [self.app.test_client() for _ in range(self.args.concurrency)]
+        users = max(1, self.args.users)
+        self.run("login.burst", clients,
+                 lambda c, i: c.post("/login", data={
+                     "email": f"user{1 + (i % users)}@bench.local",
+                     "password": BENCH_PASSWORD,
+                 }),
+                 iterations=self.args.login_burst)
+
+    def scenario_search(self):
+        clients = [self.login_client(self.args.admins + 1) for _ in range(self.args.concurrency)]
+        terms = ["be", "bench", "kullanıcı 1", "zz"]
+        self.run("users_search", clients,
+                 lambda c, i: c.get(f"/api/users/search?q={terms[i % len(terms)]}"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapor akışı benchmark'ı")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--submit-iterations", type=int, default=50)
+    parser.add_argument("--login-burst", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--image-kb", type=int, default=512)
+    parser.add_argument("--offsets", type=lambda v: [int(x) for x in v.split(",")], default=[0, 100, 1000, 10000])
+    parser.add_argument("--scenarios", default="reports,submit,polling,login,search")
+    parser.add_argument("--output", help="JSON çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki JSON çıktı")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    local_pg = None
+    database_url = args.database_url
+    if not database_url:
+        local_pg = LocalPostgres().__enter__()
+        database_url = local_pg.url
+
+    # Yüklenen görseller repo'daki static/uploads'a yazılmasın
+    workdir = tempfile.mkdtemp(prefix="exp-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        module = load_app(database_url, env={
+            "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            # Test client'ın tüm istekleri 127.0.0.1'den gelir: senaryolar 429 ölçmesin
+            "RATE_LIMIT_ENABLED": "0",
+            # Ölçüm sırasında bakım işleri çalışmasın
+            "SCHEDULER_ENABLED": "0",
+        })
+        seed_data(module, args.users, args.reports, args.admins)
+
+        bench = Bench(module, args)
+        for name in args.scenarios.split(","):
+            getattr(bench, f"scenario_{name.strip()}")()
+
+        output = {
+            "meta": {
+                "users": args.users,
+                "reports": args.reports,
+                "admins": args.admins,
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+                "python": sys.version.split()[0],
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "scenarios": bench.results,
+        }
+    finally:
+        os.chdir(cwd)
+        if local_pg:
+            local_pg.__exit__(None, None, None)
+
+    # baseline, --output aynı dosyayı gösterebileceği için yazmadan önce okunur
+    regressions = compare(bench.results, args.baseline, args.max_regression) if args.baseline else []
+
+    payload = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+
+    if regressions:
+        print("Performans regresyonu:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
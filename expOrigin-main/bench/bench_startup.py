@@ -0,0 +1,174 @@
+# bench/bench_startup.py
+"""
+Soğuk açılış (cold start) benchmark'ı.
+
+Her ölçüm ayrı bir Python process'inde yapılır (modül cache'i, havuz ve Jinja
+bellek içi cache'i sıfırdan), aşamalar ayrı ayrı raporlanır:
+    startup.import         app.py import'u (dotenv, engine/route kurulumu)
+    startup.create_app     create_app() çağrısı
+    startup.first_request  ilk isteğin (GET /login) gecikmesi
+    startup.ready          process başlangıcından ilk yanıta kadar toplam süre
+    startup.warmup.<adım>  --mode sync ile warmup adım süreleri
+
+Örnek:
+    # geçici local Postgres açar (initdb/pg_ctl PATH'te olmalı)
+    python bench/bench_startup.py --runs 10 --output startup.json
+
+    # ısınmasız (tembel) açılış ile arka plan ısınmasını karşılaştır
+    python bench/bench_startup.py --mode off
+    python bench/bench_startup.py --mode background
+
+    # DB'siz: yalnızca import + create_app
+    python bench/bench_startup.py --skip-db
+
+    # önceki sonuca göre p95 regresyonu %20'yi geçerse çıkış kodu 1
+    python bench/bench_startup.py --baseline startup.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import LocalPostgres, compare, load_app, summarize
+
+
+def child(params: dict) -> dict:
+    """Tek bir soğuk açılışı ölçer (alt process içinde çalışır)."""
+    t_start = params["t_start"]
+    t0 = time.perf_counter()
+    module = load_app(params["database_url"], env=params["env"])
+    t1 = time.perf_counter()
+
+    mode = params["mode"]
+    result = {"import": t1 - t0}
+    if mode == "sync":
+        module.create_app(warmup_mode="off")
+        t2 = time.perf_counter()
+        result["create_app"] = t2 - t1
+        for task, outcome in module.warmup().items():
+            if "error" in outcome:
+                raise RuntimeError(f"warmup adımı başarısız ({task}): {outcome['error']}")
+            result[f"warmup.{task}"] = outcome["seconds"]
+        result["warmup"] = time.perf_counter() - t2
+    else:
+        module.create_app(warmup_mode=mode)
+        result["create_app"] = time.perf_counter() - t1
+
+    if not params["skip_db"]:
+        client = module.app.test_client()
+        t3 = time.perf_counter()
+        resp = client.get("/login")
+        result["first_request"] = time.perf_counter() - t3
+        if resp.status_code != 200:
+            raise RuntimeError(f"İlk istek başarısız: {resp.status_code}")
+    # time.time(): parent ile aynı saat; perf_counter process'ler arası karşılaştırılamaz
+    result["ready"] = time.time() - t_start
+    return result
+
+
+def run_once(args, database_url: str, env: dict) -> dict:
+    params = {
+        "database_url": database_url,
+        "env": env,
+        "mode": args.mode,
+        "skip_db": args.skip_db,
+        "t_start": time.time(),
+    }
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", json.dumps(params)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Ölçüm process'i başarısız:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soğuk açılış benchmark'ı")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mode", choices=["off", "background", "sync"], default="sync",
+                        help="create_app ısınma modu (sync: warmup() adım adım ölçülür)")
+    parser.add_argument("--skip-db", action="store_true", help="DB'siz: yalnızca import + create_app")
+    parser.add_argument("--cold-templates", action="store_true",
+                        help="Her çalıştırmada boş Jinja bytecode cache (imajda cache yokmuş gibi)")
+    parser.add_argument("--output", help="JSON çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki JSON çıktı")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    if args.skip_db:
+        args.mode = "off"
+
+    local_pg = None
+    database_url = args.database_url
+    if args.skip_db:
+        # Engine tembel bağlandığı için URL'e hiç gidilmez
+        database_url = "postgresql://bench@127.0.0.1:1/bench"
+    elif not database_url:
+        local_pg = LocalPostgres().__enter__()
+        database_url = local_pg.url
+
+    workdir = tempfile.mkdtemp(prefix="exp-bench-startup-")
+    samples = {}
+    try:
+        # İlk çalıştırma sayılmaz: şemayı kurar ve paylaşılan bytecode cache'i doldurur
+        for i in range(args.runs + 1):
+            jinja_dir = os.path.join(workdir, f"jinja-{i}" if args.cold_templates else "jinja")
+            env = {
+                "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+                "DEGRADED_DATA_DIR": os.path.join(workdir, "degraded"),
+                "JINJA_CACHE_DIR": jinja_dir,
+                # Ölçüm process'i bakım işlerini başlatmasın
+                "SCHEDULER_ENABLED": "0",
+            }
+            result = run_once(args, database_url, env)
+            if i == 0:
+                continue
+            for phase, seconds in result.items():
+                samples.setdefault(phase, []).append(seconds)
+            print(f"run {i:3d}: " + " ".join(f"{k}={v * 1000:.1f}ms" for k, v in result.items()),
+                  file=sys.stderr)
+    finally:
+        if local_pg:
+            local_pg.__exit__(None, None, None)
+
+    scenarios = {
+        f"startup.{phase}": summarize(values, 0, sum(values))
+        for phase, values in samples.items()
+    }
+    output = {
+        "meta": {
+            "runs": args.runs,
+            "mode": args.mode,
+            "skip_db": args.skip_db,
+            "cold_templates": args.cold_templates,
+            "python": sys.version.split()[0],
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": scenarios,
+    }
+
+    # baseline, --output aynı dosyayı gösterebileceği için yazmadan önce okunur
+    regressions = compare(scenarios, args.baseline, args.max_regression) if args.baseline else []
+
+    payload = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+
+    if regressions:
+        print("Açılış süresi regresyonu:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        print(json.dumps(child(json.loads(sys.argv[2]))))
+        sys.exit(0)
+    sys.exit(main())
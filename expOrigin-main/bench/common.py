@@ -0,0 +1,192 @@
+# bench/common.py
+"""
+Benchmark ve ölçüm scriptleri için ortak yardımcılar:
+- LocalPostgres: geçici bir Postgres kümesi açar (initdb/pg_ctl PATH'te olmalı)
+- load_app: app.py'yi verilen DATABASE_URL ile yükler
+- seed_data: kullanıcı/rapor tablolarını istenen hacimde doldurur
+- summarize: gecikme listesinden p50/p95/p99 + throughput üretir
+- compare: sonuçları önceki bir JSON çıktıyla (p95) karşılaştırır
+"""
+import importlib.util
+import json
+import math
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+REPORT_TYPES = ("Risk Bildirim Raporlaması", "Olay Bildirim Raporlaması", "Acil Yardım Sinyali")
+DEPARTMENTS = ("A", "B", "C")
+BENCH_PASSWORD = "bench-password"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pg_bindir() -> str | None:
+    if shutil.which("pg_ctl"):
+        return os.path.dirname(shutil.which("pg_ctl"))
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        out = subprocess.run([pg_config, "--bindir"], capture_output=True, text=True)
+        if out.returncode == 0 and os.path.exists(os.path.join(out.stdout.strip(), "pg_ctl")):
+            return out.stdout.strip()
+    for base in ("/usr/lib/postgresql", "/usr/local/opt"):
+        if os.path.isdir(base):
+            for version in sorted(os.listdir(base), reverse=True):
+                candidate = os.path.join(base, version, "bin")
+                if os.path.exists(os.path.join(candidate, "pg_ctl")):
+                    return candidate
+    return None
+
+
+class LocalPostgres:
+    """
+    Geçici dizinde tek kullanımlık bir Postgres kümesi.
+    Not: initdb root kullanıcısıyla çalışmaz; CI'da normal kullanıcıyla çalıştırın.
+    """
+
+    def __init__(self):
+        self.bindir = _pg_bindir()
+        if not self.bindir:
+            raise RuntimeError("pg_ctl bulunamadı; --database-url verin veya Postgres kurun")
+        self.tmpdir = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        return f"postgresql://postgres@127.0.0.1:{self.port}/postgres?sslmode=disable"
+
+    def __enter__(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="exp-bench-pg-")
+        data_dir = os.path.join(self.tmpdir, "data")
+        self.port = _free_port()
+        subprocess.run(
+            [os.path.join(self.bindir, "initdb"), "-D", data_dir, "-U", "postgres", "-A", "trust"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            [
+                os.path.join(self.bindir, "pg_ctl"), "-D", data_dir, "-w",
+                "-l", os.path.join(self.tmpdir, "postgres.log"),
+                "-o", f"-p {self.port} -k {self.tmpdir} -c listen_addresses=127.0.0.1 -c fsync=off",
+                "start",
+            ],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.run(
+            [os.path.join(self.bindir, "pg_ctl"), "-D", os.path.join(self.tmpdir, "data"), "-m", "fast", "stop"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+def load_app(database_url: str, env: dict | None = None):
+    """
+    app.py'yi izole bir modül olarak yükler. Local Postgres SSL kullanmadığı için
+    URL'de sslmode yoksa disable eklenir (app aksi halde require ekler).
+    """
+    if "sslmode=" not in database_url:
+        database_url += ("&" if "?" in database_url else "?") + "sslmode=disable"
+    os.environ["DATABASE_URL"] = database_url
+    for key, value in (env or {}).items():
+        os.environ[key] = str(value)
+
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location("exp_bench_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    module.app.config["TESTING"] = True
+    return module
+
+
+def seed_data(module, users: int, reports: int, admins: int):
+    """
+    Tabloları sıfırlayıp users/reports'u generate_series ile toplu doldurur.
+    İlk `admins` kullanıcı admin'dir; tüm kullanıcıların şifresi BENCH_PASSWORD.
+    """
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+
+    with module.app.app_context():
+        module.ensure_tables()
+        module.ensure_catalog_indexes()
+        module.seed_default_categories()
+        password_hash = generate_password_hash(BENCH_PASSWORD)
+
+        with module.db.engine.begin() as conn:
+            conn.execute(text("TRUNCATE users, reports, report_witnesses, admin_report_cursors RESTART IDENTITY"))
+            conn.execute(text("""
+                INSERT INTO users (fullname, email, password, role)
+                SELECT 'Bench Kullanıcı ' || i, 'user' || i || '@bench.local', :pw, i <= :admins
+                FROM generate_series(1, :n) AS i
+            """), {"pw": password_hash, "admins": admins, "n": users})
+            conn.execute(text("""
+                INSERT INTO reports (id, type, date, fullname, details, witnesses, department)
+                SELECT
+                    u,
+                    (:types)[1 + (i % 3)],
+                    NOW() - (i * INTERVAL '37 seconds'),
+                    'Bench Kullanıcı ' || u,
+                    'Departman: ' || (:deps)[1 + (i % 3)] || ' | Detaylar: ' || repeat('benchmark detay ', 1 + i % 20),
+                    CASE WHEN i % 4 = 0 THEN 'Bench Kullanıcı ' || (1 + (i * 7) % :users) END,
+                    (:deps)[1 + (i % 3)]
+                FROM generate_series(1, :n) AS i,
+                     LATERAL (SELECT 1 + (i * 31) % :users AS u) AS pick
+            """), {
+                "types": list(REPORT_TYPES),
+                "deps": list(DEPARTMENTS),
+                "users": users,
+                "n": reports,
+            })
+            conn.execute(text("ANALYZE users"))
+            conn.execute(text("ANALYZE reports"))
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank yöntemi
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors: int, wall_seconds: float) -> dict:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round((sum(values) / count) * 1000, 3) if count else 0.0,
+        "throughput_rps": round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list:
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh).get("scenarios", {})
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        ratio = current["p95_ms"] / before["p95_ms"] - 1.0
+        if ratio > max_regression:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms (+{ratio:.0%})")
+    return regressions
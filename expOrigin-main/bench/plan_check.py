@@ -0,0 +1,229 @@
+# bench/plan_check.py
+"""
+Rapor sorguları için sorgu planı (EXPLAIN) regresyon testi.
+
+Veritabanını gerçekçi hacimde doldurur, /api/reports ve /api/mobile/reports
+endpoint'lerini üretebilecekleri her filtre kombinasyonuyla (q, type, date_from,
+date_to; web için facet'li/facet'siz) çağırır. Endpoint'lerin çalıştırdığı
+reports sorguları yakalanıp aynı parametrelerle
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) edilir. SQL burada kopyalanmadığı için
+route'lardaki sorgu değiştiğinde test de kendiliğinden onu ölçer.
+
+Kurallar:
+- Sayfa sorguları (LIMIT'li): reports üzerinde Seq Scan olamaz ve
+  --page-buffer-budget bloktan fazla buffer okuyamaz.
+- Sayım/facet sorguları: filtreli küme zaten taranmak zorunda; yalnızca buffer
+  bütçesi uygulanır (reports + users tablo boyutunun --aggregate-budget-ratio katı).
+
+Örnek:
+    # geçici local Postgres açar (initdb/pg_ctl PATH'te olmalı)
+    python bench/plan_check.py --users 5000 --reports 200000
+
+    # mevcut bir test veritabanı ile, planları da yaz
+    python bench/plan_check.py --database-url postgresql://u:p@localhost/bench --output plans.json
+
+İhlal varsa çıkış kodu 1.
+UYARI: Hedef veritabanındaki users/reports tabloları TRUNCATE edilir.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from sqlalchemy import event, text
+
+from common import BENCH_PASSWORD, REPORT_TYPES, LocalPostgres, load_app, seed_data
+
+FILTER_KEYS = ("q", "type", "date_from", "date_to")
+
+
+def filter_values(args) -> dict:
+    now = datetime.utcnow()
+    return {
+        # Tek kullanıcıya denk gelen seçici bir arama (gerçek kullanım: ad yazılır)
+        "q": f"Kullanıcı {max(1, args.users // 2)}",
+        "type": REPORT_TYPES[0],
+        "date_from": (now - timedelta(days=args.window_days)).strftime("%Y-%m-%d"),
+        "date_to": now.strftime("%Y-%m-%d"),
+    }
+
+
+def combinations(values: dict):
+    for n in range(len(FILTER_KEYS) + 1):
+        for keys in itertools.combinations(FILTER_KEYS, n):
+            yield {k: values[k] for k in keys}
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+class PlanChecker:
+    def __init__(self, module, args):
+        self.module = module
+        self.app = module.app
+        self.args = args
+        self.captured = []
+        self.results = []
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        # EXPLAIN'in kendisi ve reports'a dokunmayan sorgular (rol kontrolü vb.) hariç
+        if statement.lstrip().upper().startswith("EXPLAIN") or "FROM reports" not in statement:
+            return
+        self.captured.append((statement, dict(parameters or {})))
+
+    def table_pages(self) -> int:
+        with self.app.app_context(), self.module.db.engine.connect() as conn:
+            return conn.execute(text(
+                "SELECT SUM(relpages)::bigint FROM pg_class WHERE relname IN ('reports', 'users')"
+            )).scalar() or 0
+
+    def explain(self, statement: str, parameters: dict) -> dict:
+        with self.app.app_context(), self.module.db.engine.connect() as conn:
+            # Önceki sorgunun ısıttığı cache'ten bağımsız olsun diye yalnızca paylaşılan
+            # buffer toplamına bakılır (hit + read); zamanlama sadece bilgi amaçlı
+            raw = conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters
+            ).scalar()
+        return (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+    def check(self, route: str, query: dict, statement: str, parameters: dict, aggregate_budget: int):
+        plan = self.explain(statement, parameters)
+        root = plan["Plan"]
+        kind = "page" if "LIMIT" in statement.upper() else "aggregate"
+        buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+        seq_scans = sorted({
+            node.get("Relation Name") for node in walk_plan(root)
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name")
+        })
+
+        violations = []
+        if kind == "page":
+            if "reports" in seq_scans:
+                violations.append("reports üzerinde Seq Scan")
+            if buffers > self.args.page_buffer_budget:
+                violations.append(f"buffer {buffers} > {self.args.page_buffer_budget}")
+        elif buffers > aggregate_budget:
+            violations.append(f"buffer {buffers} > {aggregate_budget}")
+
+        result = {
+            "route": route,
+            "filters": sorted(query),
+            "kind": kind,
+            "buffers": buffers,
+            "execution_ms": round(plan.get("Execution Time", 0.0), 3),
+            "seq_scans": seq_scans,
+            "violations": violations,
+        }
+        if self.args.output and (violations or self.args.keep_plans):
+            result["sql"] = statement
+            result["plan"] = plan
+        self.results.append(result)
+
+        status = "FAIL" if violations else "ok"
+        print(f"{status:4s} {route:22s} {kind:9s} {','.join(sorted(query)) or '-':30s} "
+              f"buffers={buffers:7d} {result['execution_ms']:9.2f}ms {'; '.join(violations)}",
+              file=sys.stderr)
+
+    def run(self):
+        with self.app.app_context():
+            event.listen(self.module.db.engine, "before_cursor_execute", self._capture)
+
+        web = self.app.test_client()
+        resp = web.post("/login", data={"email": "user1@bench.local", "password": BENCH_PASSWORD})
+        if resp.status_code != 302:
+            raise RuntimeError(f"Admin girişi başarısız: {resp.status_code}")
+        token = self.module.create_mobile_token(1)
+        mobile_headers = {"Authorization": f"Bearer {token}"}
+
+        requests = []
+        for query in combinations(filter_values(self.args)):
+            base = {"limit": 20, "offset": 0, **query}
+            requests.append(("/api/reports", query, lambda qs=base: web.get("/api/reports?" + urlencode(qs))))
+            faceted = {**base, "facets": "type,department,day"}
+            requests.append(("/api/reports+facets", query,
+                             lambda qs=faceted: web.get("/api/reports?" + urlencode(qs))))
+            requests.append(("/api/mobile/reports", query,
+                             lambda qs=base: web.get("/api/mobile/reports?" + urlencode(qs), headers=mobile_headers)))
+
+        aggregate_budget = int(self.table_pages() * self.args.aggregate_budget_ratio)
+        for route, query, call in requests:
+            self.captured = []
+            resp = call()
+            if resp.status_code != 200:
+                raise RuntimeError(f"{route} {query} -> {resp.status_code}: {resp.get_data(as_text=True)[:200]}")
+            if not self.captured:
+                raise RuntimeError(f"{route} {query}: reports sorgusu yakalanamadı")
+            for statement, parameters in self.captured:
+                self.check(route, query, statement, parameters, aggregate_budget)
+
+        with self.app.app_context():
+            event.remove(self.module.db.engine, "before_cursor_execute", self._capture)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapor sorguları için EXPLAIN regresyon testi")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--reports", type=int, default=200000)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--window-days", type=int, default=7, help="date_from/date_to aralığı (gün)")
+    parser.add_argument("--page-buffer-budget", type=int, default=2000,
+                        help="Sayfa sorgusu başına en fazla paylaşılan buffer (8 KB blok)")
+    parser.add_argument("--aggregate-budget-ratio", type=float, default=1.5,
+                        help="Sayım/facet sorgusu bütçesi: reports+users sayfa sayısının katı")
+    parser.add_argument("--output", help="JSON sonuç dosyası (ihlal eden sorguların planlarıyla)")
+    parser.add_argument("--keep-plans", action="store_true", help="Tüm planları çıktıya yaz")
+    args = parser.parse_args(argv)
+
+    local_pg = None
+    database_url = args.database_url
+    if not database_url:
+        local_pg = LocalPostgres().__enter__()
+        database_url = local_pg.url
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="exp-plan-check-") as workdir:
+            module = load_app(database_url, env={
+                "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+                "DEGRADED_DATA_DIR": os.path.join(workdir, "degraded"),
+                "RATE_LIMIT_ENABLED": "0",
+            })
+            seed_data(module, args.users, args.reports, args.admins)
+            checker = PlanChecker(module, args)
+            checker.run()
+    finally:
+        if local_pg:
+            local_pg.__exit__(None, None, None)
+
+    failures = [r for r in checker.results if r["violations"]]
+    output = {
+        "meta": {
+            "users": args.users,
+            "reports": args.reports,
+            "page_buffer_budget": args.page_buffer_budget,
+            "aggregate_budget_ratio": args.aggregate_budget_ratio,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "checked": len(checker.results),
+        "failures": len(failures),
+        "results": checker.results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(output, fh, indent=2, ensure_ascii=False, default=str)
+            fh.write("\n")
+
+    print(f"{len(checker.results)} sorgu planı kontrol edildi, {len(failures)} ihlal", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
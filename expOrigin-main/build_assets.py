@@ -0,0 +1,143 @@
+# build_assets.py
+"""
+Statik asset build adımı.
+
+static/ altındaki JS, CSS ve görselleri içerik hash'li adlarla static/dist/
+altına yazar (JS/CSS küçültülür) ve static/dist/manifest.json üretir. Şablonlar
+asset_url('styles.css') ile hash'li dosyaya işaret eder; app bu dosyaları
+"Cache-Control: immutable" ile sunar.
+
+Kullanım (deploy öncesi / Docker build sırasında):
+    python expOrigin-main/build_assets.py
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+
+# Kullanıcı yüklemeleri ve build çıktısı asset değildir
+SKIP_DIRS = {"dist", "uploads"}
+ASSET_EXTS = {".js", ".css", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".webp"}
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{}:;,>])\s*")
+_CSS_URL_RE = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+
+def minify_css(source: str) -> str:
+    source = _CSS_COMMENT_RE.sub("", source)
+    source = _CSS_SPACE_RE.sub(" ", source)
+    source = _CSS_PUNCT_RE.sub(r"\1", source)
+    return source.replace(";}", "}").strip()
+
+
+def minify_js(source: str) -> str:
+    """
+    Güvenli (muhafazakâr) küçültme: girinti, boş satırlar ve tam satır // yorumları
+    atılır. Çok satırlı template literal (`...`) içindeki satırlara dokunulmaz.
+    """
+    out = []
+    in_template = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not in_template:
+            if not stripped or stripped.startswith("//"):
+                continue
+            out.append(stripped)
+        else:
+            out.append(line)
+        # kaçışsız backtick sayısı tekse template literal durumu değişir
+        if len(re.findall(r"(?<!\\)`", line)) % 2 == 1:
+            in_template = not in_template
+    if in_template:
+        # backtick sayımı tutarsız (örn. string içinde `): dokunmadan bırak
+        return source
+    return "\n".join(out) + "\n"
+
+
+def _hashed_name(rel_path: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _iter_assets():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        rel_root = os.path.relpath(root, STATIC_DIR)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in ASSET_EXTS:
+                yield posixpath.normpath(posixpath.join(rel_root.replace(os.sep, "/"), name))
+
+
+def _rewrite_css_urls(css: str, css_rel: str, manifest: dict) -> str:
+    """
+    CSS içindeki url(...) referanslarını hash'li dosyalara çevirir
+    (dist/ altından göreli yol olarak).
+    """
+    css_dir = posixpath.dirname(css_rel)
+
+    def repl(match):
+        url = match.group(2)
+        if url.startswith(("data:", "http:", "https:", "//", "/")):
+            return match.group(0)
+        # '../static/images/x.png' gibi /static köküne göre yazılmış yolları da çöz
+        target = posixpath.normpath(posixpath.join("static", css_dir, url))
+        if target.startswith("static/"):
+            target = target[len("static/"):]
+        if target not in manifest:
+            return match.group(0)
+        hashed_css_dir = posixpath.dirname(posixpath.join("dist", css_rel))
+        new_url = posixpath.relpath(manifest[target], hashed_css_dir)
+        return f"url('{new_url}')"
+
+    return _CSS_URL_RE.sub(repl, css)
+
+
+def build() -> dict:
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    assets = list(_iter_assets())
+    # Görseller önce: CSS url() yeniden yazımı hash'li adlarına ihtiyaç duyar
+    assets.sort(key=lambda p: (p.endswith(".css"), p.endswith(".js"), p))
+
+    manifest = {}
+    for rel_path in assets:
+        src = os.path.join(STATIC_DIR, rel_path)
+        with open(src, "rb") as fh:
+            content = fh.read()
+
+        if rel_path.endswith(".css"):
+            css = _rewrite_css_urls(content.decode("utf-8"), rel_path, manifest)
+            content = minify_css(css).encode("utf-8")
+        elif rel_path.endswith(".js"):
+            content = minify_js(content.decode("utf-8")).encode("utf-8")
+
+        hashed = posixpath.join("dist", _hashed_name(rel_path, content))
+        dest = os.path.join(STATIC_DIR, hashed)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as fh:
+            fh.write(content)
+        manifest[rel_path] = hashed
+
+    with open(os.path.join(DIST_DIR, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    result = build()
+    for source, target in sorted(result.items()):
+        print(f"{source} -> {target}")
+    sys.exit(0)
@@ -0,0 +1,577 @@
+// static/js/eventreport.js — eventreport.html sayfa scripti
+// Şablondan gelen değerler <body data-*> üzerinden okunur (JS içinde template sözdizimi yok)
+const PAGE_CONFIG = document.body.dataset;
+
+// Shared UI
+SharedUI.initNavbarUI();
+
+// Smooth scroll için
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        const target = document.querySelector(this.getAttribute('href'));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+// Profile buton tıklama işlemi
+function handleProfileClick() { SharedUI.initProfileButton(); }
+
+// Olay formu etkileşimleri
+(function initEventForm() {
+    const form = document.getElementById('eventReportForm');
+    if (!form) return;
+
+    // Çoklu seçim için checkbox davranışı (tüm seçenekler seçilebilir)
+    // Artık tek seçimli davranış yok, kullanıcı istediği kadar seçebilir
+
+    // Tanık autocomplete özelliği
+    initWitnessesAutocomplete();
+
+    // Görsel yükleme
+    const addBtn = document.getElementById('addImageBtn');
+    const fileInput = document.getElementById('imageInput');
+    const grid = document.getElementById('imageGrid');
+    const MAX_FILES = 5;
+    let files = [];
+
+    function refreshGrid() {
+        grid.innerHTML = '';
+        files.forEach((file, index) => {
+            const url = URL.createObjectURL(file);
+            const item = document.createElement('div');
+            item.className = 'image-item';
+            const img = document.createElement('img');
+            img.src = url;
+            img.alt = 'Yüklenen görsel ' + (index + 1);
+            const removeBtn = document.createElement('button');
+            removeBtn.className = 'remove-image-btn';
+            removeBtn.type = 'button';
+            removeBtn.textContent = '×';
+            removeBtn.setAttribute('aria-label', 'Görseli kaldır');
+            removeBtn.addEventListener('click', () => {
+                URL.revokeObjectURL(url);
+                files.splice(index, 1);
+                refreshGrid();
+            });
+            item.appendChild(img);
+            item.appendChild(removeBtn);
+            grid.appendChild(item);
+        });
+        addBtn.disabled = files.length >= MAX_FILES;
+    }
+
+    addBtn.addEventListener('click', () => {
+        fileInput.value = '';
+        fileInput.click();
+    });
+
+    fileInput.addEventListener('change', (e) => {
+        const selected = Array.from(e.target.files || []);
+        for (const f of selected) {
+            if (files.length >= MAX_FILES) break;
+            if (/^image\//.test(f.type)) {
+                files.push(f);
+            }
+        }
+        refreshGrid();
+    });
+
+    form.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        const department = form.querySelector('input[name="department"]:checked');
+        const eventTypes = form.querySelectorAll('input[name="event_type"]:checked');
+        const location = document.getElementById('location').value.trim();
+        const details = document.getElementById('details').value.trim();
+        const witnesses = document.getElementById('witnesses').value.trim();
+
+        if (!department) {
+            alert('Lütfen bir departman seçin.');
+            return;
+        }
+        if (eventTypes.length === 0) {
+            alert('Lütfen en az bir olay türü seçin.');
+            return;
+        }
+        if (!location) {
+            alert('Lütfen olay yerini belirtin.');
+            return;
+        }
+        if (details.length < 5) {
+            alert('Lütfen olay detaylarını daha açıklayıcı yazın.');
+            return;
+        }
+
+        const fd = new FormData();
+        fd.append('department', department.value);
+        // Birden fazla olay türü seçilebilir
+        eventTypes.forEach(eventType => {
+            fd.append('event_type[]', eventType.value);
+        });
+        fd.append('location', location);
+        fd.append('details', details);
+        //22.01.2026
+        fd.append('witnesses', witnesses);
+        witnessIdsFor(witnesses).forEach((id) => fd.append('witness_ids[]', id));
+        files.forEach((file) => fd.append('images[]', file));
+
+        try {
+            const resp = await fetch('/submit-event-report', {
+                method: 'POST',
+                body: fd
+            });
+            if (resp.status === 401) {
+                alert('Rapor göndermek için lütfen giriş yapın.');
+                window.location.href = PAGE_CONFIG.loginUrl;
+                return;
+            }
+            const data = await resp.json();
+            if (data.success) {
+                alert('Olay raporunuz başarıyla gönderildi. Teşekkürler.');
+                form.reset();
+                files = [];
+                refreshGrid();
+            } else {
+                alert('Hata: ' + (data.message || 'Rapor gönderilemedi'));
+            }
+        } catch (err) {
+            alert('Ağ hatası: ' + err.message);
+        }
+    });
+
+    refreshGrid();
+
+    // Kategorileri yükle
+    let allEventTypes = [];
+    let currentEventPage = 0;
+    const PAGE_SIZE = 4;
+
+    function renderEventPage() {
+        const container = document.getElementById('eventCategoriesGroup');
+        container.style.opacity = '0';
+        container.style.transform = 'translateY(6px)';
+        setTimeout(() => {
+            container.innerHTML = '';
+        const start = currentEventPage * PAGE_SIZE;
+        const pageItems = allEventTypes.slice(start, start + PAGE_SIZE);
+        pageItems.forEach((name) => {
+            const label = document.createElement('label');
+            label.className = 'chip-checkbox';
+            const input = document.createElement('input');
+            input.type = 'checkbox';
+            input.name = 'event_type';
+            input.value = name;
+            const span = document.createElement('span');
+            span.textContent = name;
+            label.appendChild(input);
+            label.appendChild(span);
+            container.appendChild(label);
+        });
+            // Admin inline add button at end of each page
+            const IS_ADMIN = PAGE_CONFIG.isAdmin === '1';
+            if (IS_ADMIN) {
+                const actionsWrap = document.createElement('div');
+                actionsWrap.style.display = 'inline-flex';
+                actionsWrap.style.gap = '8px';
+
+                const addBtn = document.createElement('button');
+                addBtn.type = 'button';
+                addBtn.className = 'add-category-btn';
+                addBtn.title = 'Yeni olay türü ekle';
+                addBtn.setAttribute('aria-label', 'Yeni olay türü ekle');
+                const img = document.createElement('img');
+                img.src = PAGE_CONFIG.addIconUrl;
+                img.alt = 'Ekle';
+                addBtn.appendChild(img);
+                addBtn.addEventListener('click', () => openEventAddModal());
+                actionsWrap.appendChild(addBtn);
+
+                const delBtn = document.createElement('button');
+                delBtn.type = 'button';
+                delBtn.className = 'add-category-btn';
+                delBtn.title = 'Seçili olay tür(ler)ini sil';
+                delBtn.setAttribute('aria-label', 'Seçili olay tür(ler)ini sil');
+                const delImg = document.createElement('img');
+                delImg.src = PAGE_CONFIG.deleteIconUrl;
+                delImg.alt = 'Sil';
+                delBtn.appendChild(delImg);
+                delBtn.addEventListener('click', async () => {
+                    // mevcut sayfadaki seçili event_type değerlerini al
+                    const checked = Array.from(container.querySelectorAll('input[name="event_type"]:checked')).map(i => i.value);
+                    if (checked.length === 0) { alert('Silmek için en az bir olay türü seçin.'); return; }
+                    if (!confirm('Seçili olay tür(ler)ini silmek istediğinize emin misiniz?')) return;
+                    try {
+                        const resp = await fetch('/api/categories/bulk-delete', {
+                            method: 'POST', headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ type: 'event', names: checked })
+                        });
+                        const data = await resp.json();
+                        if (data.success) { await loadEventCategories(); }
+                        else { alert('Hata: ' + (data.message || 'Silinemedi')); }
+                    } catch (e) { alert('Ağ hatası: ' + e.message); }
+                });
+                actionsWrap.appendChild(delBtn);
+
+                container.appendChild(actionsWrap);
+            }
+            const prevBtn = document.getElementById('eventPrevBtn');
+            const nextBtn = document.getElementById('eventNextBtn');
+            const totalPages = Math.ceil(allEventTypes.length / PAGE_SIZE) || 1;
+            prevBtn.disabled = currentEventPage <= 0;
+            nextBtn.disabled = currentEventPage >= totalPages - 1;
+            // fade in
+            requestAnimationFrame(() => {
+                container.style.opacity = '1';
+                container.style.transform = 'translateY(0)';
+            });
+        }, 100);
+    }
+
+    async function loadEventCategories() {
+        try {
+            const resp = await fetch('/api/categories?type=event');
+            const data = await resp.json();
+            if (!data.success) return;
+            allEventTypes = data.items || [];
+            currentEventPage = 0;
+            renderEventPage();
+        } catch (e) { /* sessiz */ }
+    }
+    loadEventCategories();
+
+    // Modal helpers (admin)
+    function openEventAddModal() {
+        const overlay = document.getElementById('eventAddModalOverlay');
+        const modal = document.getElementById('eventAddModal');
+        overlay.style.display = 'flex';
+        requestAnimationFrame(() => modal.classList.add('open'));
+        const input = document.getElementById('eventAddInput');
+        input.value = '';
+        setTimeout(() => input.focus(), 50);
+    }
+    function closeEventAddModal() {
+        const overlay = document.getElementById('eventAddModalOverlay');
+        const modal = document.getElementById('eventAddModal');
+        modal.classList.remove('open');
+        setTimeout(() => overlay.style.display = 'none', 150);
+    }
+    const eventAddSave = document.getElementById('eventAddSave');
+    const eventAddCancel = document.getElementById('eventAddCancel');
+    const eventAddClose = document.getElementById('eventAddModalClose');
+    if (eventAddSave) {
+        eventAddSave.addEventListener('click', async () => {
+            const name = document.getElementById('eventAddInput').value.trim();
+            if (!name) return;
+            try {
+                const resp = await fetch('/api/categories', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ type: 'event', name })
+                });
+                const data = await resp.json();
+                if (data.success) {
+                    closeEventAddModal();
+                    await loadEventCategories();
+                } else {
+                    alert('Hata: ' + (data.message || 'Eklenemedi'));
+                }
+            } catch (err) { alert('Ağ hatası: ' + err.message); }
+        });
+    }
+    if (eventAddCancel) eventAddCancel.addEventListener('click', closeEventAddModal);
+    if (eventAddClose) eventAddClose.addEventListener('click', closeEventAddModal);
+
+    // Sayfalama butonları
+    const prevBtn = document.getElementById('eventPrevBtn');
+    const nextBtn = document.getElementById('eventNextBtn');
+    if (prevBtn && nextBtn) {
+        prevBtn.addEventListener('click', () => {
+            if (currentEventPage > 0) {
+                currentEventPage -= 1;
+                renderEventPage();
+            }
+        });
+        nextBtn.addEventListener('click', () => {
+            const totalPages = Math.ceil(allEventTypes.length / PAGE_SIZE) || 1;
+            if (currentEventPage < totalPages - 1) {
+                currentEventPage += 1;
+                renderEventPage();
+            }
+        });
+    }
+})();
+
+// Admin bildirim sistemi
+let notificationCheckInterval;
+let lastCheckTime = new Date();
+
+function closeNotification() {
+    const container = document.getElementById('notification-container');
+    container.style.display = 'none';
+}
+
+function viewReport() {
+    window.location.href = PAGE_CONFIG.reportsUrl;
+}
+
+function checkNewReports() { /* handled in SharedUI.maybeInitAdminNotifications */ }
+
+function showNotification(report) {
+    document.getElementById('report-type').textContent = report.type;
+    document.getElementById('reporter-name').textContent = report.reporter_name;
+    document.getElementById('report-date').textContent = new Date(report.date).toLocaleString('tr-TR');
+    const container = document.getElementById('notification-container');
+    container.style.display = 'flex';
+    playNotificationSound();
+}
+
+function playNotificationSound() {
+    try {
+        const audio = new Audio('data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTYIG2m98OScTgwOUarm7blmGgU7k9n1unEiBC13yO/eizEIHWq+8+OWT');
+        audio.play();
+    } catch (e) {
+        console.log('Ses çalınamadı:', e);
+    }
+}
+
+function initAdminNotifications() { SharedUI.maybeInitAdminNotifications(); }
+
+function debugReports() { SharedUI.debugReports(); }
+
+document.addEventListener('DOMContentLoaded', function() {
+    const body = document.body;
+    const loggedIn = body.dataset.loggedIn === '1';
+    if (loggedIn) {
+        fetch('/check-admin-status')
+            .then(response => response.json())
+            .then(data => {
+                if (data.is_admin) {
+                    initAdminNotifications();
+                }
+            })
+            .catch(error => {
+                console.error('Admin kontrolü hatası:', error);
+            });
+    }
+});
+
+window.addEventListener('beforeunload', function() {
+    if (notificationCheckInterval) {
+        clearInterval(notificationCheckInterval);
+    }
+});
+
+// Öneriden seçilen tanıklar: isim -> kullanıcı id
+const selectedWitnessIds = new Map();
+
+// Metinde hâlâ duran (silinmemiş) seçili tanıkların id'leri
+function witnessIdsFor(text) {
+    return text.split(',')
+        .map((name) => name.trim())
+        .filter((name) => selectedWitnessIds.has(name))
+        .map((name) => selectedWitnessIds.get(name));
+}
+
+// Tanık autocomplete fonksiyonu
+function initWitnessesAutocomplete() {
+    const witnessesInput = document.getElementById('witnesses');
+    const suggestionsContainer = document.getElementById('witnesses-suggestions');
+    let currentSuggestions = [];
+    let selectedIndex = -1;
+    let searchTimeout;
+
+    // Input'a yazıldığında
+    witnessesInput.addEventListener('input', function(e) {
+        const fullValue = e.target.value.trim();
+
+        // Önceki timeout'u temizle
+        clearTimeout(searchTimeout);
+
+        // Virgülle böl ve son kısmını al (arama metni)
+        const parts = fullValue.split(',');
+        const searchQuery = parts[parts.length - 1].trim();
+
+        if (searchQuery.length < 2) {
+            hideSuggestions();
+            return;
+        }
+
+        // 300ms gecikme ile arama yap (her tuş vuruşunda değil)
+        searchTimeout = setTimeout(() => {
+            searchUsers(searchQuery);
+        }, 300);
+    });
+
+    // Klavye navigasyonu
+    witnessesInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Enter') {
+            e.preventDefault();
+
+            if (suggestionsContainer.style.display === 'none') {
+                // Öneriler kapalıysa virgül ekle
+                const currentValue = witnessesInput.value.trim();
+                if (currentValue !== '') {
+                    const lastChar = currentValue.slice(-1);
+                    if (lastChar !== ',') {
+                        witnessesInput.value = currentValue + ', ';
+                        witnessesInput.setSelectionRange(currentValue.length + 2, currentValue.length + 2);
+                    }
+                }
+            } else {
+                // Öneriler açıksa seçili öneriyi seç
+                selectCurrent();
+            }
+            return;
+        }
+
+        if (suggestionsContainer.style.display === 'none') {
+            return;
+        }
+
+        switch (e.key) {
+            case 'ArrowDown':
+                e.preventDefault();
+                selectNext();
+                break;
+            case 'ArrowUp':
+                e.preventDefault();
+                selectPrevious();
+                break;
+            case 'Escape':
+                hideSuggestions();
+                break;
+        }
+    });
+
+    // Input'tan çıkıldığında
+    witnessesInput.addEventListener('blur', function() {
+        // Mouse ile tıklama için biraz gecikme
+        setTimeout(() => {
+            if (!suggestionsContainer.matches(':hover')) {
+                hideSuggestions();
+            }
+        }, 150);
+    });
+
+    // Kullanıcı arama fonksiyonu
+    async function searchUsers(query) {
+        try {
+            const response = await fetch(`/api/users/search?q=${encodeURIComponent(query)}`);
+            const data = await response.json();
+
+            if (data.success) {
+                currentSuggestions = data.users;
+                showSuggestions();
+            }
+        } catch (error) {
+            console.error('Kullanıcı arama hatası:', error);
+        }
+    }
+
+    // Önerileri göster
+    function showSuggestions() {
+        if (currentSuggestions.length === 0) {
+            hideSuggestions();
+            return;
+        }
+
+        suggestionsContainer.innerHTML = '';
+        selectedIndex = -1;
+
+        currentSuggestions.forEach((user, index) => {
+            const suggestionItem = document.createElement('div');
+            suggestionItem.className = 'suggestion-item';
+            suggestionItem.textContent = user.fullname;
+            suggestionItem.dataset.fullname = user.fullname;
+
+            suggestionItem.addEventListener('click', function() {
+                selectSuggestion(user);
+            });
+
+            suggestionItem.addEventListener('mouseenter', function() {
+                selectedIndex = index;
+                updateSelection();
+            });
+
+            suggestionsContainer.appendChild(suggestionItem);
+        });
+
+        suggestionsContainer.style.display = 'block';
+    }
+
+    // Önerileri gizle
+    function hideSuggestions() {
+        suggestionsContainer.style.display = 'none';
+        currentSuggestions = [];
+        selectedIndex = -1;
+    }
+
+    // Sonraki öneriyi seç
+    function selectNext() {
+        if (selectedIndex < currentSuggestions.length - 1) {
+            selectedIndex++;
+        } else {
+            selectedIndex = 0;
+        }
+        updateSelection();
+    }
+
+    // Önceki öneriyi seç
+    function selectPrevious() {
+        if (selectedIndex > 0) {
+            selectedIndex--;
+        } else {
+            selectedIndex = currentSuggestions.length - 1;
+        }
+        updateSelection();
+    }
+
+    // Seçimi güncelle
+    function updateSelection() {
+        const items = suggestionsContainer.querySelectorAll('.suggestion-item');
+        items.forEach((item, index) => {
+            item.classList.toggle('selected', index === selectedIndex);
+        });
+    }
+
+    // Mevcut seçimi uygula
+    function selectCurrent() {
+        if (selectedIndex >= 0 && selectedIndex < currentSuggestions.length) {
+            const selectedUser = currentSuggestions[selectedIndex];
+            selectSuggestion(selectedUser);
+        }
+    }
+
+    // Öneriyi seç
+    function selectSuggestion(user) {
+        const fullname = user.fullname;
+        // Seçilen kullanıcının id'si gönderilir; sunucu ismi tekrar çözmek zorunda kalmaz
+        selectedWitnessIds.set(fullname, user.id);
+        const currentValue = witnessesInput.value.trim();
+        let newValue;
+
+        // Mevcut değeri virgülle böl
+        const parts = currentValue.split(',');
+
+        if (parts.length === 1) {
+            // Sadece bir kısım varsa (virgül yoksa), direkt değiştir ve virgül ekle
+            newValue = fullname + ', ';
+        } else {
+            // Birden fazla kısım varsa, son kısmı hariç tut ve yeni ismi ekle
+            const existingNames = parts.slice(0, -1).join(',').trim();
+            newValue = existingNames + ', ' + fullname + ', ';
+        }
+
+        witnessesInput.value = newValue;
+        hideSuggestions();
+        witnessesInput.focus();
+
+        // Cursor'u sona taşı
+        witnessesInput.setSelectionRange(newValue.length, newValue.length);
+    }
+}
@@ -0,0 +1,438 @@
+// static/js/reports.js — reports.html sayfa scripti
+// Shared UI (no auto scroll background unless data-scroll-bg is present)
+SharedUI.initNavbarUI();
+
+// Global config from DOM (no template syntax inside JS)
+const CONFIG_EL = document.getElementById('js-config');
+const IS_AUTH = CONFIG_EL?.dataset.auth === '1';
+const PROFILE_URL = CONFIG_EL?.dataset.profileUrl || '/profile';
+const LOGIN_URL = CONFIG_EL?.dataset.loginUrl || '/login';
+const REPORTS_URL = CONFIG_EL?.dataset.reportsUrl || '/raporlar';
+
+// Profile buton tıklama işlemi
+function handleProfileClick() {
+    window.location.href = IS_AUTH ? PROFILE_URL : LOGIN_URL;
+}
+
+// Raporlar - sonsuz kaydırma
+const reportsGrid = document.getElementById('reports-grid');
+const loader = document.getElementById('reports-loader');
+const endMarker = document.getElementById('reports-end');
+let loading = false;
+let hasMore = true;
+let nextOffset = 0;
+const pageSize = 24; // grid için ideal
+// active filters
+let activeFilters = { q: '', type: '', date_from: '', date_to: '' };
+
+function formatDate(iso) {
+    try {
+        return new Date(iso).toLocaleString('tr-TR');
+    } catch { return iso || ''; }
+}
+
+function createReportCard(item) {
+    const div = document.createElement('div');
+    div.className = 'report-card';
+    // Liste yalnızca özeti taşır; tam detay modal açılınca çekilir
+    const cardText = item.summary || item.details || '';
+    div.innerHTML = `
+        <div class="report-card__top">
+            <span class="report-card__badge">${item.type || 'Rapor'}</span>
+            <span class="report-card__date">${formatDate(item.date)}</span>
+        </div>
+        <div class="report-card__body">
+            <h3 class="report-card__title">${item.reporter_name || item.fullname || 'Bilinmeyen Kullanıcı'}</h3>
+            <p class="report-card__meta">Kullanıcı ID: ${(item.user_id !== undefined && item.user_id !== null) ? item.user_id : ''}</p>
+            ${cardText ? `<div class="report-card__details">${formatReportCardDetails(cardText)}</div>` : ''}
+            ${item.witnesses && item.witnesses.trim().length > 0 ? 
+                `<p class="report-card__witnesses">👥 Tanık: ${item.witnesses}</p>` : 
+                '<p class="report-card__witnesses no-witnesses">👥 Tanık: Yok</p>'
+            }
+            <div class="report-card__actions">
+                <button class="view-report-btn" type="button">Raporu Görüntüle</button>
+            </div>
+        </div>
+    `;
+    // Attach details payload to element
+    div.dataset.type = item.type || '';
+    div.dataset.date = item.date || '';
+    div.dataset.reporter = item.reporter_name || item.fullname || '';
+    div.dataset.reportId = item.report_id || '';
+    div.dataset.details = item.details || '';
+    div.dataset.witnesses = item.witnesses || '';
+    // Button handler
+    const btn = div.querySelector('.view-report-btn');
+    btn.addEventListener('click', () => openReportDetail(div.dataset));
+    // smooth appear
+    requestAnimationFrame(() => div.classList.add('appear'));
+    return div;
+}
+
+function updateTypeFacetCounts(buckets) {
+    const typeEl = document.getElementById('filterType');
+    if (!typeEl) return;
+    const counts = {};
+    buckets.forEach(b => { counts[(b.value || '').toLowerCase()] = b.count; });
+    Array.from(typeEl.options).forEach(opt => {
+        if (!opt.value) return;
+        if (!opt.dataset.label) {
+            // value attribute'u yoksa value metinden gelir; metni değiştirmeden sabitle
+            opt.setAttribute('value', opt.value);
+            opt.dataset.label = opt.textContent;
+        }
+        const n = counts[opt.value.toLowerCase()] || 0;
+        opt.textContent = `${opt.dataset.label} (${n})`;
+    });
+}
+
+const LIST_FIELDS = 'report_id,user_id,type,date,reporter_name,summary,witnesses';
+
+async function loadReports() {
+    if (loading || !hasMore) return;
+    loading = true;
+    loader.style.display = 'flex';
+    try {
+        // show skeletons on first page load or when filters applied
+        const showSkeletons = nextOffset === 0;
+        let skeletons = [];
+        if (showSkeletons) {
+            for (let i = 0; i < 8; i++) {
+                const sk = document.createElement('div');
+                sk.className = 'skeleton';
+                reportsGrid.appendChild(sk);
+                skeletons.push(sk);
+            }
+        }
+        const params = new URLSearchParams();
+        params.set('limit', pageSize);
+        params.set('offset', nextOffset);
+        params.set('fields', LIST_FIELDS);
+        // Sayımlar yalnızca ilk sayfada istenir (aynı sorguda toplamla birlikte gelir)
+        if (nextOffset === 0) params.set('facets', 'type');
+        if (activeFilters.q) params.set('q', activeFilters.q);
+        if (activeFilters.type) params.set('type', activeFilters.type);
+        if (activeFilters.date_from) params.set('date_from', activeFilters.date_from);
+        if (activeFilters.date_to) params.set('date_to', activeFilters.date_to);
+        const resp = await fetch(`/api/reports?${params.toString()}`);
+        const data = await resp.json();
+        if (!data.success) throw new Error(data.message || 'Yükleme hatası');
+        // remove skeletons and inject cards with appear animation staggered
+        skeletons.forEach(el => el.remove());
+        data.items.forEach((item, idx) => {
+            const card = createReportCard(item);
+            if (showSkeletons) card.style.transitionDelay = `${Math.min(idx * 20, 200)}ms`;
+            reportsGrid.appendChild(card);
+        });
+        if (data.facets) updateTypeFacetCounts(data.facets.type || []);
+        hasMore = data.has_more;
+        nextOffset = data.next_offset;
+        if (!hasMore) endMarker.style.display = 'block';
+    } catch (e) {
+        console.error(e);
+    } finally {
+        loader.style.display = 'none';
+        loading = false;
+    }
+}
+
+// IntersectionObserver ile sonsuz kaydırma
+const sentinel = document.createElement('div');
+sentinel.id = 'sentinel';
+reportsGrid.after(sentinel);
+const io = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) loadReports();
+    });
+}, { rootMargin: '600px 0px' });
+io.observe(sentinel);
+
+document.addEventListener('DOMContentLoaded', () => {
+    // bind filters
+    const nameEl = document.getElementById('filterName');
+    const typeEl = document.getElementById('filterType');
+    const dateEl = document.getElementById('filterDate');
+    const applyBtn = document.getElementById('filterApply');
+    const clearBtn = document.getElementById('filterClear');
+
+    function resetAndReload() {
+        // reset list
+        reportsGrid.innerHTML = '';
+        nextOffset = 0;
+        hasMore = true;
+        endMarker.style.display = 'none';
+        loadReports();
+    }
+
+    applyBtn?.addEventListener('click', () => {
+        activeFilters = {
+            q: nameEl.value.trim(),
+            type: typeEl.value.trim(),
+            date_from: dateEl.value ? (dateEl.value + ' 00:00:00') : '',
+            date_to: dateEl.value ? (dateEl.value + ' 23:59:59') : ''
+        };
+        resetAndReload();
+    });
+    clearBtn?.addEventListener('click', () => {
+        nameEl.value = '';
+        typeEl.value = '';
+        dateEl.value = '';
+        activeFilters = { q: '', type: '', date_from: '', date_to: '' };
+        resetAndReload();
+    });
+
+    loadReports();
+    bindReportDetailModal();
+});
+
+// Rapor Detay Modal mantığı
+function bindReportDetailModal() {
+    const modal = document.getElementById('report-detail-modal');
+    const backdrop = document.getElementById('report-detail-backdrop');
+    const closeBtn = document.getElementById('reportDetailClose');
+    const okBtn = document.getElementById('reportDetailOk');
+    const close = () => {
+        modal.style.display = 'none';
+        backdrop.style.display = 'none';
+        document.body.classList.remove('report-detail-open');
+    };
+    closeBtn.addEventListener('click', close);
+    okBtn.addEventListener('click', close);
+    backdrop.addEventListener('click', close);
+    window.addEventListener('keydown', (e) => { if (e.key === 'Escape') close(); });
+}
+
+async function openReportDetail(data) {
+    if (data.reportId && !data.details) {
+        try {
+            const resp = await fetch(`/api/reports/${encodeURIComponent(data.reportId)}`);
+            const detail = await resp.json();
+            if (detail.success) {
+                data.details = detail.item.details || '';
+                data.witnesses = detail.item.witnesses || '';
+            }
+        } catch (e) {
+            console.error(e);
+        }
+    }
+    const modal = document.getElementById('report-detail-modal');
+    const backdrop = document.getElementById('report-detail-backdrop');
+    document.getElementById('detailType').textContent = data.type || '—';
+    document.getElementById('detailDate').textContent = formatDate(data.date);
+    document.getElementById('detailReporter').textContent = data.reporter || '—';
+
+    // Detay metnini formatla - departman ve türleri bold yap
+    const detailEl = document.getElementById('detailText');
+    if (data.details && data.details.trim().length > 0) {
+        // Detay metnini parse et ve formatla
+        const formattedDetails = formatReportDetails(data.details);
+        detailEl.innerHTML = formattedDetails;
+    } else {
+        detailEl.textContent = 'Bu rapora ait detay verilmemiş';
+    }
+
+    // Tanık bilgisini göster
+    const witnessesEl = document.getElementById('detailWitnesses');
+    if (data.witnesses && data.witnesses.trim().length > 0) {
+        witnessesEl.textContent = data.witnesses;
+    } else {
+        witnessesEl.textContent = 'Bu rapor için tanık girişi yapılmamış';
+    }
+
+    modal.style.display = 'block';
+    backdrop.style.display = 'block';
+    document.body.classList.add('report-detail-open');
+}
+
+// Detay metnini formatla - departman ve türleri bold yap (modal için)
+function formatReportDetails(details) {
+    if (!details) return '';
+
+    // Risk raporları için: "Departman: A | Risk Türleri: Elektrik kaçağı, Paslı keskin metaller | Detaylar: [detaylar]"
+    if (details.includes('Departman:') && details.includes('Risk Türleri:')) {
+        const parts = details.split(' | ');
+        let formatted = '';
+
+        parts.forEach((part, index) => {
+            if (part.startsWith('Departman:')) {
+                const dept = part.replace('Departman:', '').trim();
+                formatted += `<div class="detail-line"><strong>Departman:</strong> ${dept}</div>`;
+            } else if (part.startsWith('Risk Türleri:')) {
+                const types = part.replace('Risk Türleri:', '').trim();
+                formatted += `<div class="detail-line"><strong>Risk Türleri:</strong> ${types}</div>`;
+            } else if (part.startsWith('Detaylar:')) {
+                const detailText = part.replace('Detaylar:', '').trim();
+                formatted += `<div class="detail-line detail-text">${detailText}</div>`;
+            }
+        });
+
+        return formatted;
+    }
+
+    // Olay raporları için: "Departman: B | Olay Türleri: Kaza, Yangın | Yer: [yer] | Detaylar: [detaylar]"
+    if (details.includes('Departman:') && details.includes('Olay Türleri:')) {
+        const parts = details.split(' | ');
+        let formatted = '';
+
+        parts.forEach((part, index) => {
+            if (part.startsWith('Departman:')) {
+                const dept = part.replace('Departman:', '').trim();
+                formatted += `<div class="detail-line"><strong>Departman:</strong> ${dept}</div>`;
+            } else if (part.startsWith('Olay Türleri:')) {
+                const types = part.replace('Olay Türleri:', '').trim();
+                formatted += `<div class="detail-line"><strong>Olay Türleri:</strong> ${types}</div>`;
+            } else if (part.startsWith('Yer:')) {
+                const location = part.replace('Yer:', '').trim();
+                formatted += `<div class="detail-line"><strong>Yer:</strong> ${location}</div>`;
+            } else if (part.startsWith('Detaylar:')) {
+                const detailText = part.replace('Detaylar:', '').trim();
+                formatted += `<div class="detail-line detail-text">${detailText}</div>`;
+            }
+        });
+
+        return formatted;
+    }
+
+    // Diğer rapor türleri için basit format
+    return `<div class="detail-line">${details}</div>`;
+}
+
+// Detay metnini formatla - kartlar için kısa format
+function formatReportCardDetails(details) {
+    if (!details) return '';
+
+    // Risk raporları için: "Departman: A | Risk Türleri: Elektrik kaçağı, Paslı keskin metaller | Detaylar: [detaylar]"
+    if (details.includes('Departman:') && details.includes('Risk Türleri:')) {
+        const parts = details.split(' | ');
+        let formatted = '';
+
+        parts.forEach((part, index) => {
+            if (part.startsWith('Departman:')) {
+                const dept = part.replace('Departman:', '').trim();
+                formatted += `<span class="card-detail-item"><strong>Departman:</strong> ${dept}</span>`;
+            } else if (part.startsWith('Risk Türleri:')) {
+                const types = part.replace('Risk Türleri:', '').trim();
+                formatted += `<span class="card-detail-item"><strong>Risk Türleri:</strong> ${types}</span>`;
+            }
+        });
+
+        return formatted;
+    }
+
+    // Olay raporları için: "Departman: B | Olay Türleri: Kaza, Yangın | Yer: [yer] | Detaylar: [detaylar]"
+    if (details.includes('Departman:') && details.includes('Olay Türleri:')) {
+        const parts = details.split(' | ');
+        let formatted = '';
+
+        parts.forEach((part, index) => {
+            if (part.startsWith('Departman:')) {
+                const dept = part.replace('Departman:', '').trim();
+                formatted += `<span class="card-detail-item"><strong>Departman:</strong> ${dept}</span>`;
+            } else if (part.startsWith('Olay Türleri:')) {
+                const types = part.replace('Olay Türleri:', '').trim();
+                formatted += `<span class="card-detail-item"><strong>Olay Türleri:</strong> ${types}</span>`;
+            } else if (part.startsWith('Yer:')) {
+                const location = part.replace('Yer:', '').trim();
+                formatted += `<span class="card-detail-item"><strong>Yer:</strong> ${location}</span>`;
+            }
+        });
+
+        return formatted;
+    }
+
+    // Diğer rapor türleri için basit format
+    return `<span class="card-detail-item">${details}</span>`;
+}
+
+// Admin bildirim sistemi
+let notificationCheckInterval;
+let lastCheckTime = new Date();
+
+function closeNotification() {
+    const container = document.getElementById('notification-container');
+    container.style.display = 'none';
+}
+
+function viewReport() {
+    window.location.href = REPORTS_URL;
+}
+
+function checkNewReports() {
+    fetch('/check-new-reports')
+        .then(response => response.json())
+        .then(data => {
+            if (data.success && data.count > 0) {
+                const latestReport = data.new_reports[0];
+                showNotification(latestReport);
+            }
+        })
+        .catch(error => {
+            console.error('Rapor kontrolü hatası:', error);
+        });
+}
+
+function showNotification(report) {
+    document.getElementById('report-type').textContent = report.type;
+    document.getElementById('reporter-name').textContent = report.reporter_name;
+    document.getElementById('report-date').textContent = new Date(report.date).toLocaleString('tr-TR');
+    const container = document.getElementById('notification-container');
+    container.style.display = 'flex';
+    playNotificationSound();
+}
+
+function playNotificationSound() {
+    try {
+        const audio = new Audio('data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTYIG2m98OScTgwOUarm7blmGgU7k9n1unEiBC13yO/eizEIHWq+8+OWT');
+        audio.play();
+    } catch (e) {
+        console.log('Ses çalınamadı:', e);
+    }
+}
+
+function initAdminNotifications() {
+    notificationCheckInterval = setInterval(checkNewReports, 10000);
+    checkNewReports();
+}
+
+function debugReports() {
+    fetch('/debug-reports')
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                console.log('=== DEBUG RAPORLARI ===');
+                console.log('Mevcut Zaman:', data.current_time);
+                console.log('Toplam Rapor:', data.total_reports);
+                console.log('Yeni Rapor Sayısı:', data.new_reports_count);
+                console.log('Tüm Raporlar:', data.all_reports);
+                console.log('Yeni Raporlar:', data.new_reports);
+                alert(`Debug Bilgileri:\nToplam Rapor: ${data.total_reports}\nYeni Rapor: ${data.new_reports_count}\nDetaylar için konsolu kontrol edin.`);
+            } else {
+                alert('Debug hatası: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Debug hatası:', error);
+            alert('Debug hatası: ' + error.message);
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    if (IS_AUTH) {
+        fetch('/check-admin-status')
+            .then(response => response.json())
+            .then(data => {
+                if (data.is_admin) {
+                    initAdminNotifications();
+                }
+            })
+            .catch(error => {
+                console.error('Admin kontrolü hatası:', error);
+            });
+    }
+});
+
+window.addEventListener('beforeunload', function() {
+    if (notificationCheckInterval) {
+        clearInterval(notificationCheckInterval);
+    }
+});
@@ -0,0 +1,564 @@
+// static/js/riskreport.js — riskreport.html sayfa scripti
+// Şablondan gelen değerler <body data-*> üzerinden okunur (JS içinde template sözdizimi yok)
+const PAGE_CONFIG = document.body.dataset;
+
+// Shared UI
+SharedUI.initNavbarUI();
+
+// Smooth scroll için
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+    anchor.addEventListener('click', function (e) {
+        e.preventDefault();
+        const target = document.querySelector(this.getAttribute('href'));
+        if (target) {
+            target.scrollIntoView({
+                behavior: 'smooth',
+                block: 'start'
+            });
+        }
+    });
+});
+
+// Profile buton tıklama işlemi
+function handleProfileClick() { SharedUI.initProfileButton(); }
+
+// Risk formu etkileşimleri
+(function initRiskForm() {
+    const form = document.getElementById('riskReportForm');
+    if (!form) return;
+
+    // Çoklu seçim için checkbox davranışı (tüm seçenekler seçilebilir)
+    // Artık tek seçimli davranış yok, kullanıcı istediği kadar seçebilir
+
+    // Tanık autocomplete özelliği
+    initWitnessesAutocomplete();
+
+    // Görsel yükleme
+    const addBtn = document.getElementById('addImageBtn');
+    const fileInput = document.getElementById('imageInput');
+    const grid = document.getElementById('imageGrid');
+    const MAX_FILES = 5;
+    let files = [];
+
+    function refreshGrid() {
+        grid.innerHTML = '';
+        files.forEach((file, index) => {
+            const url = URL.createObjectURL(file);
+            const item = document.createElement('div');
+            item.className = 'image-item';
+            const img = document.createElement('img');
+            img.src = url;
+            img.alt = 'Yüklenen görsel ' + (index + 1);
+            const removeBtn = document.createElement('button');
+            removeBtn.className = 'remove-image-btn';
+            removeBtn.type = 'button';
+            removeBtn.textContent = '×';
+            removeBtn.setAttribute('aria-label', 'Görseli kaldır');
+            removeBtn.addEventListener('click', () => {
+                URL.revokeObjectURL(url);
+                files.splice(index, 1);
+                refreshGrid();
+            });
+            item.appendChild(img);
+            item.appendChild(removeBtn);
+            grid.appendChild(item);
+        });
+        addBtn.disabled = files.length >= MAX_FILES;
+    }
+
+    addBtn.addEventListener('click', () => {
+        fileInput.value = '';
+        fileInput.click();
+    });
+
+    fileInput.addEventListener('change', (e) => {
+        const selected = Array.from(e.target.files || []);
+        for (const f of selected) {
+            if (files.length >= MAX_FILES) break;
+            if (/^image\//.test(f.type)) {
+                files.push(f);
+            }
+        }
+        refreshGrid();
+    });
+
+    form.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        const department = form.querySelector('input[name="department"]:checked');
+        const riskTypes = form.querySelectorAll('input[name="risk_type"]:checked');
+        const details = document.getElementById('details').value.trim();
+
+        if (!department) {
+            alert('Lütfen bir departman seçin.');
+            return;
+        }
+        if (riskTypes.length === 0) {
+            alert('Lütfen en az bir risk türü seçin.');
+            return;
+        }
+        if (details.length < 5) {
+            alert('Lütfen risk detaylarını daha açıklayıcı yazın.');
+            return;
+        }
+
+        const fd = new FormData();
+        fd.append('department', department.value);
+        // Birden fazla risk türü seçilebilir
+        riskTypes.forEach(riskType => {
+            fd.append('risk_type[]', riskType.value);
+        });
+        fd.append('details', details);
+        //22.01.2026
+        const witnesses = document.getElementById('witnesses').value.trim();
+        fd.append('witnesses', witnesses);
+        witnessIdsFor(witnesses).forEach((id) => fd.append('witness_ids[]', id));
+        files.forEach((file) => fd.append('images[]', file));
+
+        try {
+            const resp = await fetch('/submit-risk-report', {
+                method: 'POST',
+                body: fd
+            });
+            if (resp.status === 401) {
+                alert('Rapor göndermek için lütfen giriş yapın.');
+                window.location.href = PAGE_CONFIG.loginUrl;
+                return;
+            }
+            const data = await resp.json();
+            if (data.success) {
+                alert('Raporunuz başarıyla gönderildi. Teşekkürler.');
+                form.reset();
+                files = [];
+                refreshGrid();
+            } else {
+                alert('Hata: ' + (data.message || 'Rapor gönderilemedi'));
+            }
+        } catch (err) {
+            alert('Ağ hatası: ' + err.message);
+        }
+    });
+
+    refreshGrid();
+
+    // Kategorileri yükle
+    let allRiskTypes = [];
+    let currentRiskPage = 0;
+    const RISK_PAGE_SIZE = 4;
+
+    function renderRiskPage() {
+        const container = document.getElementById('riskCategoriesGroup');
+        container.style.opacity = '0';
+        container.style.transform = 'translateY(6px)';
+        setTimeout(() => {
+            container.innerHTML = '';
+        const start = currentRiskPage * RISK_PAGE_SIZE;
+        const pageItems = allRiskTypes.slice(start, start + RISK_PAGE_SIZE);
+        pageItems.forEach((name) => {
+            const label = document.createElement('label');
+            label.className = 'chip-checkbox';
+            const input = document.createElement('input');
+            input.type = 'checkbox';
+            input.name = 'risk_type';
+            input.value = name;
+            const span = document.createElement('span');
+            span.textContent = name;
+            label.appendChild(input);
+            label.appendChild(span);
+            container.appendChild(label);
+        });
+            // Admin inline add button at end of each page
+            const IS_ADMIN = PAGE_CONFIG.isAdmin === '1';
+            if (IS_ADMIN) {
+                const actionsWrap = document.createElement('div');
+                actionsWrap.style.display = 'inline-flex';
+                actionsWrap.style.gap = '8px';
+
+                const addBtn = document.createElement('button');
+                addBtn.type = 'button';
+                addBtn.className = 'add-category-btn';
+                addBtn.title = 'Yeni risk türü ekle';
+                addBtn.setAttribute('aria-label', 'Yeni risk türü ekle');
+                const img = document.createElement('img');
+                img.src = PAGE_CONFIG.addIconUrl;
+                img.alt = 'Ekle';
+                addBtn.appendChild(img);
+                addBtn.addEventListener('click', () => openRiskAddModal());
+                actionsWrap.appendChild(addBtn);
+
+                const delBtn = document.createElement('button');
+                delBtn.type = 'button';
+                delBtn.className = 'add-category-btn';
+                delBtn.title = 'Seçili risk tür(ler)ini sil';
+                delBtn.setAttribute('aria-label', 'Seçili risk tür(ler)ini sil');
+                const delImg = document.createElement('img');
+                delImg.src = PAGE_CONFIG.deleteIconUrl;
+                delImg.alt = 'Sil';
+                delBtn.appendChild(delImg);
+                delBtn.addEventListener('click', async () => {
+                    const checked = Array.from(container.querySelectorAll('input[name="risk_type"]:checked')).map(i => i.value);
+                    if (checked.length === 0) { alert('Silmek için en az bir risk türü seçin.'); return; }
+                    if (!confirm('Seçili risk tür(ler)ini silmek istediğinize emin misiniz?')) return;
+                    try {
+                        const resp = await fetch('/api/categories/bulk-delete', {
+                            method: 'POST', headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({ type: 'risk', names: checked })
+                        });
+                        const data = await resp.json();
+                        if (data.success) { await loadRiskCategories(); }
+                        else { alert('Hata: ' + (data.message || 'Silinemedi')); }
+                    } catch (e) { alert('Ağ hatası: ' + e.message); }
+                });
+                actionsWrap.appendChild(delBtn);
+
+                container.appendChild(actionsWrap);
+            }
+            const prevBtn = document.getElementById('riskPrevBtn');
+            const nextBtn = document.getElementById('riskNextBtn');
+            const totalPages = Math.ceil(allRiskTypes.length / RISK_PAGE_SIZE) || 1;
+            prevBtn.disabled = currentRiskPage <= 0;
+            nextBtn.disabled = currentRiskPage >= totalPages - 1;
+            // fade in
+            requestAnimationFrame(() => {
+                container.style.opacity = '1';
+                container.style.transform = 'translateY(0)';
+            });
+        }, 100);
+    }
+
+    async function loadRiskCategories() {
+        try {
+            const resp = await fetch('/api/categories?type=risk');
+            const data = await resp.json();
+            if (!data.success) return;
+            allRiskTypes = data.items || [];
+            currentRiskPage = 0;
+            renderRiskPage();
+        } catch (e) { /* sessiz */ }
+    }
+    loadRiskCategories();
+    // Modal helpers (admin)
+    function openRiskAddModal() {
+        const overlay = document.getElementById('riskAddModalOverlay');
+        const modal = document.getElementById('riskAddModal');
+        overlay.style.display = 'flex';
+        requestAnimationFrame(() => modal.classList.add('open'));
+        const input = document.getElementById('riskAddInput');
+        input.value = '';
+        setTimeout(() => input.focus(), 50);
+    }
+    function closeRiskAddModal() {
+        const overlay = document.getElementById('riskAddModalOverlay');
+        const modal = document.getElementById('riskAddModal');
+        modal.classList.remove('open');
+        setTimeout(() => overlay.style.display = 'none', 150);
+    }
+    const riskAddSave = document.getElementById('riskAddSave');
+    const riskAddCancel = document.getElementById('riskAddCancel');
+    const riskAddClose = document.getElementById('riskAddModalClose');
+    if (riskAddSave) {
+        riskAddSave.addEventListener('click', async () => {
+            const name = document.getElementById('riskAddInput').value.trim();
+            if (!name) return;
+            try {
+                const resp = await fetch('/api/categories', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ type: 'risk', name })
+                });
+                const data = await resp.json();
+                if (data.success) {
+                    closeRiskAddModal();
+                    await loadRiskCategories();
+                } else {
+                    alert('Hata: ' + (data.message || 'Eklenemedi'));
+                }
+            } catch (err) { alert('Ağ hatası: ' + err.message); }
+        });
+    }
+    if (riskAddCancel) riskAddCancel.addEventListener('click', closeRiskAddModal);
+    if (riskAddClose) riskAddClose.addEventListener('click', closeRiskAddModal);
+
+    // Sayfalama butonları
+    const prevBtn = document.getElementById('riskPrevBtn');
+    const nextBtn = document.getElementById('riskNextBtn');
+    if (prevBtn && nextBtn) {
+        prevBtn.addEventListener('click', () => {
+            if (currentRiskPage > 0) {
+                currentRiskPage -= 1;
+                renderRiskPage();
+            }
+        });
+        nextBtn.addEventListener('click', () => {
+            const totalPages = Math.ceil(allRiskTypes.length / RISK_PAGE_SIZE) || 1;
+            if (currentRiskPage < totalPages - 1) {
+                currentRiskPage += 1;
+                renderRiskPage();
+            }
+        });
+    }
+})();
+
+// Admin bildirim sistemi
+let notificationCheckInterval;
+let lastCheckTime = new Date();
+
+function closeNotification() {
+    const container = document.getElementById('notification-container');
+    container.style.display = 'none';
+}
+
+function viewReport() {
+    window.location.href = PAGE_CONFIG.reportsUrl;
+}
+
+function checkNewReports() {
+    fetch('/check-new-reports')
+        .then(response => response.json())
+        .then(data => {
+            if (data.success && data.count > 0) {
+                const latestReport = data.new_reports[0];
+                showNotification(latestReport);
+            }
+        })
+        .catch(error => {
+            console.error('Rapor kontrolü hatası:', error);
+        });
+}
+
+function showNotification(report) {
+    document.getElementById('report-type').textContent = report.type;
+    document.getElementById('reporter-name').textContent = report.reporter_name;
+    document.getElementById('report-date').textContent = new Date(report.date).toLocaleString('tr-TR');
+    const container = document.getElementById('notification-container');
+    container.style.display = 'flex';
+    playNotificationSound();
+}
+
+function playNotificationSound() {
+    try {
+        const audio = new Audio('data:audio/wav;base64,UklGRnoGAABXQVZFZm10IBAAAAABAAEAQB8AAEAfAAABAAgAZGF0YQoGAACBhYqFbF1fdJivrJBhNjVgodDbq2EcBj+a2/LDciUFLIHO8tiJNwgZaLvt559NEAxQp+PwtmMcBjiR1/LMeSwFJHfH8N2QQAoUXrTp66hVFApGn+DyvmwhBSuBzvLZiTYIG2m98OScTgwOUarm7blmGgU7k9n1unEiBC13yO/eizEIHWq+8+OWT');
+        audio.play();
+    } catch (e) {
+        console.log('Ses çalınamadı:', e);
+    }
+}
+
+function initAdminNotifications() {
+    notificationCheckInterval = setInterval(checkNewReports, 10000);
+    checkNewReports();
+}
+
+function debugReports() {
+    fetch('/debug-reports')
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                console.log('=== DEBUG RAPORLARI ===');
+                console.log('Mevcut Zaman:', data.current_time);
+                console.log('Toplam Rapor:', data.total_reports);
+                console.log('Yeni Rapor Sayısı:', data.new_reports_count);
+                console.log('Tüm Raporlar:', data.all_reports);
+                console.log('Yeni Raporlar:', data.new_reports);
+                alert(`Debug Bilgileri:\nToplam Rapor: ${data.total_reports}\nYeni Rapor: ${data.new_reports_count}\nDetaylar için konsolu kontrol edin.`);
+            } else {
+                alert('Debug hatası: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Debug hatası:', error);
+            alert('Debug hatası: ' + error.message);
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const body = document.body;
+    const loggedIn = body.dataset.loggedIn === '1';
+    if (loggedIn) {
+        fetch('/check-admin-status')
+            .then(response => response.json())
+            .then(data => {
+                if (data.is_admin) {
+                    initAdminNotifications();
+                }
+            })
+            .catch(error => {
+                console.error('Admin kontrolü hatası:', error);
+            });
+    }
+});
+
+window.addEventListener('beforeunload', function() {
+    if (notificationCheckInterval) {
+        clearInterval(notificationCheckInterval);
+    }
+});
+
+// Öneriden seçilen tanıklar: isim -> kullanıcı id
+const selectedWitnessIds = new Map();
+
+// Metinde hâlâ duran (silinmemiş) seçili tanıkların id'leri
+function witnessIdsFor(text) {
+    return text.split(',')
+        .map((name) => name.trim())
+        .filter((name) => selectedWitnessIds.has(name))
+        .map((name) => selectedWitnessIds.get(name));
+}
+
+// Tanık autocomplete fonksiyonu
+function initWitnessesAutocomplete() {
+    const witnessesInput = document.getElementById('witnesses');
+    const suggestionsContainer = document.getElementById('witnesses-suggestions');
+    let currentSuggestions = [];
+    let selectedIndex = -1;
+    let searchTimeout;
+
+    // Input'a yazıldığında
+    witnessesInput.addEventListener('input', function(e) {
+        const query = e.target.value.trim();
+
+        // Önceki timeout'u temizle
+        clearTimeout(searchTimeout);
+
+        if (query.length < 2) {
+            hideSuggestions();
+            return;
+        }
+
+        // 300ms gecikme ile arama yap (her tuş vuruşunda değil)
+        searchTimeout = setTimeout(() => {
+            searchUsers(query);
+        }, 300);
+    });
+
+    // Klavye navigasyonu
+    witnessesInput.addEventListener('keydown', function(e) {
+        if (suggestionsContainer.style.display === 'none') return;
+
+        switch (e.key) {
+            case 'ArrowDown':
+                e.preventDefault();
+                selectNext();
+                break;
+            case 'ArrowUp':
+                e.preventDefault();
+                selectPrevious();
+                break;
+            case 'Enter':
+                e.preventDefault();
+                selectCurrent();
+                break;
+            case 'Escape':
+                hideSuggestions();
+                break;
+        }
+    });
+
+    // Input'tan çıkıldığında
+    witnessesInput.addEventListener('blur', function() {
+        // Mouse ile tıklama için biraz gecikme
+        setTimeout(() => {
+            if (!suggestionsContainer.matches(':hover')) {
+                hideSuggestions();
+            }
+        }, 150);
+    });
+
+    // Kullanıcı arama fonksiyonu
+    async function searchUsers(query) {
+        try {
+            const response = await fetch(`/api/users/search?q=${encodeURIComponent(query)}`);
+            const data = await response.json();
+
+            if (data.success) {
+                currentSuggestions = data.users;
+                showSuggestions();
+            }
+        } catch (error) {
+            console.error('Kullanıcı arama hatası:', error);
+        }
+    }
+
+    // Önerileri göster
+    function showSuggestions() {
+        if (currentSuggestions.length === 0) {
+            hideSuggestions();
+            return;
+        }
+
+        suggestionsContainer.innerHTML = '';
+        selectedIndex = -1;
+
+        currentSuggestions.forEach((user, index) => {
+            const suggestionItem = document.createElement('div');
+            suggestionItem.className = 'suggestion-item';
+            suggestionItem.textContent = user.fullname;
+            suggestionItem.dataset.fullname = user.fullname;
+
+            suggestionItem.addEventListener('click', function() {
+                selectSuggestion(user);
+            });
+
+            suggestionItem.addEventListener('mouseenter', function() {
+                selectedIndex = index;
+                updateSelection();
+            });
+
+            suggestionsContainer.appendChild(suggestionItem);
+        });
+
+        suggestionsContainer.style.display = 'block';
+    }
+
+    // Önerileri gizle
+    function hideSuggestions() {
+        suggestionsContainer.style.display = 'none';
+        currentSuggestions = [];
+        selectedIndex = -1;
+    }
+
+    // Sonraki öneriyi seç
+    function selectNext() {
+        if (selectedIndex < currentSuggestions.length - 1) {
+            selectedIndex++;
+        } else {
+            selectedIndex = 0;
+        }
+        updateSelection();
+    }
+
+    // Önceki öneriyi seç
+    function selectPrevious() {
+        if (selectedIndex > 0) {
+            selectedIndex--;
+        } else {
+            selectedIndex = currentSuggestions.length - 1;
+        }
+        updateSelection();
+    }
+
+    // Seçimi güncelle
+    function updateSelection() {
+        const items = suggestionsContainer.querySelectorAll('.suggestion-item');
+        items.forEach((item, index) => {
+            item.classList.toggle('selected', index === selectedIndex);
+        });
+    }
+
+    // Mevcut seçimi uygula
+    function selectCurrent() {
+        if (selectedIndex >= 0 && selectedIndex < currentSuggestions.length) {
+            const selectedUser = currentSuggestions[selectedIndex];
+            selectSuggestion(selectedUser);
+        }
+    }
+
+    // Öneriyi seç
+    function selectSuggestion(user) {
+        const fullname = user.fullname;
+        // Seçilen kullanıcının id'si gönderilir; sunucu ismi tekrar çözmek zorunda kalmaz
+        selectedWitnessIds.set(fullname, user.id);
+        witnessesInput.value = fullname;
+        hideSuggestions();
+        witnessesInput.focus();
+    }
+}
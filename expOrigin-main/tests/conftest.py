@@ -0,0 +1,53 @@
+# tests/conftest.py
+"""
+Birim testleri: app.py Postgres olmadan yüklenir. DATABASE_URL erişilemeyen bir
+adrese işaret eder (engine tembel bağlanır), ısınma ve zamanlayıcı kapalıdır.
+Burada yalnızca DB'ye dokunmayan parçalar test edilir; sorgu planları ve uçtan
+uca ölçümler için bench/ altındaki scriptlere bakın.
+
+    python -m pytest expOrigin-main/tests
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("app")
+    env = {
+        "DATABASE_URL": "postgresql://test@127.0.0.1:1/test?sslmode=disable",
+        "APP_WARMUP": "0",
+        "SCHEDULER_ENABLED": "0",
+        "METRICS_MULTIPROC_DIR": "",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "DEGRADED_DATA_DIR": str(workdir / "degraded"),
+        "JINJA_CACHE_DIR": str(workdir / "jinja"),
+    }
+    patch = pytest.MonkeyPatch()
+    for key, value in env.items():
+        patch.setenv(key, value)
+
+    spec = importlib.util.spec_from_file_location("exp_test_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    module.app.config["TESTING"] = True
+    yield module
+    sys.modules.pop(spec.name, None)
+    patch.undo()
+
+
+@pytest.fixture
+def clock(app_module, monkeypatch):
+    """time.monotonic'i elle ilerletilen bir saatle değiştirir: clock.now += 5."""
+    class Clock:
+        now = 1000.0
+
+    monkeypatch.setattr(app_module.time, "monotonic", lambda: Clock.now)
+    return Clock
@@ -0,0 +1,42 @@
+from flask import Response
+
+
+def test_asset_url_uses_manifest(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ASSET_MANIFEST", {"css/style.css": "dist/css/style.1a2b3c4d.css"})
+    with app_module.app.test_request_context("/"):
+        assert app_module.asset_url("css/style.css") == "/static/dist/css/style.1a2b3c4d.css"
+        # Manifest'te olmayan dosya olduğu gibi servis edilir
+        assert app_module.asset_url("img/logo.png") == "/static/img/logo.png"
+
+
+def test_asset_url_without_manifest(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ASSET_MANIFEST", {})
+    with app_module.app.test_request_context("/"):
+        assert app_module.asset_url("css/style.css") == "/static/css/style.css"
+
+
+def test_load_manifest(app_module, monkeypatch, tmp_path):
+    path = tmp_path / "manifest.json"
+    monkeypatch.setattr(app_module, "ASSET_MANIFEST_PATH", str(path))
+    assert app_module._load_asset_manifest() == {}
+
+    path.write_text("{bozuk", encoding="utf-8")
+    assert app_module._load_asset_manifest() == {}
+
+    path.write_text('{"a.js": "dist/a.0f0f0f0f.js"}', encoding="utf-8")
+    assert app_module._load_asset_manifest() == {"a.js": "dist/a.0f0f0f0f.js"}
+
+
+def test_dist_assets_are_immutable(app_module):
+    with app_module.app.test_request_context("/static/dist/a.0f0f0f0f.js"):
+        response = app_module._immutable_asset_headers(Response("x"))
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == app_module.ASSET_MAX_AGE_SECONDS
+
+
+def test_other_paths_are_not_immutable(app_module):
+    for path, status in (("/static/a.js", 200), ("/static/dist/missing.js", 404)):
+        with app_module.app.test_request_context(path):
+            response = app_module._immutable_asset_headers(Response("x", status=status))
+        assert not response.cache_control.immutable
@@ -0,0 +1,96 @@
+import pytest
+
+
+@pytest.fixture
+def breaker(app_module, clock):
+    return app_module.CircuitBreaker("test", failure_threshold=3, reset_seconds=10)
+
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.is_open
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    # Deneme takılırsa reset süresi sonra bir sonrakine izin verilir
+    clock.now += 10
+    assert breaker.allow()
+
+
+def test_probe_success_closes_and_runs_callbacks(breaker, clock):
+    closed = []
+    breaker.on_close(lambda: closed.append(True))
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert closed == [True]
+    # Zaten kapalıyken başarı callback'i tekrar çalıştırmaz
+    breaker.record_success()
+    assert closed == [True]
+
+
+def test_probe_failure_reopens(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 5
+    assert not breaker.allow()
+
+
+def test_failing_callback_does_not_break_close(breaker, clock):
+    breaker.on_close(lambda: 1 / 0)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_state_gauge(app_module, breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    assert app_module.metrics._values[("db_circuit_state", (("db", "test"),))] == 2.0
+
+
+def test_threshold_is_at_least_one(app_module):
+    assert app_module.CircuitBreaker("x", failure_threshold=0, reset_seconds=1).failure_threshold == 1
+
+
+def test_pool_rejects_without_waiting_when_open(app_module, breaker):
+    created = []
+    pool = app_module.TimedQueuePool(lambda: created.append(1), pool_size=1, max_overflow=0)
+    pool.breaker = breaker
+    for _ in range(3):
+        breaker.record_failure()
+    with pytest.raises(app_module.DatabaseUnavailable):
+        pool.connect()
+    assert created == []
+    assert pool.recreate().breaker is breaker
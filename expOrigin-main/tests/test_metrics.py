@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def registry(app_module, tmp_path):
+    def make(multiproc_dir=""):
+        reg = app_module.MetricsRegistry(multiproc_dir)
+        reg.describe("requests_total", "counter", "istekler")
+        reg.describe("up", "gauge", "ayakta mı")
+        reg.describe("latency_seconds", "histogram", "gecikme", (0.1, 1.0))
+        return reg
+    return make
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_render_counter_gauge_histogram(registry):
+    reg = registry()
+    reg.inc("requests_total", (("route", "/a"),))
+    reg.inc("requests_total", (("route", "/a"),), 2)
+    reg.set("up", 1)
+    reg.observe("latency_seconds", 0.05)
+    reg.observe("latency_seconds", 0.5)
+    reg.observe("latency_seconds", 5)
+
+    lines = reg.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3.0' in lines
+    assert "up 1.0" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_label_values_are_escaped(registry):
+    reg = registry()
+    reg.inc("requests_total", (("route", 'a"b\\c\nd'),))
+    assert 'requests_total{route="a\\"b\\\\c d"} 1.0' in reg.render()
+
+
+def test_multiprocess_merges_live_and_dead_workers(registry, tmp_path):
+    shared = str(tmp_path)
+    dead = registry(shared)
+    dead.inc("requests_total", (("route", "/a"),), 5)
+    dead.set("up", 1)
+    dead.observe("latency_seconds", 0.05)
+    dead_pid = _dead_pid()
+    with open(os.path.join(shared, f"metrics_{dead_pid}.json"), "w", encoding="utf-8") as fh:
+        json.dump(dead._encode(*dead._local_state()), fh)
+
+    live = registry(shared)
+    live.inc("requests_total", (("route", "/a"),), 2)
+    live.set("up", 1)
+    live.observe("latency_seconds", 0.5)
+
+    lines = live.render().splitlines()
+    assert 'requests_total{route="/a"} 7.0' in lines
+    assert 'latency_seconds_count 2' in lines
+    # Gauge yalnızca yaşayan process'ten, pid etiketiyle
+    assert [line for line in lines if line.startswith("up")] == [f'up{{pid="{os.getpid()}"}} 1.0']
+
+    # Ölü worker'ın dosyası katlandı; sayaçlar ikinci okumada da korunur
+    assert not os.path.exists(os.path.join(shared, f"metrics_{dead_pid}.json"))
+    assert os.path.exists(os.path.join(shared, live.DEAD_FILE))
+    assert 'requests_total{route="/a"} 7.0' in live.render().splitlines()
+
+
+def test_multiprocess_skips_corrupt_file(registry, tmp_path):
+    shared = str(tmp_path)
+    with open(os.path.join(shared, f"metrics_{_dead_pid()}.json"), "w", encoding="utf-8") as fh:
+        fh.write("{bozuk")
+    reg = registry(shared)
+    reg.inc("requests_total")
+    assert "requests_total 1.0" in reg.render().splitlines()
+
+
+def test_normalize_sql_strips_literals(app_module):
+    sql = "SELECT *  FROM reports\n WHERE id = 42 AND type = 'Yangın'"
+    assert app_module.normalize_sql(sql) == "SELECT * FROM reports WHERE id = ? AND type = ?"
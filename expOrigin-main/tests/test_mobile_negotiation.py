@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+
+
+def _wants(app_module, accept):
+    with app_module.app.test_request_context("/api/mobile/reports", headers={"Accept": accept} if accept else {}):
+        return app_module.wants_msgpack()
+
+
+@pytest.fixture
+def msgpack_available(app_module, monkeypatch):
+    # Müzakere yalnızca modülün varlığına bakar; paketleme testleri gerçek msgpack ister
+    if app_module.msgpack is None:
+        monkeypatch.setattr(app_module, "msgpack", object())
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/json", False),
+    ("application/json, application/msgpack;q=0.5", False),
+    ("application/msgpack, application/json;q=0.5", True),
+    ("*/*", False),
+    (None, False),
+])
+def test_accept_negotiation(app_module, msgpack_available, accept, expected):
+    assert _wants(app_module, accept) is expected
+
+
+def test_falls_back_to_json_without_msgpack(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "msgpack", None)
+    assert _wants(app_module, "application/msgpack") is False
+
+
+def test_encode_value_dates(app_module):
+    naive = datetime(2026, 1, 2, 3, 4, 5)
+    payload = {"items": [{"date": naive}], "at": (naive,)}
+    assert app_module._encode_value(payload, binary=False) == {
+        "items": [{"date": "2026-01-02T03:04:05"}], "at": ["2026-01-02T03:04:05"],
+    }
+    ms = int(naive.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    assert app_module._encode_value(payload, binary=True) == {"items": [{"date": ms}], "at": [ms]}
+
+
+def test_dictionary_encode(app_module):
+    payload = {"items": [
+        {"type": "Yangın", "department": "A"},
+        {"type": "Kaza", "department": "A"},
+        {"type": "Yangın"},
+    ]}
+    app_module._dictionary_encode(payload, ["type", "department"])
+    assert payload["items"] == [
+        {"type": 0, "department": 0},
+        {"type": 1, "department": 0},
+        {"type": 0},
+    ]
+    assert payload["dictionary"] == {"type": ["Yangın", "Kaza"], "department": ["A"]}
+
+
+def test_json_response_with_dictionary_and_vary(app_module):
+    payload = {"success": True, "items": [{"type": "Kaza", "date": datetime(2026, 1, 1)}]}
+    with app_module.app.test_request_context("/?dict=type,%20password", headers={"Accept": "application/json"}):
+        response = app_module.mobile_response(payload, 201)
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert "Accept" in response.vary
+    assert response.get_json() == {
+        "success": True,
+        "items": [{"type": 0, "date": "2026-01-01T00:00:00"}],
+        "dictionary": {"type": ["Kaza"]},
+    }
+
+
+def test_msgpack_response_round_trip(app_module):
+    msgpack = pytest.importorskip("msgpack")
+    payload = {"success": True, "items": [{"date": datetime(2026, 1, 1, tzinfo=timezone.utc)}]}
+    with app_module.app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+        response = app_module.mobile_response(payload)
+    assert response.mimetype == "application/msgpack"
+    assert msgpack.unpackb(response.get_data(), raw=False) == {
+        "success": True, "items": [{"date": 1767225600000}],
+    }
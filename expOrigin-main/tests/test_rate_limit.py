@@ -0,0 +1,118 @@
+import pytest
+
+
+@pytest.fixture
+def limiter(app_module, clock, monkeypatch):
+    fresh = app_module.TokenBucketLimiter(evict_seconds=60, max_keys=100)
+    monkeypatch.setattr(app_module, "rate_limiter", fresh)
+    monkeypatch.setattr(app_module, "RATE_LIMIT_BACKEND", "memory")
+    return fresh
+
+
+def test_parse_rate(app_module):
+    assert app_module._parse_rate("10/60") == (10.0, 10.0 / 60)
+    assert app_module._parse_rate("5") == (5.0, 5.0 / 60)
+
+
+def test_burst_then_reject_with_retry_after(limiter, clock):
+    for _ in range(3):
+        assert limiter.take("k", 3, 1.0) == 0.0
+    assert limiter.take("k", 3, 1.0) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert limiter.take("k", 3, 1.0) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.take("k", 3, 1.0) == 0.0
+
+
+def test_refill_is_capped_at_capacity(limiter, clock):
+    limiter.take("k", 2, 1.0)
+    clock.now += 3600
+    assert limiter.take("k", 2, 1.0) == 0.0
+    assert limiter.take("k", 2, 1.0) == 0.0
+    assert limiter.take("k", 2, 1.0) > 0
+
+
+def test_keys_are_independent(limiter):
+    assert limiter.take("a", 1, 0.1) == 0.0
+    assert limiter.take("a", 1, 0.1) > 0
+    assert limiter.take("b", 1, 0.1) == 0.0
+
+
+def test_evicts_refilled_buckets(limiter, clock):
+    limiter.take("full-again", 1, 1.0)
+    limiter.take("still-empty", 1, 0.001)
+    clock.now += 61
+    limiter.take("other", 1, 1.0)
+    assert "full-again" not in limiter._buckets
+    assert "still-empty" in limiter._buckets
+
+
+def test_evicts_oldest_when_over_max_keys(app_module, clock):
+    limiter = app_module.TokenBucketLimiter(evict_seconds=3600, max_keys=4)
+    for i in range(4):
+        clock.now += 1
+        limiter.take(i, 1, 0.0001)
+    clock.now += 1
+    limiter.take("new", 1, 0.0001)
+    assert set(limiter._buckets) == {2, 3, "new"}
+
+
+def test_buckets_are_keyed_by_route(app_module, limiter):
+    capacity = int(app_module.RATE_LIMIT_POLICIES["auth"][0])
+    for _ in range(capacity):
+        assert app_module.take_rate_token("auth", "login", "ip", "1.2.3.4") == 0.0
+    assert app_module.take_rate_token("auth", "login", "ip", "1.2.3.4") > 0
+    assert app_module.take_rate_token("auth", "register", "ip", "1.2.3.4") == 0.0
+    assert app_module.take_rate_token("auth", "login", "ip", "5.6.7.8") == 0.0
+
+
+@pytest.mark.parametrize("proxies, header, expected", [
+    (1, "9.9.9.9", "9.9.9.9"),
+    (1, "6.6.6.6, 9.9.9.9", "9.9.9.9"),
+    (2, "6.6.6.6, 9.9.9.9, 10.0.0.1", "9.9.9.9"),
+    (2, "9.9.9.9", "127.0.0.1"),
+    (1, None, "127.0.0.1"),
+    (0, "9.9.9.9", "127.0.0.1"),
+])
+def test_client_ip_uses_trusted_proxy_depth(app_module, monkeypatch, proxies, header, expected):
+    monkeypatch.setattr(app_module, "TRUSTED_PROXY_COUNT", proxies)
+    headers = {"X-Forwarded-For": header} if header else {}
+    with app_module.app.test_request_context("/", headers=headers, environ_base={"REMOTE_ADDR": "127.0.0.1"}):
+        assert app_module.client_ip() == expected
+
+
+def _admit(app_module, path, headers=None, data=None):
+    with app_module.app.test_request_context(path, method="POST", headers=headers or {}, data=data):
+        return app_module._admission_control()
+
+
+def test_admission_control_rejects_with_429(app_module, limiter, monkeypatch):
+    monkeypatch.setattr(app_module, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(app_module, "RATE_LIMIT_POLICIES", {**app_module.RATE_LIMIT_POLICIES, "auth": (2.0, 0.01)})
+    headers = {"X-Forwarded-For": "9.9.9.9"}
+    assert _admit(app_module, "/login", headers) is None
+    assert _admit(app_module, "/login", headers) is None
+    response = _admit(app_module, "/login", headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Başka bir route ve başka bir istemci etkilenmez
+    assert _admit(app_module, "/register", headers) is None
+    assert _admit(app_module, "/login", {"X-Forwarded-For": "8.8.8.8"}) is None
+
+
+def test_admission_control_limits_user_across_ips(app_module, limiter, monkeypatch):
+    monkeypatch.setattr(app_module, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(app_module, "RATE_LIMIT_POLICIES", {**app_module.RATE_LIMIT_POLICIES, "auth": (2.0, 0.01)})
+    for ip in ("1.1.1.1", "2.2.2.2"):
+        assert _admit(app_module, "/login", {"X-Forwarded-For": ip}, {"email": "A@x.com"}) is None
+    response = _admit(app_module, "/login", {"X-Forwarded-For": "3.3.3.3"}, {"email": "a@x.com "})
+    assert response.status_code == 429
+
+
+def test_get_requests_are_not_limited(app_module, limiter, monkeypatch):
+    monkeypatch.setattr(app_module, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(app_module, "RATE_LIMIT_POLICIES", {**app_module.RATE_LIMIT_POLICIES, "auth": (1.0, 0.01)})
+    for _ in range(3):
+        with app_module.app.test_request_context("/login", method="GET"):
+            assert app_module._admission_control() is None
@@ -0,0 +1,48 @@
+import pytest
+
+
+def _fields(app_module, query, default=None):
+    default = default or app_module.REPORT_DEFAULT_FIELDS
+    with app_module.app.test_request_context("/api/reports" + query):
+        return app_module.parse_report_fields(default)
+
+
+def test_default_when_missing_or_empty(app_module):
+    assert _fields(app_module, "") == list(app_module.REPORT_DEFAULT_FIELDS)
+    assert _fields(app_module, "?fields=") == list(app_module.REPORT_DEFAULT_FIELDS)
+    assert _fields(app_module, "?fields=,%20,") == list(app_module.REPORT_DEFAULT_FIELDS)
+
+
+def test_keeps_order_and_drops_duplicates(app_module):
+    assert _fields(app_module, "?fields=type,%20report_id,type,,date") == ["type", "report_id", "date"]
+
+
+def test_unknown_field_is_rejected(app_module):
+    with pytest.raises(ValueError, match="password"):
+        _fields(app_module, "?fields=report_id,password")
+
+
+def test_mobile_default_has_no_fullname(app_module):
+    fields = _fields(app_module, "", app_module.MOBILE_REPORT_DEFAULT_FIELDS)
+    assert "fullname" not in fields
+    assert "reporter_name" in fields
+
+
+def test_report_columns_are_labelled_by_field_name(app_module):
+    columns = app_module.report_columns(["summary", "user_id", "reporter_name"])
+    assert [c.name for c in columns] == ["summary", "user_id", "reporter_name"]
+
+
+def test_every_default_field_is_selectable(app_module):
+    assert set(app_module.REPORT_DEFAULT_FIELDS) <= set(app_module.REPORT_FIELDS)
+
+
+def test_api_rejects_unknown_field_before_touching_db(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "_INIT_DONE", True)
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["is_admin"] = True
+    response = client.get("/api/reports?fields=report_id,nope")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
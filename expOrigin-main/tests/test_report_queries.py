@@ -0,0 +1,61 @@
+from sqlalchemy.dialects import postgresql
+
+
+def _sql(query):
+    return str(query.compile(dialect=postgresql.psycopg2.dialect()))
+
+
+def _cache_key(query):
+    return query._generate_cache_key().key
+
+
+def test_page_query_cache_key_ignores_values(app_module):
+    a = app_module.report_page_query(["report_id", "type"], {"q": "ali", "type": "Kaza"}, 10, 0)
+    b = app_module.report_page_query(["report_id", "type"], {"q": "veli", "type": "Yangın"}, 50, 100)
+    assert _cache_key(a) == _cache_key(b)
+
+
+def test_page_query_cache_key_follows_shape(app_module):
+    base = app_module.report_page_query(["report_id"], {"q": "ali"}, 10, 0)
+    assert _cache_key(base) != _cache_key(app_module.report_page_query(["report_id"], {"q": "ali", "type": "x"}, 10, 0))
+    assert _cache_key(base) != _cache_key(app_module.report_page_query(["report_id", "type"], {"q": "ali"}, 10, 0))
+
+
+def test_filters_are_bound_parameters(app_module):
+    sql = _sql(app_module.report_page_query(["report_id"], {"q": "'; DROP TABLE reports; --"}, 10, 0))
+    assert "DROP" not in sql
+    assert "lower(r.fullname) LIKE lower(%(param_1)s)" in sql
+    assert "LIMIT %(param_2)s OFFSET %(param_3)s" in sql
+
+
+def test_count_query_without_filters(app_module):
+    sql = _sql(app_module.report_count_query({}))
+    assert "count(*)" in sql
+    assert "WHERE" not in sql
+
+
+def test_feed_criteria_is_commit_ordered(app_module):
+    sql = _sql(app_module.report_feed_query(20, after=("1234", 7)))
+    assert "(r.created_xid, r.report_id) > (%(param_1)s, %(param_2)s)" in sql
+    # Henüz commit'i kesinleşmemiş transaction'ların raporları atlanır
+    assert "r.created_xid < pg_snapshot_xmin(pg_current_snapshot())" in sql
+    assert "ORDER BY r.created_xid, r.report_id" in sql
+
+
+def test_feed_without_cursor_returns_latest(app_module):
+    sql = _sql(app_module.report_feed_query(20))
+    assert "created_xid" not in sql
+    assert "ORDER BY r.report_id DESC" in sql
+
+
+def test_feed_cache_key_ignores_cursor(app_module):
+    a = app_module.report_feed_query(20, after=("1234", 7))
+    b = app_module.report_feed_query(5, after=("99999", 1))
+    assert _cache_key(a) == _cache_key(b)
+
+
+def test_analytics_batch_uses_feed_criteria(app_module):
+    sql = _sql(app_module.analytics_batch_query(("0", 0), 1000))
+    assert "pg_snapshot_xmin(pg_current_snapshot())" in sql
+    assert "CAST(r.created_xid AS TEXT) AS created_xid" in sql
+    assert "LEFT OUTER JOIN users AS u ON u.id = r.id" in sql
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+
+
+def _next(app_module, spec, after):
+    return app_module.Schedule(spec).next_after(after)
+
+
+def test_interval(app_module):
+    after = datetime(2026, 1, 1, 12, 0, 30)
+    assert _next(app_module, "@every 15m", after) == datetime(2026, 1, 1, 12, 15, 30)
+    assert _next(app_module, "@every 2h", after) == datetime(2026, 1, 1, 14, 0, 30)
+
+
+def test_cron_step_and_fixed_time(app_module):
+    after = datetime(2026, 1, 1, 12, 7, 10)
+    assert _next(app_module, "*/15 * * * *", after) == datetime(2026, 1, 1, 12, 15)
+    assert _next(app_module, "30 3 * * *", after) == datetime(2026, 1, 2, 3, 30)
+    # Tam tetikleme anında bir sonrakine geçer
+    assert _next(app_module, "30 3 * * *", datetime(2026, 1, 2, 3, 30)) == datetime(2026, 1, 3, 3, 30)
+
+
+def test_aliases(app_module):
+    after = datetime(2026, 1, 14, 10, 0)  # çarşamba
+    assert _next(app_module, "@hourly", after) == datetime(2026, 1, 14, 11, 0)
+    assert _next(app_module, "@daily", after) == datetime(2026, 1, 15, 0, 0)
+    assert _next(app_module, "@weekly", after) == datetime(2026, 1, 18, 0, 0)
+    assert _next(app_module, "@monthly", after) == datetime(2026, 2, 1, 0, 0)
+
+
+def test_month_rollover_and_ranges(app_module):
+    after = datetime(2026, 11, 30, 23, 59)
+    assert _next(app_module, "0 9 1-3 2 *", after) == datetime(2027, 2, 1, 9, 0)
+    assert _next(app_module, "0 0 31 * *", datetime(2026, 4, 1)) == datetime(2026, 5, 31)
+
+
+def test_sunday_is_zero_or_seven(app_module):
+    after = datetime(2026, 1, 14, 10, 0)
+    assert _next(app_module, "0 0 * * 7", after) == _next(app_module, "0 0 * * 0", after)
+
+
+def test_day_and_weekday_both_restricted_match_either(app_module):
+    # 1'i veya pazartesi: 14 Ocak çarşamba -> 19 Ocak pazartesi
+    after = datetime(2026, 1, 14, 10, 0)
+    assert _next(app_module, "0 0 1 * 1", after) == datetime(2026, 1, 19, 0, 0)
+
+
+def test_star_step_day_field_is_not_restricted(app_module):
+    # "*/2" kısıtlı sayılmaz: tek günler VE pazartesi (Vixie cron)
+    schedule = app_module.Schedule("0 0 */2 * 1")
+    assert not schedule.days_restricted
+    assert schedule.weekdays_restricted
+    # 21 Ocak tek ama çarşamba; 26 Ocak ve 2 Şubat pazartesi ama çift
+    assert schedule.next_after(datetime(2026, 1, 20, 10, 0)) == datetime(2026, 2, 9, 0, 0)
+
+
+@pytest.mark.parametrize("spec", [
+    "61 * * * *",
+    "* * *",
+    "* * 0 * *",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "@every 0m",
+    "@every 5x",
+])
+def test_invalid_specs(app_module, spec):
+    with pytest.raises(ValueError):
+        app_module.Schedule(spec)
+
+
+def test_never_firing_schedule(app_module):
+    with pytest.raises(ValueError):
+        _next(app_module, "0 0 31 2 *", datetime(2026, 1, 1))
+
+
+def test_job_spec_env_override(app_module, monkeypatch):
+    monkeypatch.setenv("SCHEDULE_TEST_JOB", "off")
+    assert app_module.ScheduledJob("test-job", print, "@every 5m", 0, "").schedule is None
+    monkeypatch.setenv("SCHEDULE_TEST_JOB", "0 4 * * *")
+    job = app_module.ScheduledJob("test-job", print, None, 0, "")
+    assert job.spec == "0 4 * * *"
+    assert job.schedule.next_after(datetime(2026, 1, 1)) == datetime(2026, 1, 1, 4, 0)
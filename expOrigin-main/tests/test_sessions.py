@@ -0,0 +1,71 @@
+import pytest
+
+
+@pytest.fixture
+def store(app_module):
+    return app_module.PostgresSessionInterface()
+
+
+def _cookie(app_module, store, sid):
+    return store._signer(app_module.app).sign(sid.encode()).decode()
+
+
+def _request(app_module, store, cookie=None):
+    name = store.get_cookie_name(app_module.app)
+    headers = {"Cookie": f"{name}={cookie}"} if cookie else {}
+    return app_module.app.test_request_context("/", headers=headers)
+
+
+def test_lru_evicts_least_recently_used(app_module, store, monkeypatch):
+    monkeypatch.setattr(app_module, "SESSION_LRU_SIZE", 2)
+    store._cache_put("a", "1")
+    store._cache_put("b", "2")
+    assert store._cache_get("a") == "1"
+    store._cache_put("c", "3")
+    assert store._cache_get("b") is None
+    assert list(store._lru) == ["a", "c"]
+
+
+def test_open_session_from_lru_without_db(app_module, store):
+    store._cache_put("sid-1", store.serializer.dumps({"user_id": 7}))
+    with _request(app_module, store, _cookie(app_module, store, "sid-1")) as ctx:
+        session = store.open_session(app_module.app, ctx.request)
+    assert session.sid == "sid-1"
+    assert not session.new
+    assert session["user_id"] == 7
+
+
+def test_cached_session_is_not_shared_between_requests(app_module, store):
+    store._cache_put("sid-1", store.serializer.dumps({"_flashes": []}))
+    with _request(app_module, store, _cookie(app_module, store, "sid-1")) as ctx:
+        session = store.open_session(app_module.app, ctx.request)
+    session["_flashes"].append(("info", "x"))
+    assert store.serializer.loads(store._cache_get("sid-1")) == {"_flashes": []}
+
+
+def test_bad_signature_starts_new_session(app_module, store):
+    store._cache_put("sid-1", store.serializer.dumps({"user_id": 7}))
+    with _request(app_module, store, "sid-1.forged") as ctx:
+        session = store.open_session(app_module.app, ctx.request)
+        assert store.cached_value(app_module.app, ctx.request, "user_id") is None
+    assert session.new
+    assert session.sid is None
+    assert not session
+
+
+def test_cached_value_never_hits_db(app_module, store):
+    with _request(app_module, store, _cookie(app_module, store, "not-cached")) as ctx:
+        assert store.cached_value(app_module.app, ctx.request, "user_id") is None
+    store._cache_put("sid-2", store.serializer.dumps({"user_id": 3}))
+    with _request(app_module, store, _cookie(app_module, store, "sid-2")) as ctx:
+        assert store.cached_value(app_module.app, ctx.request, "user_id") == 3
+
+
+def test_unmodified_session_is_not_saved(app_module, store):
+    session = app_module.ServerSession({"user_id": 7}, sid="sid-1")
+    with app_module.app.test_request_context("/"):
+        response = app_module.app.response_class()
+        store.save_session(app_module.app, session, response)
+    assert "Set-Cookie" not in response.headers
+    session["user_id"] = 8
+    assert session.modified
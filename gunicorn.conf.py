@@ -0,0 +1,134 @@
+# gunicorn.conf.py
+"""
+Gunicorn çalışma profili.
+
+Uygulama I/O ağırlıklı (Neon'a TLS üzerinden sorgu, çok MB'lık görsel yüklemeleri);
+sync worker'da her bekleyen istek koca bir process'i kilitler. Varsayılan profil
+bu yüzden gthread: az process, process başına çok thread.
+
+Ortam değişkenleri:
+    GUNICORN_PROFILE              gthread (varsayılan) | gevent | sync
+    WEB_CONCURRENCY               worker (process) sayısı
+    GUNICORN_THREADS              gthread için worker başına thread sayısı
+    GUNICORN_WORKER_CONNECTIONS   gevent için worker başına eşzamanlı bağlantı
+    GUNICORN_TIMEOUT              worker zaman aşımı (sn)
+    GUNICORN_PRELOAD              1 ise uygulama master'da bir kez yüklenir (--preload)
+    PORT                          dinlenecek port (Render/Heroku verir)
+    METRICS_MULTIPROC_DIR         worker metriklerinin birleştirildiği dizin
+                                  (varsayılan /dev/shm/exp-metrics-<port>; açılışta boşaltılır)
+
+Giriş noktası "expOrigin-main.app:create_app()": worker açılışta şema, havuz,
+şablon ve önbellek ısınmasını arka planda paralel yapar. Preload modunda master
+yalnızca DB'siz ısınmayı yapar; her worker fork sonrası kalıtılan havuzu bırakır
+(app.after_fork) ve DB ısınmasını kendisi yapar.
+
+DB havuzu (app.py) GUNICORN_THREADS ve WEB_CONCURRENCY'yi okuyarak boyutlanır; bu
+dosya seçilen değerleri env'e yazdığı için worker'lar aynı değerleri görür. Toplam
+bağlantı üst sınırı:
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) <= DB_MAX_CONNECTIONS
+Worker başına havuz DB_MAX_CONNECTIONS / workers bütçesine kırpılır.
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+_cpu = multiprocessing.cpu_count()
+
+profile = os.getenv("GUNICORN_PROFILE", "gthread").strip().lower()
+if profile not in ("gthread", "gevent", "sync"):
+    raise RuntimeError(f"Geçersiz GUNICORN_PROFILE: {profile}")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+if profile == "gthread":
+    worker_class = "gthread"
+    workers = int(os.getenv("WEB_CONCURRENCY", str(min(_cpu + 1, 8))))
+    threads = int(os.getenv("GUNICORN_THREADS", str(min(4 * _cpu, 16))))
+elif profile == "gevent":
+    # psycopg2 için psycogreen gerekir (post_fork'ta yamalanır); gevent ve
+    # psycogreen requirements.txt'te sabitlenmiştir
+    worker_class = "gevent"
+    workers = int(os.getenv("WEB_CONCURRENCY", str(_cpu)))
+    threads = 1
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "200"))
+    # Greenlet sayısı kadar DB bağlantısı açılmasın; havuz bekletsin
+    os.environ.setdefault("DB_POOL_SIZE", "10")
+    os.environ.setdefault("DB_MAX_OVERFLOW", "5")
+else:
+    worker_class = "sync"
+    workers = int(os.getenv("WEB_CONCURRENCY", str(_cpu * 2 + 1)))
+    threads = 1
+
+# app.py DB havuzunu bu değerlerle bütçeler; gunicorn bu dosya olmadan başlatılırsa
+# GUNICORN_CONF_LOADED eksik olur ve app.py import'ta açıkça hata verir
+os.environ["GUNICORN_THREADS"] = str(threads)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+os.environ["GUNICORN_CONF_LOADED"] = "1"
+
+db_max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+if db_max_connections < workers:
+    raise RuntimeError(
+        f"DB_MAX_CONNECTIONS ({db_max_connections}) worker sayısından ({workers}) küçük; "
+        "her worker'a en az bir bağlantı düşmeli"
+    )
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Bellek sızıntılarına karşı worker'ları arada bir yenile (hepsi aynı anda değil)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+# Docker'da /tmp disk olabilir; heartbeat dosyası için tmpfs kullan
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+if preload_app:
+    # create_app() master'da çağrıldığını bu değişkenden anlar
+    os.environ["APP_PRELOADED"] = "1"
+
+# Worker'lar metriklerini burada birleştirir (app.py METRICS_MULTIPROC_DIR);
+# /metrics hangi worker'a düşerse düşsün tüm worker'ların toplamını döner
+os.environ.setdefault(
+    "METRICS_MULTIPROC_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                 f"exp-metrics-{os.getenv('PORT', '8000')}"),
+)
+
+accesslog = "-" if os.getenv("GUNICORN_ACCESS_LOG", "0") == "1" else None
+
+
+def on_starting(server):
+    # Önceki çalıştırmanın (ölmüş pid'lerin) metrik dosyaları yeni sayaçlara karışmasın
+    shutil.rmtree(os.environ["METRICS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["METRICS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen yok: gevent altında psycopg2 çağrıları worker'ı bloklar")
+
+    if preload_app:
+        # Uygulama master'da yüklendi: modülü bul, fork'a güvenli engine dispose + DB ısınması
+        flask_app = worker.app.wsgi()
+        sys.modules[flask_app.import_name].after_fork()
+
+
+def when_ready(server):
+    server.log.info(
+        "profil=%s workers=%s threads=%s (cpu=%s) preload=%s",
+        profile, workers, threads, _cpu, preload_app,
+    )
+    server.log.info(
+        "DB bağlantı bütçesi: %s worker x en fazla %s = %s (DB_MAX_CONNECTIONS=%s)",
+        workers, db_max_connections // workers,
+        workers * (db_max_connections // workers), db_max_connections,
+    )